@@ -1,36 +1,100 @@
-from typing import List, Union
+from typing import Iterator, List, Tuple, Union
+from algorithms.cost import CostEstimate, left_larger_counts
+from algorithms.result import SortResult
+from algorithms.trace import StepKind, Trace, value_typecode, working_copy
 
+# opcodes of the bubble sort trace
+COMPARE, SWAP = 0, 1
 
-def bubble_sort(array: List[Union[int, float]]):
-    """
-    Perform bubble sort conceptually (without modifying the original array)
-    and record each comparison and swap decision.
+STEP_KINDS = (
+    StepKind(None, ("i", "j"), extra=(("swap", False),)),
+    StepKind(None, ("i", "j"), extra=(("swap", True),), effect="swap"),
+)
 
-    Returns a list of steps. Each step is a dict:
-        {
-          "i": index of first element,
-          "j": index of second element,
-          "swap": True if a swap occurs, False otherwise
-        }
+
+def bubble_sort_steps(array: List[Union[int, float]]) -> Iterator[Tuple[int, ...]]:
+    """
+    Lazily run bubble sort on a copy of 'array', yielding one raw record
+    (op, i, j) per comparison. Each record is yielded before its swap is
+    applied, so consumers can stop, stream or sample the trace at any point.
     """
-    array_copy = list(array)
+    array_copy = working_copy(array)
     n = len(array_copy)
-    trace = []
 
     for i in range(n):
         already_sorted = True
 
         for j in range(n - i - 1):
-            step = {"i": j, "j": j + 1, "swap": False}
-
             if array_copy[j] > array_copy[j + 1]:
+                yield (SWAP, j, j + 1)
                 array_copy[j], array_copy[j + 1] = array_copy[j + 1], array_copy[j]
-                step["swap"] = True
                 already_sorted = False
+            else:
+                yield (COMPARE, j, j + 1)
+
+        if already_sorted:
+            break
+
+
+def bubble_sort_result(array: List[Union[int, float]]) -> SortResult:
+    """
+    Same bubble sort without a trace: returns the sorted copy and counters.
+    """
+    arr = working_copy(array)
+    n = len(arr)
+    comparisons = swaps = 0
+
+    for i in range(n):
+        already_sorted = True
 
-            trace.append(step)
+        for j in range(n - i - 1):
+            comparisons += 1
+            if arr[j] > arr[j + 1]:
+                arr[j], arr[j + 1] = arr[j + 1], arr[j]
+                swaps += 1
+                already_sorted = False
 
         if already_sorted:
             break
 
+    return SortResult(arr, comparisons, swaps, 2 * swaps)
+
+
+def bubble_sort_cost(array: List[Union[int, float]]) -> CostEstimate:
+    """
+    Exact number of steps bubble_sort_steps yields, in O(n log n) instead of
+    the O(n^2) of running it. Every pass moves each element that still has a
+    larger one on its left one place closer to its spot, so the passes that
+    swap are max(left_larger_counts); one more finds nothing and stops.
+    """
+    n = len(array)
+    if n == 0:
+        return CostEstimate(0)
+    passes = min(max(left_larger_counts(array)) + 1, n)
+    # pass i makes n - 1 - i comparisons
+    return CostEstimate(passes * (n - 1) - passes * (passes - 1) // 2)
+
+
+def bubble_sort(array: List[Union[int, float]], keyframe_every: int = 0) -> Trace:
+    """
+    Perform bubble sort conceptually (without modifying the original array)
+    and record each comparison and swap decision.
+
+    Returns a Trace of steps. Each step reads as a dict:
+        {
+          "i": index of first element,
+          "j": index of second element,
+          "swap": True if a swap occurs, False otherwise
+        }
+
+    With keyframe_every=k a snapshot of the array is kept every k steps
+    (see Trace.state_at).
+    """
+    trace = Trace(
+        STEP_KINDS,
+        value_typecode(array),
+        initial=array,
+        keyframe_every=keyframe_every,
+    )
+    trace.extend(bubble_sort_steps(array))
     return trace
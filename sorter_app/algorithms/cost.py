@@ -0,0 +1,72 @@
+import json
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+from algorithms.trace import StepKind
+
+
+class CostEstimate(NamedTuple):
+    """
+    Predicted size of a trace, computed without running the tracer.
+      steps: number of steps the tracer will yield
+      exact: True when 'steps' is exact, False for an estimate
+             (data-dependent algorithms like quick sort)
+    """
+
+    steps: int
+    exact: bool = True
+
+
+def left_larger_counts(array: Sequence[Any]) -> List[int]:
+    """
+    For every position, how many earlier elements are strictly larger.
+    Their sum is the inversion count. O(n log n) with a Fenwick tree over the
+    ranks of the values.
+    """
+    ranks = sorted(set(array))
+    tree = [0] * (len(ranks) + 1)
+    counts = []
+    for seen, value in enumerate(array):
+        rank = bisect_left(ranks, value) + 1
+        # earlier elements with a rank <= this one
+        not_larger, i = 0, rank
+        while i > 0:
+            not_larger += tree[i]
+            i -= i & -i
+        counts.append(seen - not_larger)
+        while rank < len(tree):
+            tree[rank] += 1
+            rank += rank & -rank
+    return counts
+
+
+def step_json_bytes(kinds: Sequence[StepKind], array: Sequence[Any]) -> int:
+    """
+    Upper estimate of the JSON size of one step of 'array' (widest kind, the
+    longest index and the longest of the extreme values, plus a separator).
+    """
+    index = max(len(array) - 1, 0)
+    value: Any = 0
+    if array:
+        value = max((min(array), max(array)), key=lambda x: len(repr(x)))
+    widest = 0
+    for op, kind in enumerate(kinds):
+        record = (op, *[index] * len(kind.fields), value)
+        size = len(json.dumps(kind.as_dict(record), separators=(",", ":")))
+        widest = max(widest, size)
+    return widest + 1
+
+
+def estimate_bytes(
+    kinds: Sequence[StepKind],
+    array: Sequence[Any],
+    estimate: CostEstimate,
+    sample_every: int = 1,
+) -> Dict[str, Any]:
+    """The estimate as a dict, with the JSON bytes of the steps kept."""
+    kept = -(-estimate.steps // sample_every)
+    return {
+        "steps": estimate.steps,
+        "exact": estimate.exact,
+        "bytes": kept * step_json_bytes(kinds, array),
+    }
@@ -1,19 +1,25 @@
-from typing import List, Union
+from typing import Any, Iterator, List, Tuple, Union
+from algorithms.cost import CostEstimate, left_larger_counts
+from algorithms.result import SortResult
+from algorithms.trace import StepKind, Trace, value_typecode, working_copy
 
+# opcodes of the insertion sort trace
+KEY, COMPARE, SHIFT, INSERT = 0, 1, 2, 3
 
-def insertion_sort(array: List[Union[int, float]]):
-    """
-    Perform insertion sort conceptually (without modifying the original array)
-    and record each comparison, shift, and insertion.
+STEP_KINDS = (
+    StepKind("key", ("i",), value="value"),
+    StepKind("compare", ("i", "j")),
+    StepKind("shift", ("from", "to"), effect="copy"),
+    StepKind("insert", ("index",), value="value", effect="write"),
+)
 
-    Returns a list of steps:
-      { "type": "compare" | "shift" | "insert",
-        "i": index,
-        "j": index,
-        "value": element_being_moved (for insert steps) }
+
+def insertion_sort_steps(array: List[Union[int, float]]) -> Iterator[Tuple[Any, ...]]:
+    """
+    Lazily run insertion sort on a copy of 'array', yielding raw records
+    (see STEP_KINDS), each one before its effect is applied.
     """
-    array_copy = list(array)
-    steps = []
+    array_copy = working_copy(array)
     n = len(array_copy)
 
     for i in range(1, n):
@@ -21,16 +27,74 @@ def insertion_sort(array: List[Union[int, float]]):
         j = i - 1
 
         # record which element we are inserting
-        steps.append({"type": "key", "i": i, "value": key})
+        yield (KEY, i, key)
 
         # move larger elements one position ahead
         while j >= 0 and array_copy[j] > key:
-            steps.append({"type": "compare", "i": j, "j": j + 1})
+            yield (COMPARE, j, j + 1)
+            yield (SHIFT, j, j + 1)
             array_copy[j + 1] = array_copy[j]
-            steps.append({"type": "shift", "from": j, "to": j + 1})
             j -= 1
 
+        yield (INSERT, j + 1, key)
         array_copy[j + 1] = key
-        steps.append({"type": "insert", "index": j + 1, "value": key})
 
+
+def insertion_sort_result(array: List[Union[int, float]]) -> SortResult:
+    """
+    Same insertion sort without a trace: returns the sorted copy and counters.
+    Every shift and the final placement of each key count as writes.
+    """
+    arr = working_copy(array)
+    comparisons = writes = 0
+
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i - 1
+
+        while j >= 0:
+            comparisons += 1
+            if not arr[j] > key:
+                break
+            arr[j + 1] = arr[j]
+            writes += 1
+            j -= 1
+
+        arr[j + 1] = key
+        writes += 1
+
+    return SortResult(arr, comparisons, 0, writes)
+
+
+def insertion_sort_cost(array: List[Union[int, float]]) -> CostEstimate:
+    """
+    Exact number of steps insertion_sort_steps yields: a key and an insert
+    per element after the first, plus a compare and a shift per inversion.
+    """
+    inversions = sum(left_larger_counts(array))
+    return CostEstimate(2 * max(len(array) - 1, 0) + 2 * inversions)
+
+
+def insertion_sort(
+    array: List[Union[int, float]], keyframe_every: int = 0
+) -> Trace:
+    """
+    Perform insertion sort conceptually (without modifying the original array)
+    and record each comparison, shift, and insertion.
+
+    Returns a Trace of steps:
+      { "type": "compare" | "shift" | "insert",
+        "i": index,
+        "j": index,
+        "value": element_being_moved (for insert steps) }
+
+    With keyframe_every=k a snapshot of the array is kept every k steps.
+    """
+    steps = Trace(
+        STEP_KINDS,
+        value_typecode(array),
+        initial=array,
+        keyframe_every=keyframe_every,
+    )
+    steps.extend(insertion_sort_steps(array))
     return steps
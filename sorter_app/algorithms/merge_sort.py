@@ -1,17 +1,25 @@
-from typing import List, Union
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from algorithms.cost import CostEstimate
+from algorithms.result import SortResult
+from algorithms.trace import StepKind, Trace, value_typecode, working_copy
 
+# opcodes of the merge sort trace
+SPLIT, COMPARE, OVERWRITE = 0, 1, 2
 
-def merge_sort(array: List[Union[int, float]]):
+STEP_KINDS = (
+    StepKind("split", ("start", "mid", "end")),
+    StepKind("compare", ("i", "j")),
+    StepKind("overwrite", ("index",), value="value", effect="write"),
+)
+
+
+def merge_sort_steps(array: List[Union[int, float]]) -> Iterator[Tuple[Any, ...]]:
     """
-    Perform merge sort and record steps for visualization.
-    Each step is one of:
-      - {"type": "compare", "i": left_index, "j": right_index}
-      - {"type": "overwrite", "index": dest_index, "value": new_value}
-      - {"type": "split", "start": s, "mid": m, "end": e}
+    Lazily run merge sort on a copy of 'array', yielding raw records
+    (see STEP_KINDS), each one before its effect is applied.
     """
 
-    array_copy = list(array)
-    steps = []
+    array_copy = working_copy(array)
 
     def _merge_sort(arr, left, right):
         if right - left <= 1:
@@ -19,17 +27,17 @@ def merge_sort(array: List[Union[int, float]]):
 
         mid = (left + right) // 2
         # record the current split range
-        steps.append({"type": "split", "start": left, "mid": mid, "end": right})
+        yield (SPLIT, left, mid, right)
 
-        _merge_sort(arr, left, mid)
-        _merge_sort(arr, mid, right)
+        yield from _merge_sort(arr, left, mid)
+        yield from _merge_sort(arr, mid, right)
 
         # merge process
         merged = []
         i, j = left, mid
 
         while i < mid and j < right:
-            steps.append({"type": "compare", "i": i, "j": j})
+            yield (COMPARE, i, j)
             if array_copy[i] <= array_copy[j]:
                 merged.append(array_copy[i])
                 i += 1
@@ -48,8 +56,89 @@ def merge_sort(array: List[Union[int, float]]):
         # we copy the merged values back into the original array into the correct positions
         # helps the frontend with the height animation
         for k, val in enumerate(merged):
+            yield (OVERWRITE, left + k, val)
             array_copy[left + k] = val
-            steps.append({"type": "overwrite", "index": left + k, "value": val})
 
-    _merge_sort(array_copy, 0, len(array_copy))
+    yield from _merge_sort(array_copy, 0, len(array_copy))
+
+
+def merge_sort_result(array: List[Union[int, float]]) -> SortResult:
+    """
+    Same top-down merge sort without a trace: returns the sorted copy and
+    counters. Copying merged values back into the array counts as writes.
+    """
+    arr = working_copy(array)
+    comparisons = writes = 0
+    # ranges still to sort; a range is merged when popped the second time
+    pending = [(0, len(arr), False)]
+
+    while pending:
+        left, right, halves_sorted = pending.pop()
+        if right - left <= 1:
+            continue
+        mid = (left + right) // 2
+        if not halves_sorted:
+            pending.append((left, right, True))
+            pending.append((mid, right, False))
+            pending.append((left, mid, False))
+            continue
+
+        merged = arr[:0]  # same type as arr, so it can be assigned back
+        i, j = left, mid
+        while i < mid and j < right:
+            comparisons += 1
+            if arr[i] <= arr[j]:
+                merged.append(arr[i])
+                i += 1
+            else:
+                merged.append(arr[j])
+                j += 1
+        merged.extend(arr[i:mid])
+        merged.extend(arr[j:right])
+
+        arr[left:right] = merged
+        writes += right - left
+
+    return SortResult(arr, comparisons, 0, writes)
+
+
+def merge_sort_cost(array: List[Union[int, float]]) -> CostEstimate:
+    """
+    Upper bound of the steps merge_sort_steps yields. Splits (n - 1) and
+    overwrites (every element once per level) only depend on n; a merge of
+    k elements compares at most k - 1 times, which random data comes close to.
+    """
+    overwrites: Dict[int, int] = {}
+
+    def written(n: int) -> int:
+        if n <= 1:
+            return 0
+        if n not in overwrites:
+            overwrites[n] = n + written(n // 2) + written(n - n // 2)
+        return overwrites[n]
+
+    n = len(array)
+    splits = max(n - 1, 0)
+    writes = written(n)
+    compares = writes - splits  # one merge per split
+    return CostEstimate(splits + compares + writes, exact=False)
+
+
+def merge_sort(array: List[Union[int, float]], keyframe_every: int = 0) -> Trace:
+    """
+    Perform merge sort and record steps for visualization.
+    Returns a Trace; each step reads as one of:
+      - {"type": "compare", "i": left_index, "j": right_index}
+      - {"type": "overwrite", "index": dest_index, "value": new_value}
+      - {"type": "split", "start": s, "mid": m, "end": e}
+
+    With keyframe_every=k a snapshot of the array is kept every k steps.
+    """
+    steps = Trace(
+        STEP_KINDS,
+        value_typecode(array),
+        initial=array,
+        keyframe_every=keyframe_every,
+    )
+    steps.extend(merge_sort_steps(array))
     return steps
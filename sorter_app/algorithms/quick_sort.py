@@ -1,60 +1,401 @@
-from random import randint
-from typing import List, Union
+import math
+import random
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from algorithms.cost import CostEstimate
+from algorithms.result import SortResult
+from algorithms.trace import StepKind, Trace, value_typecode, working_copy
 
+# opcodes of the quick sort trace
+PIVOT, COMPARE, SWAP, DONE, HEAP, HEAP_COMPARE = 0, 1, 2, 3, 4, 5
+LT, EQ, GT, DONE_RANGE = 6, 7, 8, 9
 
-def quick_sort(array: List[Union[int, float]]):
+STEP_KINDS = (
+    StepKind("pivot", ("index",)),
+    StepKind("compare", ("i", "pivot_index")),
+    StepKind("swap", ("i", "j"), effect="swap"),
+    StepKind("done", ("index",)),
+    StepKind("heap", ("start", "end")),
+    StepKind("heap_compare", ("i", "j")),
+    # three-way partitioning: element i classified against the pivot while
+    # [start, lt) < pivot, [lt, i) == pivot and (gt, end] > pivot
+    StepKind("lt", ("i", "lt", "gt")),
+    StepKind("eq", ("i", "lt", "gt")),
+    StepKind("gt", ("i", "lt", "gt")),
+    StepKind("done_range", ("start", "end")),
+)
+
+PIVOT_STRATEGIES = ("first", "random", "median3", "ninther")
+PARTITION_SCHEMES = ("lomuto", "three_way")
+
+# ranges at least this long use Tukey's ninther instead of a plain median of 3
+NINTHER_THRESHOLD = 40
+
+
+def _depth_limit(n: int) -> int:
+    """Introsort bound: 2 * floor(log2(n)) partitioning levels."""
+    return 2 * max(n.bit_length() - 1, 0)
+
+
+def _median3(arr: List[Any], a: int, b: int, c: int) -> int:
+    """Index of the median of arr[a], arr[b], arr[c]."""
+    if arr[a] < arr[b]:
+        if arr[b] < arr[c]:
+            return b
+        return c if arr[a] < arr[c] else a
+    if arr[a] < arr[c]:
+        return a
+    return c if arr[b] < arr[c] else b
+
+
+def _choose_pivot(
+    arr: List[Any], left: int, right: int, strategy: str, rng: random.Random
+) -> int:
+    if strategy == "first":
+        return left
+    if strategy == "random":
+        return rng.randint(left, right)
+
+    mid = (left + right) // 2
+    if strategy == "ninther" and right - left + 1 >= NINTHER_THRESHOLD:
+        eighth = (right - left + 1) // 8
+        return _median3(
+            arr,
+            _median3(arr, left, left + eighth, left + 2 * eighth),
+            _median3(arr, mid - eighth, mid, mid + eighth),
+            _median3(arr, right - 2 * eighth, right - eighth, right),
+        )
+    return _median3(arr, left, mid, right)
+
+
+def parse_options(data: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Perform QuickSort and record steps for visualization.
+    Read the quick sort options of a request body:
+      "pivot": one of PIVOT_STRATEGIES (default "random")
+      "seed":  int seeding the random pivot choice (default unseeded)
+      "partition": one of PARTITION_SCHEMES (default "lomuto")
+    Raises ValueError with a client-facing message on bad input.
+    """
+    pivot = data.get("pivot", "random")
+    seed = data.get("seed")
+    partition = data.get("partition", "lomuto")
+    if pivot not in PIVOT_STRATEGIES:
+        raise ValueError(f"'pivot' must be one of {', '.join(PIVOT_STRATEGIES)}.")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValueError("'seed' must be an integer.")
+    if partition not in PARTITION_SCHEMES:
+        raise ValueError(
+            f"'partition' must be one of {', '.join(PARTITION_SCHEMES)}."
+        )
+    return {"pivot": pivot, "seed": seed, "partition": partition}
 
-    Steps recorded:
-      - {"type": "pivot", "index": i}
-      - {"type": "compare", "i": i, "pivot_index": p}
-      - {"type": "swap", "i": i, "j": j}
-      - {"type": "done", "index": i}
+
+def is_reproducible(
+    pivot: str = "random", seed: Optional[int] = None, **options: Any
+) -> bool:
+    """Only an unseeded random pivot makes the trace vary between runs."""
+    return pivot != "random" or seed is not None
+
+
+def quick_sort_steps(
+    array: List[Union[int, float]],
+    pivot: str = "random",
+    seed: Optional[int] = None,
+    partition: str = "lomuto",
+) -> Iterator[Tuple[int, ...]]:
     """
-    array_copy = list(array)
-    steps = []
+    Lazily run QuickSort on a copy of 'array', yielding raw records
+    (see STEP_KINDS), each one before its effect is applied.
+
+    partition="three_way" splits each range into < pivot, == pivot and
+    > pivot (Dijkstra's Dutch national flag), so runs of equal values are
+    placed in one pass and duplicate-heavy inputs sort in near-linear steps.
+
+    The sort is iterative: the smaller side of each partition is handled
+    first while the larger one waits on an explicit stack, so at most
+    O(log n) ranges are pending. A range nested deeper than the introsort
+    limit is finished with heapsort, keeping the worst case O(n log n).
+    """
+    if pivot not in PIVOT_STRATEGIES:
+        raise ValueError(f"unknown pivot strategy: {pivot!r}")
+    if partition not in PARTITION_SCHEMES:
+        raise ValueError(f"unknown partition scheme: {partition!r}")
+    array_copy = working_copy(array)
+    rng = random.Random(seed)
+
+    def _swap(i, j):
+        array_copy[i], array_copy[j] = array_copy[j], array_copy[i]
 
-    # sort the subarray between the given indices
-    def _quick_sort(left, right):
-        if left >= right:
-            return
-        pivot_index = randint(left, right)
+    # Lomuto partition of [left, right]; returns the placed range (p, p)
+    def _partition(left, right):
+        pivot_index = _choose_pivot(array_copy, left, right, pivot, rng)
         pivot_value = array_copy[pivot_index]
-        steps.append({"type": "pivot", "index": pivot_index})
+        yield (PIVOT, pivot_index)
 
         # Move pivot to end - Lomuto partition trick
-        array_copy[pivot_index], array_copy[right] = (
-            array_copy[right],
-            array_copy[pivot_index],
-        )
-        steps.append({"type": "swap", "i": pivot_index, "j": right})
+        yield (SWAP, pivot_index, right)
+        _swap(pivot_index, right)
 
         # Partition process
         store_index = left
         for i in range(left, right):
-            steps.append({"type": "compare", "i": i, "pivot_index": right})
+            yield (COMPARE, i, right)
             if array_copy[i] < pivot_value:
-                steps.append({"type": "swap", "i": i, "j": store_index})
-                array_copy[i], array_copy[store_index] = (
-                    array_copy[store_index],
-                    array_copy[i],
-                )
+                yield (SWAP, i, store_index)
+                _swap(i, store_index)
                 store_index += 1
 
         # Move pivot to final place
-        steps.append({"type": "swap", "i": store_index, "j": right})
-        array_copy[store_index], array_copy[right] = (
-            array_copy[right],
-            array_copy[store_index],
-        )
+        yield (SWAP, store_index, right)
+        _swap(store_index, right)
 
         # Mark pivot as placed
-        steps.append({"type": "done", "index": store_index})
+        yield (DONE, store_index)
+        return store_index, store_index
+
+    # three-way partition of [left, right]; returns the range equal to the pivot
+    def _partition_three_way(left, right):
+        pivot_index = _choose_pivot(array_copy, left, right, pivot, rng)
+        pivot_value = array_copy[pivot_index]
+        yield (PIVOT, pivot_index)
+
+        lt, i, gt = left, left, right
+        while i <= gt:
+            if array_copy[i] < pivot_value:
+                yield (LT, i, lt, gt)
+                if i != lt:
+                    yield (SWAP, i, lt)
+                    _swap(i, lt)
+                lt += 1
+                i += 1
+            elif array_copy[i] > pivot_value:
+                yield (GT, i, lt, gt)
+                if i != gt:
+                    yield (SWAP, i, gt)
+                    _swap(i, gt)
+                gt -= 1
+            else:
+                yield (EQ, i, lt, gt)
+                i += 1
+
+        # every value equal to the pivot is now in its final place
+        yield (DONE_RANGE, lt, gt)
+        return lt, gt
+
+    # heapsort fallback for [left, right] once partitioning got too deep
+    def _heap_sort(left, right):
+        yield (HEAP, left, right)
+        size = right - left + 1
 
-        # Recurse left and right
-        _quick_sort(left, store_index - 1)
-        _quick_sort(store_index + 1, right)
+        def _sift_down(root, end):
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    return
+                if child + 1 < end:
+                    yield (HEAP_COMPARE, left + child, left + child + 1)
+                    if array_copy[left + child] < array_copy[left + child + 1]:
+                        child += 1
+                yield (HEAP_COMPARE, left + root, left + child)
+                if not array_copy[left + root] < array_copy[left + child]:
+                    return
+                yield (SWAP, left + root, left + child)
+                _swap(left + root, left + child)
+                root = child
 
-    _quick_sort(0, len(array_copy) - 1)
+        for start in range(size // 2 - 1, -1, -1):
+            yield from _sift_down(start, size)
+        for end in range(size - 1, 0, -1):
+            yield (SWAP, left, left + end)
+            _swap(left, left + end)
+            yield (DONE, left + end)
+            yield from _sift_down(0, end)
+        yield (DONE, left)
+
+    partition_range = _partition_three_way if partition == "three_way" else _partition
+    depth_limit = _depth_limit(len(array_copy))
+    pending = [(0, len(array_copy) - 1, 0)]
+    while pending:
+        left, right, depth = pending.pop()
+        while left < right:
+            if depth > depth_limit:
+                yield from _heap_sort(left, right)
+                break
+            low, high = yield from partition_range(left, right)
+            depth += 1
+            # keep working on the smaller side, defer the larger one
+            if low - left < right - high:
+                pending.append((high + 1, right, depth))
+                right = low - 1
+            else:
+                pending.append((left, low - 1, depth))
+                left = high + 1
+
+
+def quick_sort_result(
+    array: List[Union[int, float]],
+    pivot: str = "random",
+    seed: Optional[int] = None,
+    partition: str = "lomuto",
+) -> SortResult:
+    """
+    Same engine as quick_sort_steps (pivot choice, partitioning, smaller side
+    first, heapsort fallback) without a trace: returns the sorted copy and
+    counters. Given the same seed, the counters match the traced run.
+    """
+    if pivot not in PIVOT_STRATEGIES:
+        raise ValueError(f"unknown pivot strategy: {pivot!r}")
+    if partition not in PARTITION_SCHEMES:
+        raise ValueError(f"unknown partition scheme: {partition!r}")
+    arr = working_copy(array)
+    rng = random.Random(seed)
+    comparisons = swaps = 0
+
+    def _partition(left, right):
+        nonlocal comparisons, swaps
+        pivot_index = _choose_pivot(arr, left, right, pivot, rng)
+        pivot_value = arr[pivot_index]
+        arr[pivot_index], arr[right] = arr[right], arr[pivot_index]
+        swaps += 1
+
+        store_index = left
+        for i in range(left, right):
+            comparisons += 1
+            if arr[i] < pivot_value:
+                arr[i], arr[store_index] = arr[store_index], arr[i]
+                swaps += 1
+                store_index += 1
+
+        arr[store_index], arr[right] = arr[right], arr[store_index]
+        swaps += 1
+        return store_index, store_index
+
+    def _partition_three_way(left, right):
+        nonlocal comparisons, swaps
+        pivot_value = arr[_choose_pivot(arr, left, right, pivot, rng)]
+
+        lt, i, gt = left, left, right
+        while i <= gt:
+            comparisons += 1
+            if arr[i] < pivot_value:
+                if i != lt:
+                    arr[i], arr[lt] = arr[lt], arr[i]
+                    swaps += 1
+                lt += 1
+                i += 1
+                continue
+            comparisons += 1
+            if arr[i] > pivot_value:
+                if i != gt:
+                    arr[i], arr[gt] = arr[gt], arr[i]
+                    swaps += 1
+                gt -= 1
+            else:
+                i += 1
+        return lt, gt
+
+    def _heap_sort(left, right):
+        nonlocal comparisons, swaps
+        size = right - left + 1
+
+        def _sift_down(root, end):
+            nonlocal comparisons, swaps
+            while True:
+                child = 2 * root + 1
+                if child >= end:
+                    return
+                if child + 1 < end:
+                    comparisons += 1
+                    if arr[left + child] < arr[left + child + 1]:
+                        child += 1
+                comparisons += 1
+                if not arr[left + root] < arr[left + child]:
+                    return
+                a, b = left + root, left + child
+                arr[a], arr[b] = arr[b], arr[a]
+                swaps += 1
+                root = child
+
+        for start in range(size // 2 - 1, -1, -1):
+            _sift_down(start, size)
+        for end in range(size - 1, 0, -1):
+            arr[left], arr[left + end] = arr[left + end], arr[left]
+            swaps += 1
+            _sift_down(0, end)
+
+    partition_range = _partition_three_way if partition == "three_way" else _partition
+    depth_limit = _depth_limit(len(arr))
+    pending = [(0, len(arr) - 1, 0)]
+    while pending:
+        left, right, depth = pending.pop()
+        while left < right:
+            if depth > depth_limit:
+                _heap_sort(left, right)
+                break
+            low, high = partition_range(left, right)
+            depth += 1
+            if low - left < right - high:
+                pending.append((high + 1, right, depth))
+                right = low - 1
+            else:
+                pending.append((left, low - 1, depth))
+                left = high + 1
+
+    return SortResult(arr, comparisons, swaps, 2 * swaps)
+
+
+def quick_sort_cost(array: List[Union[int, float]], **options: Any) -> CostEstimate:
+    """
+    Upper bound on the steps quick_sort_steps yields, for every pivot strategy
+    and partition scheme. With h = floor(log2(n)):
+      - a partition of m elements yields at most 2m + 2 steps; the ranges of
+        one depth are disjoint and every partition places an element, so the
+        2h + 1 depths before the fallback yield at most 2n(2h + 2);
+      - heapsort of s elements yields at most s(3h + 8) steps, and the ranges
+        it sorts are disjoint.
+    Adversarial inputs (sorted, pivot "first", three-way) reach ~90% of it;
+    typical ones ~25%.
+    """
+    n = len(array)
+    if n < 2:
+        return CostEstimate(0, exact=False)
+    h = n.bit_length() - 1
+    partitions = 2 * n * (_depth_limit(n) + 2)
+    heap_sort = n * (3 * h + 8)
+    return CostEstimate(partitions + heap_sort, exact=False)
+
+
+def quick_sort(
+    array: List[Union[int, float]],
+    pivot: str = "random",
+    seed: Optional[int] = None,
+    partition: str = "lomuto",
+    keyframe_every: int = 0,
+) -> Trace:
+    """
+    Perform QuickSort and record steps for visualization.
+
+    'pivot' selects the pivot strategy (first, random, median3, ninther);
+    'seed' makes the random strategy reproducible;
+    'partition' picks Lomuto (default) or three-way partitioning;
+    'keyframe_every' keeps a snapshot of the array every that many steps.
+
+    Returns a Trace; steps recorded:
+      - {"type": "pivot", "index": i}
+      - {"type": "compare", "i": i, "pivot_index": p}
+      - {"type": "swap", "i": i, "j": j}
+      - {"type": "done", "index": i}
+      - {"type": "heap", "start": s, "end": e}       (heapsort fallback begins)
+      - {"type": "heap_compare", "i": i, "j": j}
+      - {"type": "lt" | "eq" | "gt", "i": i, "lt": lt, "gt": gt}   (three_way)
+      - {"type": "done_range", "start": s, "end": e}               (three_way)
+    """
+    steps = Trace(
+        STEP_KINDS,
+        value_typecode(array),
+        initial=array,
+        keyframe_every=keyframe_every,
+    )
+    steps.extend(
+        quick_sort_steps(array, pivot=pivot, seed=seed, partition=partition)
+    )
     return steps
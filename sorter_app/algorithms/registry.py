@@ -0,0 +1,137 @@
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from algorithms import quick_sort as quick
+from algorithms.bubble_sort import STEP_KINDS as BUBBLE_KINDS
+from algorithms.bubble_sort import (
+    bubble_sort,
+    bubble_sort_cost,
+    bubble_sort_result,
+    bubble_sort_steps,
+)
+from algorithms.insertion_sort import STEP_KINDS as INSERTION_KINDS
+from algorithms.insertion_sort import (
+    insertion_sort,
+    insertion_sort_cost,
+    insertion_sort_result,
+    insertion_sort_steps,
+)
+from algorithms.merge_sort import STEP_KINDS as MERGE_KINDS
+from algorithms.merge_sort import (
+    merge_sort,
+    merge_sort_cost,
+    merge_sort_result,
+    merge_sort_steps,
+)
+from algorithms.cost import CostEstimate
+from algorithms.result import SortResult
+from algorithms.trace import (
+    StepKind,
+    Trace,
+    limit_steps,
+    report_progress,
+    value_typecode,
+)
+
+
+# how often Algorithm.collect reports progress, in steps
+PROGRESS_EVERY = 4096
+
+
+def _no_options(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {}
+
+
+def _always_reproducible(**options: Any) -> bool:
+    return True
+
+
+class Algorithm(NamedTuple):
+    """
+    Everything needed to run one tracer:
+      name:  the public name used in routes ("bubble", "merge", ...)
+      kinds: the StepKind table describing its raw records
+      steps: generator of raw records (lazy, used for streaming)
+      trace: function returning the collected Trace
+      result: untraced run returning a SortResult (sorted array + counters)
+      cost:  predicts the trace length from the array, without tracing
+      parse_options: turns a request body into keyword arguments for
+                     'steps'/'trace', raising ValueError on bad input
+      reproducible:  tells whether a run with these options always
+                     produces the same trace for the same array
+    """
+
+    name: str
+    kinds: Tuple[StepKind, ...]
+    steps: Callable[..., Iterator[Tuple[Any, ...]]]
+    trace: Callable[..., Trace]
+    result: Callable[..., SortResult]
+    cost: Callable[..., CostEstimate]
+    parse_options: Callable[[Dict[str, Any]], Dict[str, Any]] = _no_options
+    reproducible: Callable[..., bool] = _always_reproducible
+
+    def collect(
+        self,
+        array: List[Any],
+        keyframe_every: int = 0,
+        sample_every: int = 1,
+        max_steps: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        **options: Any,
+    ) -> Trace:
+        """
+        Like 'trace', with the knobs the routes need on top: keyframes,
+        downsampling, a step budget (StepBudgetExceeded once exceeded) and a
+        'progress' callback receiving the step count every PROGRESS_EVERY steps.
+        """
+        trace = Trace(
+            self.kinds,
+            value_typecode(array),
+            initial=array,
+            keyframe_every=keyframe_every,
+            sample_every=sample_every,
+        )
+        records = self.steps(array, **options)
+        if max_steps is not None:
+            records = limit_steps(records, max_steps)
+        if progress is not None:
+            records = report_progress(records, progress, PROGRESS_EVERY)
+        trace.extend(records)
+        return trace
+
+
+ALGORITHMS: Dict[str, Algorithm] = {
+    "bubble": Algorithm(
+        "bubble",
+        BUBBLE_KINDS,
+        bubble_sort_steps,
+        bubble_sort,
+        bubble_sort_result,
+        bubble_sort_cost,
+    ),
+    "insertion": Algorithm(
+        "insertion",
+        INSERTION_KINDS,
+        insertion_sort_steps,
+        insertion_sort,
+        insertion_sort_result,
+        insertion_sort_cost,
+    ),
+    "merge": Algorithm(
+        "merge",
+        MERGE_KINDS,
+        merge_sort_steps,
+        merge_sort,
+        merge_sort_result,
+        merge_sort_cost,
+    ),
+    "quick": Algorithm(
+        "quick",
+        quick.STEP_KINDS,
+        quick.quick_sort_steps,
+        quick.quick_sort,
+        quick.quick_sort_result,
+        quick.quick_sort_cost,
+        parse_options=quick.parse_options,
+        reproducible=quick.is_reproducible,
+    ),
+}
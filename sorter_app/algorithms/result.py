@@ -0,0 +1,22 @@
+from typing import Any, Dict, List, NamedTuple
+
+
+class SortResult(NamedTuple):
+    """
+    Outcome of an untraced sort: the sorted array plus operation counters.
+      comparisons: element comparisons performed
+      swaps:       element exchanges
+      writes:      stores into the array (a swap counts as two)
+    """
+
+    array: List[Any]
+    comparisons: int = 0
+    swaps: int = 0
+    writes: int = 0
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            "comparisons": self.comparisons,
+            "swaps": self.swaps,
+            "writes": self.writes,
+        }
@@ -0,0 +1,396 @@
+from array import array
+from collections.abc import Sequence as SequenceABC
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableSequence,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+Number = Union[int, float]
+
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+# largest integer a double still represents exactly
+FLOAT_EXACT_INT = 2**53
+
+
+class StepKind(NamedTuple):
+    """
+    Describes how one opcode of a trace expands back into a step dict.
+
+    Tracers yield raw records shaped (op, *fields) or (op, *fields, value);
+    the kind at index 'op' tells how to read them:
+
+      type:   value of the "type" key (None for steps without one, e.g. bubble)
+      fields: names of the integer arguments, in column order
+      value:  name of the key holding an array element, if the step has one
+      extra:  constant (key, value) pairs appended to every step of this kind
+      effect: how the step changes the array being sorted, if it does:
+                "swap"  - swap the elements at fields[0] and fields[1]
+                "copy"  - copy the element at fields[0] over fields[1]
+                "write" - store the step's value at fields[0]
+    """
+
+    type: Optional[str]
+    fields: Tuple[str, ...] = ()
+    value: Optional[str] = None
+    extra: Tuple[Tuple[str, Any], ...] = ()
+    effect: Optional[str] = None
+
+    def as_dict(self, record: Sequence[Any]) -> Dict[str, Any]:
+        """Expand a raw record (op, *fields[, value]) into its step dict."""
+        step: Dict[str, Any] = {}
+        if self.type is not None:
+            step["type"] = self.type
+        for offset, name in enumerate(self.fields, start=1):
+            step[name] = record[offset]
+        if self.value is not None:
+            step[self.value] = record[len(self.fields) + 1]
+        step.update(self.extra)
+        return step
+
+
+def apply_record(arr: MutableSequence[Any], kind: StepKind, record: Sequence[Any]):
+    """Apply the effect of one raw record to 'arr' in place."""
+    effect = kind.effect
+    if effect == "swap":
+        i, j = record[1], record[2]
+        arr[i], arr[j] = arr[j], arr[i]
+    elif effect == "copy":
+        arr[record[2]] = arr[record[1]]
+    elif effect == "write":
+        arr[record[1]] = record[len(kind.fields) + 1]
+
+
+class KeyframeRecorder:
+    """
+    Follows a stream of records on its own copy of the array and takes a
+    full snapshot every 'every' steps, so any state can later be rebuilt by
+    replaying at most 'every' steps from the nearest snapshot.
+    """
+
+    def __init__(self, kinds: Sequence[StepKind], initial: Sequence[Any], every: int):
+        if every <= 0:
+            raise ValueError("keyframe interval must be positive")
+        self.kinds = tuple(kinds)
+        self.every = every
+        self.shadow = list(initial)
+        self.seen = 0
+
+    def observe(self, record: Sequence[Any]) -> Optional[List[Any]]:
+        """
+        Account for the next record. Returns the array state just before it
+        when a keyframe falls on this step, otherwise None.
+        """
+        snapshot = None
+        if self.seen % self.every == 0:
+            snapshot = list(self.shadow)
+        apply_record(self.shadow, self.kinds[record[0]], record)
+        self.seen += 1
+        return snapshot
+
+
+class StepBudgetExceeded(Exception):
+    """Raised when a tracer produces more steps than it was allowed to."""
+
+    def __init__(self, max_steps: int):
+        super().__init__(f"trace exceeds the budget of {max_steps} steps")
+        self.max_steps = max_steps
+
+    def __reduce__(self):
+        # keep max_steps when raised in a worker process
+        return type(self), (self.max_steps,)
+
+
+def limit_steps(
+    records: Iterable[Sequence[Any]], max_steps: int
+) -> Iterator[Sequence[Any]]:
+    """
+    Pass records through, raising StepBudgetExceeded as soon as a record
+    beyond 'max_steps' is produced. The tracer is abandoned at that point,
+    so no further CPU or memory is spent on it.
+    """
+    for count, record in enumerate(records, start=1):
+        if count > max_steps:
+            raise StepBudgetExceeded(max_steps)
+        yield record
+
+
+def report_progress(
+    records: Iterable[Sequence[Any]], callback: Callable[[int], None], every: int
+) -> Iterator[Sequence[Any]]:
+    """
+    Pass records through, calling callback(steps so far) every 'every'
+    steps and once at the end. An exception raised by the callback stops
+    the tracer, which makes it a cancellation point too.
+    """
+    count = 0
+    for count, record in enumerate(records, start=1):
+        if count % every == 0:
+            callback(count)
+        yield record
+    callback(count)
+
+
+def value_typecode(values: Sequence[Any]) -> Optional[str]:
+    """
+    Pick the array typecode able to hold every element of 'values' exactly:
+    'q' for 64-bit ints, 'd' once floats are involved, None when neither fits
+    (bools, huge ints...) and the values have to be kept as Python objects.
+    """
+    if isinstance(values, array) and values.typecode in ("q", "d"):
+        return values.typecode
+    typecode = "q"
+    has_large_int = False
+    for x in values:
+        if type(x) is float:
+            typecode = "d"
+        elif type(x) is int and INT64_MIN <= x <= INT64_MAX:
+            if not has_large_int and abs(x) > FLOAT_EXACT_INT:
+                has_large_int = True
+        else:
+            return None
+    if typecode == "d" and has_large_int:
+        return None
+    return typecode
+
+
+def working_copy(values: Sequence[Any]) -> MutableSequence[Any]:
+    """
+    The list a tracer sorts. Typed buffers (see services/ingest.py) are
+    unpacked too: indexing an array boxes a new int or float on every read,
+    which made the sorts about 1.5-2x slower than on a list, for a copy that
+    only lives as long as the sort.
+    """
+    if isinstance(values, array):
+        return values.tolist()
+    return list(values)
+
+
+class Trace(SequenceABC):
+    """
+    Column-oriented container for the steps recorded by a sorting tracer.
+
+    Instead of one dict per step, a trace keeps:
+      - ops:    one opcode byte per step (index into 'kinds')
+      - args:   'arity' int32 slots per step for the integer fields
+      - values: one array element per step, only if some kind carries a value
+
+    Indexing or iterating yields the same dicts the tracers used to build,
+    created lazily, so existing callers keep working unchanged.
+
+    Build one by feeding it the records of a step generator:
+        trace = Trace(STEP_KINDS)
+        trace.extend(bubble_sort_steps(array))
+
+    When given the 'initial' array, the trace can rebuild the array state at
+    any step (state_at). With 'keyframe_every' > 0 it also stores a full
+    snapshot every that many steps, so seeking only replays a short tail.
+
+    With 'sample_every' = N only every N-th step is stored (steps 0, N, 2N...);
+    'total_steps' still counts all of them and keyframes keep their original
+    step numbers, so a client can resynchronize at each keyframe.
+    """
+
+    __slots__ = (
+        "kinds",
+        "arity",
+        "ops",
+        "args",
+        "values",
+        "typecode",
+        "initial",
+        "keyframe_every",
+        "keyframes",
+        "sample_every",
+        "total_steps",
+        "_widths",
+        "_recorder",
+    )
+
+    def __init__(
+        self,
+        kinds: Sequence[StepKind],
+        typecode: Optional[str] = "q",
+        initial: Optional[Sequence[Any]] = None,
+        keyframe_every: int = 0,
+        sample_every: int = 1,
+    ):
+        self.kinds = tuple(kinds)
+        self._widths = tuple(len(kind.fields) for kind in self.kinds)
+        self.arity = max(self._widths, default=0)
+        self.ops = array("B")
+        self.args = array("i")
+        self.typecode = typecode
+        self.values: Any = None
+        if any(kind.value is not None for kind in self.kinds):
+            # fall back to a plain list for values no typecode can hold
+            self.values = self._buffer(())
+
+        self.initial = None if initial is None else self._buffer(initial)
+        if sample_every < 1:
+            raise ValueError("sample interval must be at least 1")
+        self.sample_every = sample_every
+        self.total_steps = 0
+        self.keyframe_every = keyframe_every
+        self.keyframes: Dict[int, Any] = {}
+        self._recorder: Optional[KeyframeRecorder] = None
+        if keyframe_every:
+            if initial is None:
+                raise ValueError("keyframes need the initial array")
+            self._recorder = KeyframeRecorder(self.kinds, initial, keyframe_every)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the columns pickle as raw bytes; the recorder is only needed while
+        # recording and would drag a full copy of the array along
+        return {
+            slot: getattr(self, slot) for slot in self.__slots__ if slot != "_recorder"
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        self._recorder = None
+
+    def _buffer(self, values: Iterable[Any]) -> Any:
+        return array(self.typecode, values) if self.typecode else list(values)
+
+    def append(self, record: Sequence[Any]) -> None:
+        """Add one raw record: (op, *fields) or (op, *fields, value)."""
+        self.extend((record,))
+
+    def _store(self, record: Sequence[Any]) -> None:
+        op = record[0]
+        width = self._widths[op]
+        self.ops.append(op)
+        args = self.args
+        args.extend(record[1 : width + 1])
+        for _ in range(self.arity - width):
+            args.append(0)
+        if self.values is not None:
+            self.values.append(record[width + 1] if len(record) > width + 1 else 0)
+
+    def extend(self, records: Iterable[Sequence[Any]]) -> None:
+        recorder = self._recorder
+        store = self._store
+        if recorder is None and self.sample_every == 1:
+            # common case: keep every step, nothing else to track
+            try:
+                for record in records:
+                    store(record)
+            finally:
+                self.total_steps = len(self.ops)
+            return
+
+        every = self.sample_every
+        for record in records:
+            index = self.total_steps
+            if recorder is not None:
+                snapshot = recorder.observe(record)
+                if snapshot is not None:
+                    self.keyframes[index] = self._buffer(snapshot)
+            if index % every == 0:
+                store(record)
+            self.total_steps = index + 1
+
+    def state_at(self, step: int) -> List[Any]:
+        """
+        Array state after the first 'step' steps have been applied
+        (0 is the initial array, len(trace) the sorted one).
+        """
+        if not 0 <= step <= self.total_steps:
+            raise IndexError("step out of range")
+        if self.initial is None:
+            raise ValueError("trace was recorded without its initial array")
+        if self.sample_every > 1:
+            # the steps between samples are gone, only snapshots are exact
+            if step in self.keyframes:
+                return list(self.keyframes[step])
+            raise ValueError("a sampled trace only knows the state at keyframes")
+
+        start, base = 0, self.initial
+        if self.keyframes:
+            every = self.keyframe_every
+            last = (len(self) - 1) // every * every
+            start = min(step // every * every, last)
+            base = self.keyframes[start]
+
+        arr = list(base)
+        kinds = self.kinds
+        for index in range(start, step):
+            apply_record(arr, kinds[self.ops[index]], self.record_at(index))
+        return arr
+
+    def record_at(self, index: int) -> Tuple[Any, ...]:
+        """Rebuild the raw record stored at 'index'."""
+        op = self.ops[index]
+        base = index * self.arity
+        fields = tuple(self.args[base : base + self._widths[op]])
+        if self.kinds[op].value is not None:
+            return (op, *fields, self.values[index])
+        return (op, *fields)
+
+    def records(self) -> Iterator[Tuple[Any, ...]]:
+        """Iterate over the raw records, as the tracer originally yielded them."""
+        for index in range(len(self.ops)):
+            yield self.record_at(index)
+
+    def step(self, index: int) -> Dict[str, Any]:
+        """Build the dict view of the step at 'index'."""
+        return self.kinds[self.ops[index]].as_dict(self.record_at(index))
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the step columns and snapshots."""
+        size = len(self.ops) * self.ops.itemsize + len(self.args) * self.args.itemsize
+        buffers = [self.values, self.initial, *self.keyframes.values()]
+        for buffer in buffers:
+            if isinstance(buffer, array):
+                size += len(buffer) * buffer.itemsize
+            elif buffer is not None:
+                size += len(buffer) * 8  # one pointer per value
+        return size
+
+    # ---------------------------
+    # Sequence protocol
+    # ---------------------------
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __getitem__(self, index):  # type: ignore[override]
+        if isinstance(index, slice):
+            return [self.step(k) for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("trace index out of range")
+        return self.step(index)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self.ops)):
+            yield self.step(index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (Trace, list)):
+            return len(self) == len(other) and all(
+                mine == theirs for mine, theirs in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Trace(steps={len(self)}, nbytes={self.nbytes})"
@@ -1,15 +1,53 @@
 from flask import Flask, render_template  # type: ignore
+from routes import sorting_routes
 from routes.sorting_routes import sorting_blueprint
+from routes.batch_routes import batch_blueprint
+from routes.jobs_routes import jobs_blueprint
 from routes.upload_routes import upload_blueprint
 from routes.data_structures_routes import ds_blueprint
+from services.compression import install_compression
+from services.executor import TraceExecutor
+from services.metrics import Metrics, install_metrics
+from services.profiling import install_profiling, profiling_settings
+from services.request_log import RequestLogWriter, install_request_log
+import os
 import random
 
 app = Flask(__name__)
 
 app.register_blueprint(sorting_blueprint)
+app.register_blueprint(batch_blueprint)
+app.register_blueprint(jobs_blueprint)
 app.register_blueprint(upload_blueprint)
 app.register_blueprint(ds_blueprint)
 
+# request counts, latency and size histograms at GET /metrics
+install_metrics(app, Metrics())
+
+# set SORTER_PROCESSES=<n> (or "auto" for one per core) to run the tracers
+# in a process pool, and SORT_TRACE_TIMEOUT to bound each trace in seconds
+if os.environ.get("SORTER_PROCESSES"):
+    processes = os.environ["SORTER_PROCESSES"]
+    sorting_routes.trace_executor = TraceExecutor(
+        processes=None if processes == "auto" else int(processes)
+    )
+if os.environ.get("SORT_TRACE_TIMEOUT"):
+    app.config["SORT_TRACE_TIMEOUT"] = float(os.environ["SORT_TRACE_TIMEOUT"])
+
+# set SORTER_REQUEST_LOG=requests.jsonl to log every request as a JSON line
+if os.environ.get("SORTER_REQUEST_LOG"):
+    install_request_log(app, RequestLogWriter(os.environ["SORTER_REQUEST_LOG"]))
+
+# set SORTER_PROFILE_DIR to profile a SORTER_PROFILE_RATE fraction of the
+# requests, and those sent with 'X-Profile: <SORTER_PROFILE_SECRET>' if set
+profiling = profiling_settings(os.environ)
+if profiling:
+    install_profiling(app, **profiling)
+
+# gzip / deflate for the sort and data structure routes; installed last so
+# that the hooks above see the compressed bodies
+install_compression(app, blueprints=("sorting", "batch", "jobs", "ds"))
+
 
 @app.route("/")
 def index():
@@ -0,0 +1,208 @@
+import time
+from flask import Blueprint, current_app, request  # type: ignore
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from algorithms.registry import ALGORITHMS, Algorithm
+from algorithms.trace import StepBudgetExceeded
+from routes import sorting_routes
+from routes.sorting_routes import (
+    SortRequest,
+    _admission_error,
+    _budget_error,
+    _capped,
+    _check_budget,
+    _collect_options,
+    _executor_error,
+    _max_response_bytes,
+    _max_steps,
+    _parse_request,
+    _predicted_cost,
+    _trace,
+    _trace_body,
+    _trace_key,
+    _untraced_body,
+)
+from services.executor import ExecutorBusy, TraceHandle, TraceTimeout
+from services.request_log import elapsed_ms, note
+from services.serializer import jsonify
+from services.trace_cache import CacheKey
+
+# A Blueprint is like a mini app we can plug into the main Flask app
+# a way to organize flask routes into reusable modules
+batch_blueprint = Blueprint("batch", __name__)
+
+# most jobs one /sort/batch request may carry
+MAX_BATCH_JOBS = 1000
+
+
+def _error_item(error: Any) -> Dict[str, Any]:
+    """An error response of a single job as one entry of a batch result."""
+    response, status = error
+    return {**response.get_json(), "status": int(status)}
+
+
+def _parse_batch_job(
+    job: Any,
+) -> Tuple[Optional[Algorithm], Optional[SortRequest], Any]:
+    """Return (algorithm, SortRequest, None) for a valid job, else (..., error)."""
+    if not isinstance(job, dict):
+        return None, None, (
+            jsonify({"error": "Every job must be an object."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    algorithm = ALGORITHMS.get(job.get("algorithm"))
+    if algorithm is None:
+        return None, None, (
+            jsonify({"error": f"'algorithm' must be one of {', '.join(ALGORITHMS)}."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    options = job.get("options", {})
+    if not isinstance(options, dict):
+        return algorithm, None, (
+            jsonify({"error": "'options' must be an object."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    req, error = _parse_request(algorithm, {**options, "array": job.get("array")})
+    return algorithm, req, error
+
+
+def _trace_batch(jobs: List[Tuple[Algorithm, SortRequest]]) -> List[Any]:
+    """
+    Trace every job, each outcome being its Trace or the exception that
+    stopped it. With a process pool, every job missing from the cache is
+    submitted before any is waited for, so they all run side by side.
+    """
+    errors = (StepBudgetExceeded, TraceTimeout, ExecutorBusy)
+    outcomes: List[Any] = []
+    if sorting_routes.trace_executor is None:
+        for algorithm, req in jobs:
+            try:
+                outcomes.append(_trace(algorithm, req))
+            except errors as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    timeout = current_app.config.get("SORT_TRACE_TIMEOUT")
+    pending: List[Tuple[Optional[CacheKey], Any]] = []
+    for algorithm, req in jobs:
+        key = _trace_key(algorithm, req)
+        cached = sorting_routes.trace_cache.get(key) if key else None
+        if cached is not None:
+            pending.append((key, cached))
+            continue
+        try:
+            handle = sorting_routes.trace_executor.submit(
+                algorithm.name, req.array, timeout, **_collect_options(req)
+            )
+        except ExecutorBusy as exc:
+            handle = exc
+        pending.append((key, handle))
+
+    for (algorithm, req), (key, outcome) in zip(jobs, pending):
+        try:
+            if isinstance(outcome, Exception):
+                raise outcome
+            if isinstance(outcome, TraceHandle):
+                trace = outcome.result()
+                if key is not None:
+                    sorting_routes.trace_cache.put(key, trace)
+            else:
+                trace = outcome
+            outcomes.append(_check_budget(req, trace))
+        except errors as exc:
+            outcomes.append(exc)
+    return outcomes
+
+
+def _batch_budget_error(predicted: Dict[str, Any], max_steps: int) -> Any:
+    """413 for a job predicted to need more steps than the batch has left."""
+    if predicted["steps"] <= max_steps:
+        return None
+    body = {
+        "error": "Batch exceeds its step budget; retry this job on its own.",
+        "estimate": predicted,
+        "max_steps": max_steps,
+    }
+    return jsonify(body), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+@batch_blueprint.post("/sort/batch")
+def sort_batch():
+    """
+    Expect JSON: { "jobs": [ { "algorithm": "bubble", "array": [numbers...],
+                               "options": {...} }, ... ] }
+    where "options" holds what a /sort/<algorithm> body may hold besides
+    "array": "mode", "sample", "keyframe_every", "max_steps", pivot...
+    (?mode=... applies to every job).
+    Return: { "results": [...] }, one entry per job in order: the body
+    /sort/<algorithm> would have returned, or { "error", "status", ... } for
+    a job that was refused or failed on its own.
+
+    The jobs share one SORT_MAX_STEPS budget, charged with each job's
+    predicted steps in job order (untraced modes included), and the traces
+    one SORT_MAX_RESPONSE_BYTES budget; a job that no longer fits is refused
+    with 413. With a process pool the traces are generated concurrently.
+    """
+    data = request.get_json(silent=True) or {}
+    jobs = data.get("jobs")
+    if not isinstance(jobs, list):
+        return (
+            jsonify({"error": "Body must include 'jobs' as a JSON list."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    if len(jobs) > MAX_BATCH_JOBS:
+        return (
+            jsonify({"error": f"A batch may hold at most {MAX_BATCH_JOBS} jobs."}),
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+
+    started = time.perf_counter()
+    max_bytes = _max_response_bytes()
+    # the whole batch gets the step budget of a single request
+    max_steps = _max_steps()
+    results: List[Any] = [None] * len(jobs)
+    traced: List[Tuple[int, Algorithm, SortRequest]] = []
+    input_len = 0
+    for index, job in enumerate(jobs):
+        algorithm, req, error = _parse_batch_job(job)
+        if error:
+            results[index] = _error_item(error)
+            continue
+        input_len += len(req.array)
+        predicted = _predicted_cost(algorithm, req)
+        error = _admission_error(algorithm, req, max_bytes, predicted)
+        if error is None and max_steps is not None:
+            error = _batch_budget_error(predicted, max_steps)
+        if error:
+            results[index] = _error_item(error)
+            continue
+        if max_steps is not None:
+            # an estimate may fall short: the job also stops at what is left
+            req = req._replace(max_steps=_capped(req.max_steps, max_steps))
+            max_steps -= predicted["steps"]
+        if req.mode != "trace":
+            results[index] = _untraced_body(algorithm, req)
+            continue
+        if max_bytes is not None:
+            max_bytes -= predicted["bytes"]
+        traced.append((index, algorithm, req))
+
+    outcomes = _trace_batch([(algorithm, req) for _, algorithm, req in traced])
+    steps = 0
+    for (index, algorithm, req), outcome in zip(traced, outcomes):
+        if isinstance(outcome, StepBudgetExceeded):
+            status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+            results[index] = {**_budget_error(outcome), "status": int(status)}
+        elif isinstance(outcome, Exception):
+            results[index] = _error_item(_executor_error(outcome))
+        else:
+            steps += outcome.total_steps
+            results[index] = _trace_body(algorithm.name, req, outcome)
+    note(input_len=input_len, steps=steps, compute_ms=elapsed_ms(started))
+
+    started = time.perf_counter()
+    response = jsonify({"results": results})
+    note(serialize_ms=elapsed_ms(started))
+    return response, HTTPStatus.OK
+
+
@@ -1,9 +1,11 @@
-from flask import Blueprint, jsonify, request  # type: ignore
+from flask import Blueprint, request  # type: ignore
 from typing import Any, Dict
 from http import HTTPStatus
 from data_structures.stack import push_value, pop_value
 from data_structures.queue import enqueue, dequeue
 from data_structures.linked_list import insert_at, delete_at
+from services.request_log import note
+from services.serializer import jsonify
 
 ds_blueprint = Blueprint("ds", __name__)
 
@@ -16,6 +18,7 @@ def ds_stack():
 
     if not isinstance(state, list):
         return jsonify({"error": "'state' must be a list"}), HTTPStatus.BAD_REQUEST
+    note(input_len=len(state))
 
     if action == "push":
         value = data.get("value")
@@ -25,6 +28,7 @@ def ds_stack():
                 HTTPStatus.BAD_REQUEST,
             )
         steps, new_state = push_value(state, value)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
@@ -38,6 +42,7 @@ def ds_stack():
         )
     elif action == "pop":
         steps, new_state = pop_value(state)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
@@ -61,6 +66,7 @@ def ds_queue():
 
     if not isinstance(state, list):
         return jsonify({"error": "'state' must be a list"}), HTTPStatus.BAD_REQUEST
+    note(input_len=len(state))
 
     if action == "enqueue":
         value = data.get("value")
@@ -70,6 +76,7 @@ def ds_queue():
                 HTTPStatus.BAD_REQUEST,
             )
         steps, new_state = enqueue(state, value)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
@@ -83,6 +90,7 @@ def ds_queue():
         )
     elif action == "dequeue":
         steps, new_state = dequeue(state)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
@@ -107,6 +115,7 @@ def ds_linked_list():
 
     if not isinstance(state, list):
         return jsonify({"error": "'state' must be a list"}), HTTPStatus.BAD_REQUEST
+    note(input_len=len(state))
     if not isinstance(index, int):
         return jsonify({"error": "'index' must be int"}), HTTPStatus.BAD_REQUEST
 
@@ -118,6 +127,7 @@ def ds_linked_list():
                 HTTPStatus.BAD_REQUEST,
             )
         steps, new_state = insert_at(state, index, value)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
@@ -131,6 +141,7 @@ def ds_linked_list():
         )
     elif action == "delete_at":
         steps, new_state = delete_at(state, index)
+        note(steps=len(steps))
         return (
             jsonify(
                 {
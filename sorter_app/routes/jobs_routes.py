@@ -0,0 +1,188 @@
+from flask import Blueprint, current_app, request  # type: ignore
+from http import HTTPStatus
+from algorithms.cost import step_json_bytes
+from algorithms.registry import ALGORITHMS, Algorithm
+from routes import sorting_routes
+from routes.sorting_routes import (
+    SortRequest,
+    _admission_error,
+    _collect_options,
+    _max_response_bytes,
+    _parse_request,
+    _trace_body,
+)
+from services.datasets import make_dataset
+from services.jobs import DONE, Job, JobCancelled, JobQueue, JobQueueFull
+from services.serializer import jsonify
+
+# A Blueprint is like a mini app we can plug into the main Flask app
+# a way to organize flask routes into reusable modules
+jobs_blueprint = Blueprint("jobs", __name__)
+
+# step cap of background jobs, which may run far longer than a request;
+# the app can override it with app.config["SORT_JOB_MAX_STEPS"]
+DEFAULT_JOB_MAX_STEPS = 50_000_000
+
+# background sort jobs submitted through /jobs
+job_queue = JobQueue()
+
+# how often a job waiting on the process pool publishes its progress
+JOB_POLL_SECONDS = 0.2
+
+
+def _run_job(algorithm: Algorithm, req: SortRequest, job: Job) -> None:
+    """
+    Trace in a worker thread (or, with a process pool, wait there for the
+    pool), keeping the result pageable by id. The trace lives in trace_store,
+    bounded in bytes; the job only keeps its id, so finished jobs waiting to
+    be forgotten hold no trace memory.
+    """
+    options = _collect_options(req)
+    if sorting_routes.trace_executor is None:
+        trace = algorithm.collect(req.array, progress=job.report, **options)
+    else:
+        handle = sorting_routes.trace_executor.submit(
+            algorithm.name, req.array, **options
+        )
+        while not handle.wait(JOB_POLL_SECONDS):
+            try:
+                job.report(handle.progress())
+            except JobCancelled:
+                handle.cancel()
+                raise
+        trace = handle.result()
+    if trace.nbytes > sorting_routes.trace_store.max_bytes:
+        raise ValueError("Trace is too large to keep; retry with a 'sample' interval.")
+    job.info["trace_id"] = sorting_routes.trace_store.put(algorithm.name, trace)
+
+
+@jobs_blueprint.post("/jobs")
+def submit_job():
+    """
+    Expect JSON: { "algorithm": "bubble", "array": [numbers...] }
+    or, instead of "array", a generated "dataset":
+        { "kind": "random" | "sorted" | "reversed" | "nearly_sorted" |
+                  "few_unique", "size": n, "seed": s }
+    plus the options of /sort/<algorithm> ("keyframe_every", "sample",
+    "max_steps", pivot...) and an optional integer "priority" (lower first).
+
+    The trace is generated by a background worker; jobs are run in order of
+    (priority, predicted steps), so small jobs are not stuck behind big ones.
+    Return 202: { "id", "status", "progress", "estimated_steps", ... }
+    """
+    data = request.get_json(silent=True) or {}
+    name = data.get("algorithm")
+    if name not in ALGORITHMS:
+        return (
+            jsonify({"error": f"'algorithm' must be one of {', '.join(ALGORITHMS)}."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    algorithm = ALGORITHMS[name]
+    if "dataset" in data:
+        try:
+            data = {**data, "array": make_dataset(data["dataset"])}
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST
+    priority = data.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return (
+            jsonify({"error": "'priority' must be an integer."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+
+    step_cap = current_app.config.get("SORT_JOB_MAX_STEPS", DEFAULT_JOB_MAX_STEPS)
+    req, error = _parse_request(algorithm, data, step_cap)
+    if error:
+        return error
+    error = _admission_error(algorithm, req)
+    if error:
+        return error
+
+    estimate = algorithm.cost(req.array, **req.options)
+    try:
+        job = job_queue.submit(
+            lambda job: _run_job(algorithm, req, job),
+            priority=priority,
+            cost=estimate.steps,
+            algorithm=name,
+            options=req.options,
+            input_len=len(req.array),
+            estimated_steps=estimate.steps,
+        )
+    except JobQueueFull:
+        return (
+            jsonify({"error": "Too many jobs are waiting; retry later."}),
+            HTTPStatus.SERVICE_UNAVAILABLE,
+        )
+    return (
+        jsonify(job.to_dict()),
+        HTTPStatus.ACCEPTED,
+        {"Location": f"/jobs/{job.id}"},
+    )
+
+
+@jobs_blueprint.get("/jobs/<job_id>")
+def job_status(job_id: str):
+    """
+    Return: { "id", "algorithm", "options", "input_len", "status": queued |
+              running | done | failed | cancelled, "progress": steps
+              generated so far, "estimated_steps", "error", timestamps,
+              "trace_id": id for the /sort/<algorithm>/trace/<id> cursor
+                          API, once done }
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id."}), HTTPStatus.NOT_FOUND
+    return jsonify(job.to_dict()), HTTPStatus.OK
+
+
+@jobs_blueprint.get("/jobs/<job_id>/result")
+def job_result(job_id: str):
+    """
+    Return the same body as /sort/<algorithm> once the job is done (409
+    before, 410 once its trace expired from the store). A trace whose JSON
+    would exceed SORT_MAX_RESPONSE_BYTES is refused with 413 and its
+    "trace_url", to be paged through the cursor API instead.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id."}), HTTPStatus.NOT_FOUND
+    if job.status != DONE:
+        return (
+            jsonify({"error": f"Job is {job.status}.", "status": job.status}),
+            HTTPStatus.CONFLICT,
+        )
+    name, trace_id = job.info["algorithm"], job.info["trace_id"]
+    stored = sorting_routes.trace_store.get(trace_id)
+    if stored is None:
+        return jsonify({"error": "The job's trace has expired."}), HTTPStatus.GONE
+    # the job keeps no input; the stored trace has it and its settings
+    trace = stored.trace
+    req = SortRequest(
+        trace.initial,
+        job.info["options"],
+        keyframe_every=trace.keyframe_every,
+        sample_every=trace.sample_every,
+    )
+
+    max_bytes = _max_response_bytes()
+    size = len(trace) * step_json_bytes(trace.kinds, trace.initial)
+    if max_bytes is not None and size > max_bytes:
+        body = {
+            "error": "Trace is too large for one response; page through it "
+            "at 'trace_url'.",
+            "trace_id": trace_id,
+            "trace_url": f"/sort/{name}/trace/{trace_id}",
+            "max_bytes": max_bytes,
+        }
+        return jsonify(body), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    return jsonify(_trace_body(name, req, trace)), HTTPStatus.OK
+
+
+@jobs_blueprint.delete("/jobs/<job_id>")
+def cancel_job(job_id: str):
+    """Cancel a queued or running job. Return its status."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id."}), HTTPStatus.NOT_FOUND
+    return jsonify(job.to_dict()), HTTPStatus.OK
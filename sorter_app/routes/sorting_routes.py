@@ -1,96 +1,951 @@
-from flask import Blueprint, request, jsonify  # type: ignore
+import hashlib
+import time
+from flask import Blueprint, Response, current_app, request  # type: ignore
 from http import HTTPStatus
-from algorithms.bubble_sort import bubble_sort
-from algorithms.insertion_sort import insertion_sort
-from algorithms.merge_sort import merge_sort
-from algorithms.quick_sort import quick_sort
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from algorithms.cost import estimate_bytes
+from algorithms.registry import ALGORITHMS, Algorithm
+from algorithms.trace import (
+    KeyframeRecorder,
+    StepBudgetExceeded,
+    Trace,
+    limit_steps,
+    value_typecode,
+)
+from services.binary_trace import BINARY_MIMETYPE, can_encode, encode_trace
+from services.comparison import BASELINE, compare_algorithms, comparison_cost
+from services.executor import ExecutorBusy, TraceExecutor, TraceTimeout
+from services.ingest import Numbers, ingest_array
+from services.request_log import elapsed_ms, note, noted
+from services.serializer import JSON_MIMETYPE, dumps, jsonify, record_encoder
+from services.trace_cache import CacheKey, TraceCache, array_digest, cache_key
+from services.trace_store import TraceStore
 
 # A Blueprint is like a mini app we can plug into the main Flask app
 # a way to organize flask routes into reusable modules
 sorting_blueprint = Blueprint("sorting", __name__)
 
+NDJSON_MIMETYPE = "application/x-ndjson"
 
-@sorting_blueprint.post("/sort/bubble")
-def sort_bubble():
+# how many steps are serialized together into one chunk of a streamed body
+STREAM_CHUNK_STEPS = 1024
+
+# default and maximum page size of the trace cursor API
+DEFAULT_PAGE_LIMIT = 1000
+MAX_PAGE_LIMIT = 10000
+
+# stored traces keep a keyframe at least every this many steps by default
+MIN_STORED_KEYFRAME_EVERY = 1024
+
+# hard cap on the steps one request may generate; the app can override it
+# with app.config["SORT_MAX_STEPS"] (None disables the cap)
+DEFAULT_MAX_STEPS = 5_000_000
+
+# JSON traces predicted to be larger than this are refused before tracing;
+# the app can override it with app.config["SORT_MAX_RESPONSE_BYTES"]
+DEFAULT_MAX_RESPONSE_BYTES = 256 * 1024 * 1024
+
+# a sampled trace keeps a keyframe every this many samples by default
+SAMPLE_KEYFRAME_RATIO = 16
+
+# what a /sort/* request returns: the step trace (default), the sorted array
+# with operation counters, or the counters alone
+MODES = ("trace", "result", "counts")
+
+# traces created through /sort/<algorithm>/trace, paged by id
+trace_store = TraceStore()
+
+# finished traces of deterministic runs, keyed by algorithm and input content
+trace_cache = TraceCache()
+
+# when set (app.py does with SORTER_PROCESSES), tracers run in this process
+# pool instead of the request thread; the per-trace timeout in seconds comes
+# from app.config["SORT_TRACE_TIMEOUT"] (None: no timeout)
+trace_executor: Optional[TraceExecutor] = None
+
+# responses of reproducible runs carry an ETag derived from the request;
+# bump this when traces change for the same input, so that copies cached by
+# clients stop validating
+ETAG_VERSION = 1
+
+# media type of each representation a trace is sent in
+_MIMETYPES = {
+    "json": JSON_MIMETYPE,
+    "ndjson": NDJSON_MIMETYPE,
+    "binary": BINARY_MIMETYPE,
+}
+
+# response header holding the hash of the input array, for GET replays
+ARRAY_HASH_HEADER = "X-Array-Hash"
+
+# how long browsers and proxies may reuse a GET replay without revalidating;
+# the app can override it with app.config["SORT_CACHE_MAX_AGE"]
+DEFAULT_CACHE_MAX_AGE = 3600
+
+
+def _wants_stream() -> bool:
+    """A client asks for streaming with ?stream=1 or 'Accept: application/x-ndjson'."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _wants_binary() -> bool:
+    """A client asks for the packed trace with 'Accept: application/octet-stream'."""
+    best = request.accept_mimetypes.best_match(["application/json", BINARY_MIMETYPE])
+    return best == BINARY_MIMETYPE
+
+
+def _dumps(obj: Any) -> str:
+    return dumps(obj).decode("utf-8")
+
+
+class SortRequest(NamedTuple):
     """
-    Expect JSON: { "array": [numbers...] }
-    Return: { "algorithm": "bubble", "steps": [...] }
+    A validated /sort/* body:
+      array:   the numbers to sort, as ingest_array() buffers them
+      options: tracer-specific keyword arguments (e.g. quick sort's pivot)
+      keyframe_every: take an array snapshot every that many steps (0 = off)
+      sample_every:   keep only every N-th step (1 = keep all)
+      max_steps:      abort once more steps than this are generated
+      mode:           one of MODES
     """
-    data = request.get_json(silent=True) or {}
-    arr = data.get("array")
 
-    # Input validation
-    if not isinstance(arr, list):
+    array: Numbers
+    options: Dict[str, Any]
+    keyframe_every: int = 0
+    sample_every: int = 1
+    max_steps: Optional[int] = None
+    mode: str = "trace"
+
+
+def _stream_steps(
+    algorithm: Algorithm,
+    array: List[Any],
+    records: Iterable[Tuple[Any, ...]],
+    recorder: Optional[KeyframeRecorder] = None,
+    sample_every: int = 1,
+    fields: Optional[Dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    Produce the NDJSON body: a header line, then one line per step.
+    Steps are generated lazily and flushed every STREAM_CHUNK_STEPS steps,
+    so the whole trace never exists in memory at once.
+
+    With a KeyframeRecorder, a {"type": "keyframe", "step": k, "array": [...]}
+    line precedes every k-th step. With sample_every=N only every N-th step
+    is written. If the step budget runs out mid-stream, a final
+    {"error": ..., "max_steps": ...} line ends the body.
+
+    Once the body ends (or the client goes away) 'fields' is updated with
+    {"steps", "compute_ms", "serialize_ms"}: the steps generated, the time
+    spent generating them and the time spent encoding them.
+    """
+    encode = record_encoder(algorithm.kinds, array)
+    records = iter(records)
+    steps = 0
+    compute = serialize = 0.0
+    try:
+        yield _dumps({"algorithm": algorithm.name}) + "\n"
+        while True:
+            started = time.perf_counter()
+            batch: List[Tuple[Any, ...]] = []
+            error = None
+            try:
+                for record in records:
+                    batch.append(record)
+                    if len(batch) == STREAM_CHUNK_STEPS:
+                        break
+            except StepBudgetExceeded as exc:
+                error = exc
+            compute += time.perf_counter() - started
+
+            started = time.perf_counter()
+            chunk: List[str] = []
+            for index, record in enumerate(batch, start=steps):
+                if recorder is not None:
+                    snapshot = recorder.observe(record)
+                    if snapshot is not None:
+                        keyframe = dict(type="keyframe", step=index, array=snapshot)
+                        chunk.append(_dumps(keyframe))
+                if index % sample_every == 0:
+                    chunk.append(encode(record))
+            steps += len(batch)
+            if error is not None:
+                chunk.append(_dumps(_budget_error(error)))
+            text = "\n".join(chunk) + "\n" if chunk else ""
+            serialize += time.perf_counter() - started
+
+            if text:
+                yield text
+            if error is not None or len(batch) < STREAM_CHUNK_STEPS:
+                return
+    finally:
+        if fields is not None:
+            fields.update(
+                steps=steps,
+                compute_ms=round(compute * 1000, 3),
+                serialize_ms=round(serialize * 1000, 3),
+            )
+
+
+def _caching(
+    algorithm: Algorithm,
+    req: SortRequest,
+    key: CacheKey,
+    records: Iterable[Tuple[Any, ...]],
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Pass a stream's records through while recording them into a Trace, the
+    one _trace() would have built, and cache it once the tracer finishes.
+    Nothing is cached when the stream ends early (budget error, client gone);
+    recording stops once the trace outgrows the cache, so a stream's memory
+    stays bounded.
+    """
+    trace = Trace(
+        algorithm.kinds,
+        value_typecode(req.array),
+        initial=req.array,
+        keyframe_every=req.keyframe_every,
+        sample_every=req.sample_every,
+    )
+    records = iter(records)
+    for index, record in enumerate(records, start=1):
+        trace.append(record)
+        yield record
+        if index % STREAM_CHUNK_STEPS == 0 and trace.nbytes > trace_cache.max_bytes:
+            yield from records
+            return
+    trace_cache.put(key, trace)
+
+
+def _budget_error(exc: StepBudgetExceeded) -> Dict[str, Any]:
+    return {
+        "error": "Trace exceeds the step budget; retry with a 'sample' "
+        "interval or a smaller array.",
+        "max_steps": exc.max_steps,
+    }
+
+
+def _predicted_cost(algorithm: Algorithm, req: SortRequest) -> Dict[str, Any]:
+    """{"steps", "exact", "bytes"} of the trace, computed without tracing."""
+    estimate = algorithm.cost(req.array, **req.options)
+    return estimate_bytes(algorithm.kinds, req.array, estimate, req.sample_every)
+
+
+def _admission_error(
+    algorithm: Algorithm,
+    req: SortRequest,
+    max_bytes: Optional[int] = None,
+    predicted: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Check the predicted cost of a run before any sorting work starts.
+    Returns a 413 error response carrying the estimate when the prediction
+    exceeds req.max_steps or 'max_bytes' of JSON; else None. A traced run
+    is refused on exact predictions only, estimates are left to the budget
+    enforced while tracing; untraced modes have no such budget, so their
+    estimates are held to req.max_steps as well.
+    """
+    if predicted is None:
+        predicted = _predicted_cost(algorithm, req)
+    if req.mode != "trace":
+        if req.max_steps is None or predicted["steps"] <= req.max_steps:
+            return None
+        body: Dict[str, Any] = {
+            "error": "Predicted work exceeds the budget; retry with a smaller "
+            "array.",
+            "estimate": {"steps": predicted["steps"], "exact": predicted["exact"]},
+            "max_steps": req.max_steps,
+        }
+        return jsonify(body), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    over_steps = (
+        predicted["exact"]
+        and req.max_steps is not None
+        and predicted["steps"] > req.max_steps
+    )
+    over_bytes = max_bytes is not None and predicted["bytes"] > max_bytes
+    if not (over_steps or over_bytes):
+        return None
+
+    body = {
+        "error": "Predicted trace exceeds the budget; retry with a 'sample' "
+        "interval or a smaller array.",
+        "estimate": predicted,
+        "max_steps": req.max_steps,
+    }
+    if over_bytes and not over_steps:
+        # the step budget counts every step, only the bytes shrink by sampling
+        body["max_bytes"] = max_bytes
+        unsampled = predicted["bytes"] * req.sample_every
+        body["suggested_sample"] = -(-unsampled // max_bytes)
+    return jsonify(body), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def _executor_error(exc: Exception) -> Any:
+    if isinstance(exc, TraceTimeout):
         return (
-            jsonify({"error": "Body must include 'array' as a JSON list."}),
+            jsonify({"error": "Trace timed out.", "timeout": exc.timeout}),
+            HTTPStatus.GATEWAY_TIMEOUT,
+        )
+    return (
+        jsonify({"error": "All tracer workers are busy; retry later."}),
+        HTTPStatus.SERVICE_UNAVAILABLE,
+    )
+
+
+def _positive_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _max_steps() -> Optional[int]:
+    """The server-wide step cap of a request (None: uncapped)."""
+    return current_app.config.get("SORT_MAX_STEPS", DEFAULT_MAX_STEPS)
+
+
+def _max_response_bytes() -> Optional[int]:
+    """The largest JSON trace body a response may carry (None: unlimited)."""
+    return current_app.config.get(
+        "SORT_MAX_RESPONSE_BYTES", DEFAULT_MAX_RESPONSE_BYTES
+    )
+
+
+def _capped(value: Optional[int], cap: Optional[int]) -> Optional[int]:
+    """
+    A client-supplied limit under a server-wide 'cap': the cap always
+    applies, clients may only lower it. None when neither is set.
+    """
+    if cap is None:
+        return value
+    return min(value or cap, cap)
+
+
+def _keyframes_json(trace: Trace) -> List[Dict[str, Any]]:
+    return [
+        {"step": step, "array": list(snapshot)}
+        for step, snapshot in sorted(trace.keyframes.items())
+    ]
+
+
+def _ingest(arr: Any) -> Tuple[Optional[Numbers], Any]:
+    """
+    Return (buffer, None) with 'arr' validated and converted to the tracers'
+    typed buffer, or (None, error response). Booleans and NaN/infinities are
+    refused unless SORT_ALLOW_BOOLS / SORT_ALLOW_NAN are set.
+    """
+    try:
+        buffer = ingest_array(
+            arr,
+            allow_bools=current_app.config.get("SORT_ALLOW_BOOLS", False),
+            allow_nan=current_app.config.get("SORT_ALLOW_NAN", False),
+        )
+    except ValueError as exc:
+        return None, (jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST)
+    return buffer, None
+
+
+def _parse_request(
+    algorithm: Algorithm,
+    data: Optional[Dict[str, Any]] = None,
+    step_cap: Optional[int] = None,
+) -> Tuple[Optional[SortRequest], Any]:
+    """
+    Return (SortRequest, None) for a valid body, or (None, error response).
+    'data' defaults to the request's JSON body and 'step_cap' to the
+    server-wide SORT_MAX_STEPS.
+    """
+    if data is None:
+        data = request.get_json(silent=True) or {}
+
+    # Input validation
+    arr, error = _ingest(data.get("array"))
+    if error:
+        return None, error
+    keyframe_every = data.get("keyframe_every", 0)
+    if keyframe_every != 0 and not _positive_int(keyframe_every):
+        return None, (
+            jsonify({"error": "'keyframe_every' must be a non-negative integer."}),
             HTTPStatus.BAD_REQUEST,
         )
-    if not all(isinstance(x, (int, float)) for x in arr):
-        return (
-            jsonify({"error": "All elements in 'array' must be numbers."}),
+    sample_every = data.get("sample", 1)
+    if not _positive_int(sample_every):
+        return None, (
+            jsonify({"error": "'sample' must be a positive integer."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    max_steps = data.get("max_steps")
+    if max_steps is not None and not _positive_int(max_steps):
+        return None, (
+            jsonify({"error": "'max_steps' must be a positive integer."}),
             HTTPStatus.BAD_REQUEST,
         )
+    mode = request.args.get("mode") or data.get("mode", "trace")
+    if mode not in MODES:
+        return None, (
+            jsonify({"error": f"'mode' must be one of {', '.join(MODES)}."}),
+            HTTPStatus.BAD_REQUEST,
+        )
+    try:
+        options = algorithm.parse_options(data)
+    except ValueError as exc:
+        return None, (jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST)
+
+    max_steps = _capped(max_steps, _max_steps() if step_cap is None else step_cap)
+    if sample_every > 1 and not keyframe_every:
+        keyframe_every = sample_every * SAMPLE_KEYFRAME_RATIO
+    return (
+        SortRequest(arr, options, keyframe_every, sample_every, max_steps, mode),
+        None,
+    )
+
+
+def _trace_key(
+    algorithm: Algorithm, req: SortRequest, digest: Optional[str] = None
+) -> Optional[CacheKey]:
+    """
+    Cache key of this run, or None when its trace is not reproducible.
+    'digest' is the array's hash when already known.
+    """
+    if not algorithm.reproducible(**req.options):
+        return None
+    others = {k: v for k, v in req.options.items() if k != "seed"}
+    others["keyframe_every"] = req.keyframe_every
+    others["sample_every"] = req.sample_every
+    seed = req.options.get("seed")
+    return cache_key(algorithm.name, req.array, seed, others, digest)
+
+
+def _etag(key: Optional[CacheKey], req: SortRequest, representation: str) -> Any:
+    """
+    Validator of a response body, derived from the request alone so that it
+    is known before any tracing: the cache key (algorithm, array hash,
+    options), the mode, the step budget and the wire format. None when the
+    run is not reproducible.
+    """
+    if key is None:
+        return None
+    text = repr((ETAG_VERSION, key, req.mode, req.max_steps, representation))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _not_modified(etag: str, digest: str, representation: str) -> Response:
+    """
+    304 with the validator headers of the 200 it stands for. It keeps that
+    200's media type, so the compression hook weakens its ETag and adds
+    Vary: Accept-Encoding just as it does on the 200.
+    """
+    response = Response(
+        status=HTTPStatus.NOT_MODIFIED, mimetype=_MIMETYPES[representation]
+    )
+    return _validated(response, etag, digest)
+
+
+def _validated(response: Response, etag: Optional[str], digest: str) -> Response:
+    """Tag a response with its ETag and the X-Array-Hash of its input."""
+    response.headers[ARRAY_HASH_HEADER] = digest
+    if etag is not None:
+        response.set_etag(etag)
+        # the wire format depends on the Accept header
+        response.vary.add("Accept")
+    return response
+
+
+def _collect_options(req: SortRequest) -> Dict[str, Any]:
+    """Keyword arguments of Algorithm.collect (and TraceExecutor) for 'req'."""
+    return dict(
+        keyframe_every=req.keyframe_every,
+        sample_every=req.sample_every,
+        max_steps=req.max_steps,
+        **req.options,
+    )
+
+
+def _check_budget(req: SortRequest, trace: Trace) -> Trace:
+    # a cached trace may have been made under a larger budget
+    if req.max_steps is not None and trace.total_steps > req.max_steps:
+        raise StepBudgetExceeded(req.max_steps)
+    return trace
+
+
+def _trace(
+    algorithm: Algorithm, req: SortRequest, digest: Optional[str] = None
+) -> Trace:
+    """
+    Run the tracer, going through the cache when the result is reproducible.
+    Raises StepBudgetExceeded when the trace needs more than req.max_steps,
+    and with a process pool TraceTimeout or ExecutorBusy.
+    """
+
+    def run() -> Trace:
+        if trace_executor is not None:
+            return trace_executor.collect(
+                algorithm.name,
+                req.array,
+                timeout=current_app.config.get("SORT_TRACE_TIMEOUT"),
+                **_collect_options(req),
+            )
+        return algorithm.collect(req.array, **_collect_options(req))
+
+    key = _trace_key(algorithm, req, digest)
+    if key is None:
+        return run()
+    return _check_budget(req, trace_cache.get_or_create(key, run))
+
+
+def _trace_meta(name: str, req: SortRequest, trace: Trace) -> Dict[str, Any]:
+    """Everything of a trace body but its steps."""
+    meta: Dict[str, Any] = {"algorithm": name}
+    if req.sample_every > 1:
+        meta["sample"] = req.sample_every
+        meta["total_steps"] = trace.total_steps
+    if req.keyframe_every:
+        meta["keyframes"] = _keyframes_json(trace)
+    return meta
+
+
+def _trace_body(name: str, req: SortRequest, trace: Trace) -> Dict[str, Any]:
+    # the serializer writes the steps straight from the trace's columns
+    return {**_trace_meta(name, req, trace), "steps": trace}
+
+
+def _untraced_body(algorithm: Algorithm, req: SortRequest) -> Dict[str, Any]:
+    # untraced fast path: no steps are recorded at all
+    result = algorithm.result(req.array, **req.options)
+    body: Dict[str, Any] = {"algorithm": algorithm.name, "mode": req.mode}
+    if req.mode == "result":
+        body["array"] = result.array
+    body["counts"] = result.counts()
+    return body
+
+
+def _trace_response(name: str, req: SortRequest, trace: Trace, binary: bool):
+    started = time.perf_counter()
+    if binary:
+        response = Response(
+            encode_trace(trace, _trace_meta(name, req, trace)),
+            mimetype=BINARY_MIMETYPE,
+        )
+    else:
+        response = jsonify(_trace_body(name, req, trace))
+    note(serialize_ms=elapsed_ms(started))
+    return response
+
+
+def _run_sort(name: str):
+    algorithm = ALGORITHMS[name]
+    req, error = _parse_request(algorithm)
+    if error:
+        return error
+
+    note(algorithm=name, input_len=len(req.array))
+    streaming = _wants_stream()
+    # values no typecode holds (bools, huge ints) have no binary form
+    binary = (
+        not streaming and _wants_binary() and value_typecode(req.array) is not None
+    )
+    representation = "ndjson" if streaming else "binary" if binary else "json"
+
+    # identical requests are answered 304 before any tracing
+    digest = array_digest(req.array)
+    key = _trace_key(algorithm, req, digest)
+    etag = _etag(key, req, representation)
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return _not_modified(etag, digest, representation)
+
+    started = time.perf_counter()
+    if req.mode != "trace":
+        error = _admission_error(algorithm, req)
+        if error:
+            return error
+        body = _untraced_body(algorithm, req)
+        note(compute_ms=elapsed_ms(started))
+        return _validated(jsonify(body), etag, digest), HTTPStatus.OK
+
+    max_bytes = None
+    if not (streaming or binary):
+        # binary bodies take a few bytes per step, the step cap bounds them
+        max_bytes = _max_response_bytes()
+    error = _admission_error(algorithm, req, max_bytes)
+    if error:
+        return error
+
+    if streaming:
+        # replay a cached trace if there is one, otherwise trace lazily
+        cached = trace_cache.get(key) if key else None
+        if cached and cached.sample_every == 1:
+            records = cached.records()
+        else:
+            records = algorithm.steps(req.array, **req.options)
+            if key is not None and cached is None:
+                records = _caching(algorithm, req, key, records)
+        if req.max_steps is not None:
+            records = limit_steps(records, req.max_steps)
+        recorder = None
+        if req.keyframe_every:
+            recorder = KeyframeRecorder(
+                algorithm.kinds, req.array, req.keyframe_every
+            )
+        # the body runs after the request; it fills in the logged fields
+        body = _stream_steps(
+            algorithm, req.array, records, recorder, req.sample_every, noted()
+        )
+        response = Response(body, mimetype=NDJSON_MIMETYPE)
+        return _validated(response, etag, digest)
 
     # Perform sorting and return trace
-    steps = bubble_sort(arr)
-    return jsonify({"algorithm": "bubble", "steps": steps}), HTTPStatus.OK
+    try:
+        steps = _trace(algorithm, req, digest)
+    except StepBudgetExceeded as exc:
+        return jsonify(_budget_error(exc)), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    except (TraceTimeout, ExecutorBusy) as exc:
+        return _executor_error(exc)
+    note(steps=steps.total_steps, compute_ms=elapsed_ms(started))
+
+    response = _trace_response(name, req, steps, binary)
+    return _validated(response, etag, digest), HTTPStatus.OK
+
+
+@sorting_blueprint.post("/sort/bubble")
+def sort_bubble():
+    """
+    Expect JSON: { "array": [numbers...] }
+    Return: { "algorithm": "bubble", "steps": [...] }
+
+    With ?stream=1 (or 'Accept: application/x-ndjson') the trace is streamed
+    as NDJSON instead: a {"algorithm": ...} line followed by one step per line.
+    With 'Accept: application/octet-stream' it is sent packed, a few bytes
+    per step (see services/binary_trace.py), unless the array holds values
+    no int64 / float64 represents.
+
+    Optional "keyframe_every": k adds "keyframes": [{"step", "array"}, ...],
+    the array state before every k-th step.
+
+    Optional "max_steps": N aborts with 413 once the trace needs more than N
+    steps (the server cap, SORT_MAX_STEPS, applies regardless). Optional
+    "sample": N returns only every N-th step plus "total_steps" and keyframes
+    (every 16 samples unless "keyframe_every" says otherwise).
+
+    Each trace's cost is predicted from the array before any tracing. When
+    the exact step count (bubble, insertion) exceeds the step budget, or the
+    JSON body would exceed SORT_MAX_RESPONSE_BYTES, the request is refused
+    with 413 and an "estimate": {"steps", "exact", "bytes"} (plus a
+    "suggested_sample" when sampling would bring the body within budget).
+
+    Reproducible runs (all but unseeded random pivots) answer with an ETag
+    known before tracing, so a request sent with a matching If-None-Match
+    gets 304 without any tracing or serialization. X-Array-Hash names the
+    input for GET /sort/<algorithm>/array/<hash> replays.
+
+    "mode" (body or query string) skips the trace entirely:
+      result -> { "algorithm", "mode", "array": sorted, "counts": {...} }
+      counts -> { "algorithm", "mode", "counts": {...} }
+    where counts holds "comparisons", "swaps" and "writes". Nothing stops an
+    untraced run midway, so one whose predicted steps (estimates included)
+    exceed the step budget is refused up front with 413.
+
+    This applies to every /sort/* route.
+    """
+    return _run_sort("bubble")
 
 
 @sorting_blueprint.post("/sort/insertion")
 def sort_insertion():
+    return _run_sort("insertion")
+
+
+@sorting_blueprint.post("/sort/merge")
+def sort_merge():
+    return _run_sort("merge")
+
+
+@sorting_blueprint.post("/sort/quick")
+def sort_quick():
+    """
+    Also accepts "pivot" (first | random | median3 | ninther, default random)
+    and "seed" (int) in the body; seeded or non-random runs are reproducible.
+    """
+    return _run_sort("quick")
+
+
+@sorting_blueprint.post("/sort/compare")
+def sort_compare():
+    """
+    Expect JSON: { "array": [numbers...], "algorithms": [names...] (optional) }
+    plus any quick sort options ("pivot", "seed", "partition").
+    Runs every algorithm untraced and the built-in sorted as a baseline.
+    Return: { "n": len(array), "results": [
+        { "algorithm", "comparisons", "swaps", "writes", "time_ms",
+          "peak_bytes" }, ... ], "skipped": [...] }
+
+    Each algorithm's steps are predicted first; those over the step budget
+    (SORT_MAX_STEPS, or a lower "max_steps" in the body) are not run but
+    listed in "skipped" as { "algorithm", "estimate": {"steps", "exact"} }.
+    """
     data = request.get_json(silent=True) or {}
-    arr = data.get("array")
+    arr, error = _ingest(data.get("array"))
+    if error:
+        return error
 
-    if not isinstance(arr, list):
+    names = data.get("algorithms", [*ALGORITHMS, BASELINE])
+    known = {*ALGORITHMS, BASELINE}
+    if not isinstance(names, list) or not all(name in known for name in names):
         return (
-            jsonify({"error": "Body must include 'array' as a JSON list."}),
+            jsonify({"error": f"'algorithms' must list names from {sorted(known)}."}),
             HTTPStatus.BAD_REQUEST,
         )
-    if not all(isinstance(x, (int, float)) for x in arr):
+    max_steps = data.get("max_steps")
+    if max_steps is not None and not _positive_int(max_steps):
         return (
-            jsonify({"error": "All elements in 'array' must be numbers."}),
+            jsonify({"error": "'max_steps' must be a positive integer."}),
             HTTPStatus.BAD_REQUEST,
         )
+    try:
+        options = {
+            name: ALGORITHMS[name].parse_options(data)
+            for name in names
+            if name in ALGORITHMS
+        }
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST
 
-    steps = insertion_sort(arr)
-    return jsonify({"algorithm": "insertion", "steps": steps}), HTTPStatus.OK
+    max_steps = _capped(max_steps, _max_steps())
+    runnable, skipped = [], []
+    for name in names:
+        estimate = comparison_cost(name, arr, options.get(name))
+        if max_steps is not None and estimate.steps > max_steps:
+            skipped.append({"algorithm": name, "estimate": estimate._asdict()})
+        else:
+            runnable.append(name)
 
+    results = compare_algorithms(arr, runnable, options)
+    body = {"n": len(arr), "results": results, "skipped": skipped}
+    return jsonify(body), HTTPStatus.OK
+
+
+# ---------------------------
+# replay by array hash
+# ---------------------------
+
+
+def _query_body() -> Dict[str, Any]:
+    """The query string as a /sort/* body, with integers converted."""
+    body: Dict[str, Any] = {}
+    for name, value in request.args.items():
+        try:
+            body[name] = int(value)
+        except ValueError:
+            body[name] = value
+    return body
+
+
+def _cacheable(response: Response) -> Response:
+    """Let browsers and proxies reuse a GET replay (or its 304) for a while."""
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config.get(
+        "SORT_CACHE_MAX_AGE", DEFAULT_CACHE_MAX_AGE
+    )
+    return response
 
-@sorting_blueprint.post("/sort/merge")
-def sort_merge():
-    data = request.get_json(silent=True) or {}
-    arr = data.get("array")
 
-    if not isinstance(arr, list):
+@sorting_blueprint.get("/sort/<name>/array/<digest>")
+def replay_by_hash(name: str, digest: str):
+    """
+    Return the trace of an array sorted before, addressed by the hash that
+    its POST response carried in X-Array-Hash. The query string holds the
+    options of the body (?sample=10&keyframe_every=64&seed=1&pivot=...).
+
+    Unlike POST responses, these can be cached by browsers and proxies:
+    they carry an ETag and Cache-Control (SORT_CACHE_MAX_AGE seconds), and
+    If-None-Match is answered 304 without touching the trace. 404 once the
+    trace has left the cache (POST the array again).
+    """
+    if name not in ALGORITHMS:
+        return jsonify({"error": "Unknown algorithm."}), HTTPStatus.NOT_FOUND
+    algorithm = ALGORITHMS[name]
+    req, error = _parse_request(algorithm, {**_query_body(), "array": []})
+    if error:
+        return error
+    if req.mode != "trace":
         return (
-            jsonify({"error": "Body must include 'array' as a JSON list."}),
+            jsonify({"error": "Only traces can be replayed by hash."}),
             HTTPStatus.BAD_REQUEST,
         )
-    if not all(isinstance(x, (int, float)) for x in arr):
+    key = _trace_key(algorithm, req, digest)
+    if key is None:
         return (
-            jsonify({"error": "All elements in 'array' must be numbers."}),
+            jsonify({"error": "Random pivots are only reproducible with a 'seed'."}),
             HTTPStatus.BAD_REQUEST,
         )
 
-    steps = merge_sort(arr)
-    return jsonify({"algorithm": "merge", "steps": steps}), HTTPStatus.OK
+    binary = _wants_binary()
+    etag = _etag(key, req, "binary" if binary else "json")
+    if request.if_none_match.contains_weak(etag):
+        return _cacheable(_not_modified(etag, digest, "binary" if binary else "json"))
+    trace = trace_cache.get(key)
+    if trace is None:
+        return (
+            jsonify({"error": "Unknown array hash, or its trace has expired."}),
+            HTTPStatus.NOT_FOUND,
+        )
+    try:
+        _check_budget(req, trace)
+    except StepBudgetExceeded as exc:
+        return jsonify(_budget_error(exc)), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
 
+    if binary and not can_encode(trace):
+        binary = False
+        etag = _etag(key, req, "json")
+        if request.if_none_match.contains_weak(etag):
+            return _cacheable(_not_modified(etag, digest, "json"))
+    note(algorithm=name, steps=trace.total_steps)
+    response = _validated(_trace_response(name, req, trace, binary), etag, digest)
+    return _cacheable(response), HTTPStatus.OK
 
-@sorting_blueprint.post("/sort/quick")
-def sort_quick():
-    data = request.get_json(silent=True) or {}
-    arr = data.get("array")
 
-    if not isinstance(arr, list):
+# ---------------------------
+# trace cursor API
+# ---------------------------
+
+
+@sorting_blueprint.post("/sort/<name>/trace")
+def create_trace(name: str):
+    """
+    Expect JSON: { "array": [numbers...] }
+    Generate the trace once and keep it server-side, with keyframes so that
+    /state can seek quickly (every max(1024, 4 * n) steps unless
+    "keyframe_every" is given).
+    Return: { "id": ..., "algorithm": name, "total": number_of_steps }
+    """
+    if name not in ALGORITHMS:
+        return jsonify({"error": "Unknown algorithm."}), HTTPStatus.NOT_FOUND
+    req, error = _parse_request(ALGORITHMS[name])
+    if error:
+        return error
+    if not req.keyframe_every:
+        # snapshots cost about as much memory as the steps between them
+        every = max(MIN_STORED_KEYFRAME_EVERY, 4 * len(req.array))
+        req = req._replace(keyframe_every=every)
+    error = _admission_error(ALGORITHMS[name], req)
+    if error:
+        return error
+
+    try:
+        trace = _trace(ALGORITHMS[name], req)
+    except StepBudgetExceeded as exc:
+        return jsonify(_budget_error(exc)), HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    except (TraceTimeout, ExecutorBusy) as exc:
+        return _executor_error(exc)
+    if trace.nbytes > trace_store.max_bytes:
+        return (
+            jsonify({"error": "Trace is too large to be stored."}),
+            HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+        )
+    trace_id = trace_store.put(name, trace)
+    return (
+        jsonify(
+            {
+                "id": trace_id,
+                "algorithm": name,
+                "total": len(trace),
+                "total_steps": trace.total_steps,
+            }
+        ),
+        HTTPStatus.CREATED,
+    )
+
+
+@sorting_blueprint.get("/sort/<name>/trace/<trace_id>")
+def read_trace(name: str, trace_id: str):
+    """
+    Return one window of a stored trace:
+      ?offset=<first step, default 0>&limit=<page size, default 1000>
+    Response: { "id", "algorithm", "offset", "total", "steps": [...],
+                "next_offset": offset of the next page or null }
+    """
+    stored = trace_store.get(trace_id)
+    if stored is None or stored.algorithm != name:
+        return (
+            jsonify({"error": "Unknown or expired trace id."}),
+            HTTPStatus.NOT_FOUND,
+        )
+
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", DEFAULT_PAGE_LIMIT, type=int)
+    if offset < 0 or not 0 < limit <= MAX_PAGE_LIMIT:
         return (
-            jsonify({"error": "Body must include 'array' as a JSON list."}),
+            jsonify(
+                {
+                    "error": "'offset' must be >= 0 and 'limit' between 1 and "
+                    f"{MAX_PAGE_LIMIT}."
+                }
+            ),
             HTTPStatus.BAD_REQUEST,
         )
-    if not all(isinstance(x, (int, float)) for x in arr):
+
+    trace = stored.trace
+    end = min(offset + limit, len(trace))
+    return (
+        jsonify(
+            {
+                "id": trace_id,
+                "algorithm": name,
+                "offset": offset,
+                "total": len(trace),
+                "steps": trace[offset:end],
+                "next_offset": end if end < len(trace) else None,
+            }
+        ),
+        HTTPStatus.OK,
+    )
+
+
+@sorting_blueprint.get("/sort/<name>/trace/<trace_id>/state")
+def trace_state(name: str, trace_id: str):
+    """
+    Return the array after the first ?step=N steps of a stored trace:
+      { "id", "algorithm", "step": N, "array": [...] }
+    The state is rebuilt from the nearest keyframe, so seeking costs at most
+    one keyframe interval of replay regardless of N.
+    """
+    stored = trace_store.get(trace_id)
+    if stored is None or stored.algorithm != name:
+        return (
+            jsonify({"error": "Unknown or expired trace id."}),
+            HTTPStatus.NOT_FOUND,
+        )
+
+    trace = stored.trace
+    step = request.args.get("step", type=int)
+    if step is None or not 0 <= step <= trace.total_steps:
         return (
-            jsonify({"error": "All elements in 'array' must be numbers."}),
+            jsonify({"error": f"'step' must be between 0 and {trace.total_steps}."}),
             HTTPStatus.BAD_REQUEST,
         )
+    try:
+        state = trace.state_at(step)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), HTTPStatus.BAD_REQUEST
+    return (
+        jsonify({"id": trace_id, "algorithm": name, "step": step, "array": state}),
+        HTTPStatus.OK,
+    )
+
+
+@sorting_blueprint.delete("/sort/<name>/trace/<trace_id>")
+def delete_trace(name: str, trace_id: str):
+    stored = trace_store.get(trace_id)
+    if stored is None or stored.algorithm != name:
+        return (
+            jsonify({"error": "Unknown or expired trace id."}),
+            HTTPStatus.NOT_FOUND,
+        )
+    trace_store.delete(trace_id)
+    return "", HTTPStatus.NO_CONTENT
+
 
-    steps = quick_sort(arr)
-    return jsonify({"algorithm": "quick", "steps": steps}), HTTPStatus.OK
+@sorting_blueprint.get("/sort/cache/stats")
+def cache_stats():
+    """Return: { "entries", "bytes", "max_bytes", "hits", "misses", "evictions" }"""
+    return jsonify(trace_cache.stats()), HTTPStatus.OK
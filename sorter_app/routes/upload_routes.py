@@ -1,6 +1,8 @@
 import re
-from flask import Blueprint, request, jsonify  # type: ignore
+from flask import Blueprint, request  # type: ignore
 from http import HTTPStatus
+from services.request_log import note
+from services.serializer import jsonify
 
 # A Blueprint is like a mini app we can plug into the main Flask app
 # a way to organize flask routes into reusable modules
@@ -48,6 +50,7 @@ def upload_array():
             if val.is_integer():
                 val = int(val)
             numbers.append(val)
+        note(input_len=len(numbers))
 
         return (
             jsonify(
@@ -0,0 +1,148 @@
+import json
+import sys
+from array import array
+from struct import calcsize, pack, unpack_from
+from typing import Any, Dict, Optional
+
+from algorithms.trace import Trace
+
+BINARY_MIMETYPE = "application/octet-stream"
+
+MAGIC = b"SRTB"
+# magic, values typecode, args typecode, stored steps, metadata length
+HEADER = "<4sccII"
+# typecode written when no step kind carries a value
+NO_VALUES = "-"
+
+INT16_MIN, INT16_MAX = -(2**15), 2**15 - 1
+
+
+def _align(offset: int) -> int:
+    # every column starts on an 8-byte boundary, so a decoder can view it
+    # in place as a typed array
+    return offset + -offset % 8
+
+
+def _little_endian(column: array) -> bytes:
+    if sys.byteorder == "big":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _args_column(trace: Trace) -> array:
+    """The integer fields, narrowed to int16 when every one of them fits."""
+    args = trace.args
+    if not args or (min(args) >= INT16_MIN and max(args) <= INT16_MAX):
+        return array("h", args)
+    return args
+
+
+def can_encode(trace: Trace) -> bool:
+    """False when the values are kept as Python objects (bools, huge ints...)."""
+    return trace.values is None or isinstance(trace.values, array)
+
+
+def encode_trace(trace: Trace, meta: Dict[str, Any]) -> bytes:
+    """
+    Pack a trace in the spirit of arrays.py's save(): a small header, then
+    the raw columns, each written as one block of fixed-width items.
+
+      b"SRTB"                      magic
+      values typecode              1 ascii byte: "q", "d", or "-" without values
+      args typecode                1 ascii byte: "h" (int16) or "i" (int32)
+      pack("<I", len(trace))       number of stored steps
+      pack("<I", len(json)), json  'meta' (algorithm, total_steps...) plus
+                                   "kinds" and "arity", to expand the opcodes
+      ops                          one uint8 opcode per step
+      args                         'arity' integers per step, zero filled
+      values                       one int64 / float64 per step, if any
+
+    Every column starts on an 8-byte boundary and is little-endian. Step k
+    is ops[k], args[k * arity:(k + 1) * arity] and values[k], so a decoder
+    reads any step without parsing the ones before it.
+    """
+    if not can_encode(trace):
+        raise ValueError("trace values have no binary representation")
+    kinds = [
+        {
+            "type": kind.type,
+            "fields": list(kind.fields),
+            "value": kind.value,
+            "extra": dict(kind.extra),
+        }
+        for kind in trace.kinds
+    ]
+    header = json.dumps(
+        {**meta, "kinds": kinds, "arity": trace.arity}, separators=(",", ":")
+    ).encode("utf-8")
+    args = _args_column(trace)
+    values = trace.values
+    typecode = NO_VALUES if values is None else values.typecode
+
+    parts = [
+        pack(
+            HEADER,
+            MAGIC,
+            typecode.encode("ascii"),
+            args.typecode.encode("ascii"),
+            len(trace),
+            len(header),
+        ),
+        header,
+    ]
+    offset = sum(len(part) for part in parts)
+    columns = [trace.ops.tobytes(), _little_endian(args)]
+    if values is not None:
+        columns.append(_little_endian(values))
+    for column in columns:
+        parts.append(bytes(_align(offset) - offset))
+        parts.append(column)
+        offset = _align(offset) + len(column)
+    return b"".join(parts)
+
+
+def _read_column(data: bytes, offset: int, typecode: str, count: int) -> array:
+    column = array(typecode)
+    column.frombytes(data[offset : offset + count * column.itemsize])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+def decode_trace(data: bytes) -> Dict[str, Any]:
+    """
+    Unpack encode_trace()'s output into the JSON body of /sort/<algorithm>:
+    the metadata plus "steps", one dict per step.
+    """
+    magic, typecode, args_typecode, count, header_len = unpack_from(HEADER, data)
+    if magic != MAGIC:
+        raise ValueError("not a binary trace")
+    offset = calcsize(HEADER)
+    meta = json.loads(data[offset : offset + header_len])
+    arity = meta.pop("arity")
+
+    offset = _align(offset + header_len)
+    ops = _read_column(data, offset, "B", count)
+    offset = _align(offset + count)
+    args = _read_column(data, offset, args_typecode.decode("ascii"), count * arity)
+    offset = _align(offset + len(args) * args.itemsize)
+    values: Optional[array] = None
+    if typecode.decode("ascii") != NO_VALUES:
+        values = _read_column(data, offset, typecode.decode("ascii"), count)
+
+    kinds = meta.pop("kinds")
+    steps = []
+    for index, op in enumerate(ops):
+        kind = kinds[op]
+        step: Dict[str, Any] = {}
+        if kind["type"] is not None:
+            step["type"] = kind["type"]
+        base = index * arity
+        for position, name in enumerate(kind["fields"]):
+            step[name] = args[base + position]
+        if kind["value"] is not None and values is not None:
+            step[kind["value"]] = values[index]
+        step.update(kind["extra"])
+        steps.append(step)
+    return {**meta, "steps": steps}
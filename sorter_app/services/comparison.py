@@ -0,0 +1,108 @@
+import math
+import threading
+import time
+import tracemalloc
+from functools import cmp_to_key
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from algorithms.cost import CostEstimate
+from algorithms.registry import ALGORITHMS
+from algorithms.result import SortResult
+
+# name of the built-in sort used as the baseline of a comparison
+BASELINE = "sorted"
+
+# tracemalloc is process-wide, so memory measurements must not overlap
+_memory_lock = threading.Lock()
+
+
+def _sorted_result(array: List[Any], **options: Any) -> SortResult:
+    """Baseline run; the counting pass below supplies its comparison count."""
+    return SortResult(sorted(array))
+
+
+def _count_sorted_comparisons(array: List[Any]) -> int:
+    comparisons = 0
+
+    def compare(a, b):
+        nonlocal comparisons
+        comparisons += 1
+        return (a > b) - (a < b)
+
+    sorted(array, key=cmp_to_key(compare))
+    return comparisons
+
+
+def _peak_bytes(run: Callable[[], Any]) -> int:
+    """Peak memory allocated while 'run' executes, measured with tracemalloc."""
+    with _memory_lock:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            run()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+    return max(peak - before, 0)
+
+
+def comparison_cost(
+    name: str, array: Sequence[Any], options: Optional[Dict[str, Any]] = None
+) -> CostEstimate:
+    """
+    Predicted steps of one algorithm of a comparison, without running it.
+    The baseline's are its comparisons, about n log2(n), all made through
+    a Python callback by the counting pass.
+    """
+    if name != BASELINE:
+        return ALGORITHMS[name].cost(array, **(options or {}))
+    n = len(array)
+    if n < 2:
+        return CostEstimate(0, exact=False)
+    return CostEstimate(int(n * math.log2(n)), exact=False)
+
+
+def compare_algorithms(
+    array: List[Any],
+    names: Optional[Sequence[str]] = None,
+    options: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run each untraced algorithm (and the built-in sorted as baseline) on its
+    own copy of 'array' and report, per algorithm:
+      comparisons, swaps, writes, time_ms, peak_bytes
+
+    Timing and memory come from two separate runs, because tracemalloc slows
+    down allocation-heavy code enough to distort the wall time.
+    The baseline has no swap/write counters; they are reported as None.
+    """
+    names = list(names) if names is not None else [*ALGORITHMS, BASELINE]
+    options = options or {}
+    results = []
+
+    for name in names:
+        if name == BASELINE:
+            run_result: Callable[..., SortResult] = _sorted_result
+        else:
+            run_result = ALGORITHMS[name].result
+        kwargs = options.get(name, {})
+
+        start = time.perf_counter()
+        result = run_result(array, **kwargs)
+        elapsed = time.perf_counter() - start
+        peak = _peak_bytes(lambda: run_result(array, **kwargs))
+
+        entry: Dict[str, Any] = {"algorithm": name, **result.counts()}
+        if name == BASELINE:
+            entry.update(
+                comparisons=_count_sorted_comparisons(array), swaps=None, writes=None
+            )
+        entry["time_ms"] = round(elapsed * 1000, 3)
+        entry["peak_bytes"] = peak
+        results.append(entry)
+
+    return results
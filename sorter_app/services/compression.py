@@ -0,0 +1,100 @@
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence, Union
+
+from flask import Flask, request  # type: ignore
+
+# negotiated through Accept-Encoding, in order of preference on a tie
+ENCODINGS = ("gzip", "deflate")
+
+# zlib window bits of each encoding: gzip wraps the stream in a gzip header,
+# HTTP's "deflate" is the zlib format
+_WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+
+# bodies worth compressing: traces are highly repetitive in every format
+COMPRESSIBLE = (
+    "application/json",
+    "application/x-ndjson",
+    "application/octet-stream",
+)
+
+# below this size the headers and CPU time cost more than compression saves
+MIN_COMPRESS_BYTES = 1024
+
+DEFAULT_LEVEL = 6
+
+
+def compress(data: bytes, encoding: str, level: int = DEFAULT_LEVEL) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_chunks(
+    chunks: Iterable[Union[str, bytes]], encoding: str, level: int = DEFAULT_LEVEL
+) -> Iterator[bytes]:
+    """
+    Compress a streamed body chunk by chunk. Each chunk is sync-flushed, so
+    the client can decode every step as soon as it was produced instead of
+    waiting for compressor buffers to fill.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    for chunk in chunks:
+        data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        compressed = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def install_compression(
+    app: Flask,
+    blueprints: Optional[Sequence[str]] = None,
+    min_bytes: int = MIN_COMPRESS_BYTES,
+    level: int = DEFAULT_LEVEL,
+) -> None:
+    """
+    Compress the COMPRESSIBLE responses of 'blueprints' (every route when
+    None) with gzip or deflate, whichever the client's Accept-Encoding
+    prefers. Buffered bodies under 'min_bytes' are sent as they are;
+    streamed bodies are compressed incrementally as they are generated.
+    A 304 of a COMPRESSIBLE media type gets the same Vary and weak ETag as
+    its 200.
+
+    Install it after the other after_request hooks (metrics, request log):
+    Flask runs those hooks last-installed first, so they then see the bytes
+    actually sent.
+    """
+
+    @app.after_request
+    def _compress(response):
+        if blueprints is not None and request.blueprint not in blueprints:
+            return response
+        if response.mimetype not in COMPRESSIBLE:
+            return response
+        if "Content-Encoding" in response.headers or response.direct_passthrough:
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(ENCODINGS)
+        if encoding is None:
+            return response
+        # the bytes sent depend on the encoding, so a strong validator no
+        # longer holds. It is weakened whenever an encoding is negotiated,
+        # whether or not this body is large enough to compress, so that a
+        # 304 (which has no body to measure) repeats the 200's validator
+        etag, weak = response.get_etag()
+        if etag is not None and not weak:
+            response.set_etag(etag, weak=True)
+        if response.status_code == 304:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_chunks(response.response, encoding, level)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_bytes:
+                return response
+            response.set_data(compress(data, encoding, level))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    app.extensions["compression"] = {"min_bytes": min_bytes, "level": level}
@@ -0,0 +1,64 @@
+import random
+from typing import Any, Callable, Dict, List
+
+# largest array a dataset spec may ask for
+MAX_DATASET_SIZE = 1_000_000
+
+
+def _random(n: int, rng: random.Random) -> List[int]:
+    return [rng.randint(0, 1000) for _ in range(n)]
+
+
+def _sorted(n: int, rng: random.Random) -> List[int]:
+    return sorted(_random(n, rng))
+
+
+def _reversed(n: int, rng: random.Random) -> List[int]:
+    return sorted(_random(n, rng), reverse=True)
+
+
+def _nearly_sorted(n: int, rng: random.Random) -> List[int]:
+    # sorted, then about 5% of the positions (at least one, so that small
+    # arrays are not simply sorted) swapped with a neighbour
+    arr = _sorted(n, rng)
+    if n > 1:
+        for _ in range(max(1, n // 20)):
+            i = rng.randrange(n - 1)
+            arr[i], arr[i + 1] = arr[i + 1], arr[i]
+    return arr
+
+
+def _few_unique(n: int, rng: random.Random) -> List[int]:
+    return [rng.randint(0, 4) for _ in range(n)]
+
+
+DATASETS: Dict[str, Callable[[int, random.Random], List[int]]] = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "nearly_sorted": _nearly_sorted,
+    "few_unique": _few_unique,
+}
+
+
+def make_dataset(spec: Any) -> List[int]:
+    """
+    Build the array described by a spec like
+        {"kind": "reversed", "size": 5000, "seed": 1}
+    ("seed" is optional and defaults to 0, so the same spec always gives the
+    same array). Raises ValueError for a malformed spec.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("'dataset' must be an object.")
+    kind = spec.get("kind")
+    if kind not in DATASETS:
+        raise ValueError(f"'dataset.kind' must be one of {', '.join(DATASETS)}.")
+    size = spec.get("size")
+    if not isinstance(size, int) or isinstance(size, bool):
+        raise ValueError("'dataset.size' must be an integer.")
+    if not 0 <= size <= MAX_DATASET_SIZE:
+        raise ValueError(f"'dataset.size' must be between 0 and {MAX_DATASET_SIZE}.")
+    seed = spec.get("seed", 0)
+    if not isinstance(seed, int) or isinstance(seed, bool):
+        raise ValueError("'dataset.seed' must be an integer.")
+    return DATASETS[kind](size, random.Random(seed))
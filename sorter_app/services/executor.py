@@ -0,0 +1,193 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional
+
+from algorithms.registry import ALGORITHMS
+from algorithms.trace import Trace
+
+
+class TraceTimeout(Exception):
+    """Raised when a trace takes longer than its timeout."""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"trace did not finish within {timeout} seconds")
+        self.timeout = timeout
+
+    def __reduce__(self):
+        return type(self), (self.timeout,)
+
+
+class TraceCancelled(Exception):
+    """Raised (in the worker) once a running trace has been cancelled."""
+
+
+class ExecutorBusy(Exception):
+    """Raised by TraceExecutor.submit when every task slot is taken."""
+
+
+# ---------------------------
+# Worker process side
+# ---------------------------
+
+# per-slot cancel flags and step counters shared with the parent process,
+# set by _init_worker when the worker starts
+_cancel_flags: Any = None
+_progress: Any = None
+
+
+def _init_worker(cancel_flags, progress) -> None:
+    global _cancel_flags, _progress
+    _cancel_flags, _progress = cancel_flags, progress
+
+
+def _collect(
+    name: str,
+    array: List[Any],
+    slot: int,
+    timeout: Optional[float],
+    deadline: Optional[float],
+    options: Dict[str, Any],
+) -> Trace:
+    """
+    Run one tracer in a worker process. The finished Trace travels back as
+    its packed columns, not as one dict per step.
+    """
+
+    def check(steps: int) -> None:
+        _progress[slot] = steps
+        if _cancel_flags[slot]:
+            raise TraceCancelled
+        if deadline is not None and time.time() > deadline:
+            raise TraceTimeout(timeout)
+
+    return ALGORITHMS[name].collect(array, progress=check, **options)
+
+
+# ---------------------------
+# Parent side
+# ---------------------------
+
+
+class TraceHandle:
+    """A submitted trace: wait for it, watch its progress or cancel it."""
+
+    def __init__(
+        self,
+        executor: "TraceExecutor",
+        future: Future,
+        slot: int,
+        timeout: Optional[float],
+    ):
+        self._executor = executor
+        self.future = future
+        self.slot = slot
+        self.timeout = timeout
+
+    def progress(self) -> int:
+        """Steps generated so far (updated every PROGRESS_EVERY steps)."""
+        return self._executor._progress[self.slot]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        try:
+            self.future.exception(timeout)
+        except FutureTimeout:
+            return False
+        except Exception:  # the future was cancelled
+            pass
+        return True
+
+    def cancel(self) -> None:
+        """A queued trace never starts; a running one stops at its next check."""
+        if self.future.cancel():
+            return
+        with self._executor._lock:
+            # once done, the slot may already belong to another task
+            if not self.future.done():
+                self._executor._cancel_flags[self.slot] = 1
+
+    def result(self) -> Trace:
+        """
+        The finished Trace. Raises what the tracer raised (StepBudgetExceeded,
+        TraceTimeout, TraceCancelled...), TraceTimeout when the task is still
+        queued or running once its timeout is over.
+        """
+        try:
+            return self.future.result(self.timeout)
+        except FutureTimeout:
+            self.cancel()
+            raise TraceTimeout(self.timeout)
+
+
+class TraceExecutor:
+    """
+    Runs tracers in a pool of worker processes, so concurrent sorts use all
+    cores instead of taking turns on the GIL.
+
+    Each task gets one of 'max_tasks' slots in two shared arrays: a cancel
+    flag and a step counter, which the worker checks and updates every
+    PROGRESS_EVERY steps. 'timeout' (seconds, per task, including time
+    spent queued) is the default of submit().
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        max_tasks: int = 256,
+        timeout: Optional[float] = None,
+        start_method: str = "spawn",
+    ):
+        context = multiprocessing.get_context(start_method)
+        self._cancel_flags = context.RawArray("b", max_tasks)
+        self._progress = context.RawArray("q", max_tasks)
+        self._free = list(range(max_tasks))
+        self._lock = threading.Lock()
+        self.timeout = timeout
+        self._pool = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._cancel_flags, self._progress),
+        )
+
+    def submit(
+        self, name: str, array: List[Any], timeout: Optional[float] = None, **options
+    ) -> TraceHandle:
+        """
+        Queue ALGORITHMS[name].collect(array, **options) on the pool.
+        Raises ExecutorBusy when 'max_tasks' traces are already in flight.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        with self._lock:
+            if not self._free:
+                raise ExecutorBusy
+            slot = self._free.pop()
+        self._cancel_flags[slot] = 0
+        self._progress[slot] = 0
+
+        deadline = None if timeout is None else time.time() + timeout
+        try:
+            future = self._pool.submit(
+                _collect, name, array, slot, timeout, deadline, options
+            )
+        except BaseException:
+            self._release(slot)
+            raise
+        future.add_done_callback(lambda _: self._release(slot))
+        return TraceHandle(self, future, slot, timeout)
+
+    def collect(
+        self, name: str, array: List[Any], timeout: Optional[float] = None, **options
+    ) -> Trace:
+        """Submit and wait: the process-pool counterpart of Algorithm.collect."""
+        return self.submit(name, array, timeout, **options).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _release(self, slot: int) -> None:
+        with self._lock:
+            self._free.append(slot)
@@ -0,0 +1,194 @@
+import itertools
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = (
+    "queued",
+    "running",
+    "done",
+    "failed",
+    "cancelled",
+)
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when too many jobs are already waiting."""
+
+
+class Job:
+    """
+    One unit of background work and its observable state.
+
+    The work function receives the job and should call job.report(progress)
+    now and then: that publishes the progress and raises JobCancelled once
+    the job has been cancelled.
+    """
+
+    def __init__(self, run: Callable[["Job"], Any], info: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        # dropped once the job finishes, with whatever its closure holds
+        self.run: Optional[Callable[["Job"], Any]] = run
+        self.info = info
+        self.status = QUEUED
+        self.progress = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancelled = threading.Event()
+
+    def report(self, progress: int) -> None:
+        self.progress = progress
+        if self._cancelled.is_set():
+            raise JobCancelled
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        {"id", "status", "progress", "created_at", "started_at", "finished_at",
+         "error", **info}
+        """
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            **self.info,
+        }
+
+
+class JobQueue:
+    """
+    Runs jobs on 'workers' background threads, cheapest first.
+
+    Jobs are ordered by (priority, cost, submission order): with the cost set
+    to the predicted trace size, small interactive jobs overtake big ones
+    submitted earlier instead of waiting behind them. At most 'max_pending'
+    jobs may wait; finished jobs are forgotten 'keep_finished' seconds later,
+    or sooner, oldest first, once more than 'max_finished' are kept.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 64,
+        keep_finished: float = 600.0,
+        max_finished: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self.max_finished = max_finished
+        self._clock = clock
+        self._queue: "queue.PriorityQueue[Any]" = queue.PriorityQueue()
+        self._jobs: Dict[str, Job] = {}
+        self._finished_at: Dict[str, float] = {}
+        self._pending = 0
+        self._order = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        run: Callable[[Job], Any],
+        priority: int = 0,
+        cost: int = 0,
+        **info: Any,
+    ) -> Job:
+        job = Job(run, info)
+        with self._lock:
+            self._forget_finished()
+            if self._pending >= self.max_pending:
+                raise JobQueueFull
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._start_workers()
+        self._queue.put((priority, cost, next(self._order), job))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._forget_finished()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job: a queued one never starts, a running one stops at its
+        next report(). Finished jobs are left as they are.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            job._cancelled.set()
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+                self._pending -= 1
+        return job
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    # ---------------------------
+    # Workers
+    # ---------------------------
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"job-worker-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()[-1]
+            with self._lock:
+                run = job.run
+                if job.status != QUEUED or run is None:  # cancelled while waiting
+                    continue
+                self._pending -= 1
+                job.status = RUNNING
+                job.started_at = time.time()
+            try:
+                result = run(job)
+            except JobCancelled:
+                status, result = CANCELLED, None
+            except Exception as exc:
+                status, result = FAILED, None
+                job.error = str(exc) or type(exc).__name__
+            else:
+                status = DONE
+            with self._lock:
+                job.result = result
+                self._finish(job, status)
+
+    def _finish(self, job: Job, status: str) -> None:
+        job.status = status
+        job.finished_at = time.time()
+        job.run = None
+        self._finished_at[job.id] = self._clock()
+        while len(self._finished_at) > self.max_finished:
+            oldest = next(iter(self._finished_at))
+            del self._finished_at[oldest]
+            self._jobs.pop(oldest, None)
+
+    def _forget_finished(self) -> None:
+        deadline = self._clock() - self.keep_finished
+        for job_id, finished in list(self._finished_at.items()):
+            if finished <= deadline:
+                del self._finished_at[job_id]
+                self._jobs.pop(job_id, None)
@@ -0,0 +1,256 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from flask import Flask, Response, g, request  # type: ignore
+
+from services.request_log import noted
+
+PROMETHEUS_MIMETYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# servers that start a thread per request leave a shard behind for each;
+# past this many the dead ones are folded together when a new one is made
+RETIRE_SHARDS_AT = 64
+
+
+class MetricSpec(NamedTuple):
+    type: str  # "counter", "gauge" or "histogram"
+    help: str
+    buckets: Tuple[float, ...] = ()
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(float(4**k * 256) for k in range(10))  # 256 B .. 64 MiB
+STEP_BUCKETS = tuple(float(10**k) for k in range(1, 8))  # 10 .. 10M
+
+METRICS: Dict[str, MetricSpec] = {
+    "sorter_requests_total": MetricSpec(
+        "counter", "Requests handled, by method, route and status."
+    ),
+    "sorter_request_duration_seconds": MetricSpec(
+        "histogram",
+        "Time to produce the response, streamed bodies included, by route.",
+        LATENCY_BUCKETS,
+    ),
+    "sorter_response_size_bytes": MetricSpec(
+        "histogram", "Size of response bodies as sent, by route.", SIZE_BUCKETS
+    ),
+    "sorter_trace_steps": MetricSpec(
+        "histogram", "Steps per generated trace, by algorithm.", STEP_BUCKETS
+    ),
+    "sorter_requests_in_flight": MetricSpec(
+        "gauge", "Requests currently being handled."
+    ),
+}
+
+
+class _Shard:
+    """The metric values updated by one thread."""
+
+    __slots__ = ("thread", "values", "histograms")
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.values: Dict[Tuple[str, Labels], float] = {}
+        # per key: non-cumulative bucket counts (+Inf last), then the sum
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+    def merge(self, other: "_Shard") -> None:
+        for key, value in other.values.items():
+            self.values[key] = self.values.get(key, 0) + value
+        for key, counts in other.histograms.items():
+            mine = self.histograms.setdefault(key, [0.0] * len(counts))
+            for index, count in enumerate(counts):
+                mine[index] += count
+
+
+class Metrics:
+    """
+    Counters, gauges and histograms sharded per thread: updating one only
+    touches the calling thread's own dicts, so the request path never waits
+    on a lock and a scrape never blocks requests. render() sums the shards;
+    shards of finished threads are folded into one to keep that cheap.
+    """
+
+    def __init__(self, specs: Optional[Dict[str, MetricSpec]] = None):
+        self.specs = dict(METRICS if specs is None else specs)
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(threading.current_thread())
+        self._lock = threading.Lock()  # taken once per thread and per scrape
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                if len(self._shards) >= RETIRE_SHARDS_AT:
+                    self._retire_dead()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead(self) -> None:
+        """Fold the shards of finished threads into one; needs self._lock."""
+        live = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                live.append(shard)
+            else:
+                self._retired.merge(shard)
+        self._shards = live
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Add to a counter, or to a gauge (negative amounts decrement it)."""
+        values = self._shard().values
+        key = (name, tuple(sorted(labels.items())))
+        values[key] = values.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = self.specs[name].buckets
+        histograms = self._shard().histograms
+        key = (name, tuple(sorted(labels.items())))
+        counts = histograms.get(key)
+        if counts is None:
+            counts = histograms[key] = [0.0] * (len(buckets) + 2)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-1] += value
+
+    def _collect(self) -> _Shard:
+        total = _Shard(threading.current_thread())
+        with self._lock:
+            self._retire_dead()
+            total.merge(self._retired)
+            for shard in self._shards:
+                # another thread may add a key while we copy its dicts; list()
+                # of a dict's items runs without switching threads, iterating
+                # the dict itself does not
+                copy = _Shard(shard.thread)
+                copy.values = dict(list(shard.values.items()))
+                copy.histograms = {
+                    k: list(v) for k, v in list(shard.histograms.items())
+                }
+                total.merge(copy)
+        return total
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        total = self._collect()
+        lines: List[str] = []
+        for name, spec in self.specs.items():
+            lines.append(f"# HELP {name} {spec.help}")
+            lines.append(f"# TYPE {name} {spec.type}")
+            if spec.type != "histogram":
+                samples = [(k, v) for k, v in total.values.items() if k[0] == name]
+                if not samples and spec.type == "gauge":
+                    lines.append(f"{name} 0")
+                for (_, labels), value in sorted(samples):
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+            for (_, labels), counts in sorted(
+                (k, v) for k, v in total.histograms.items() if k[0] == name
+            ):
+                cumulative = 0.0
+                for bound, count in zip(spec.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    bucket_labels = _labels(labels + (("le", le),))
+                    lines.append(f"{name}_bucket{bucket_labels} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(counts[-1])}")
+                lines.append(f"{name}_count{_labels(labels)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def install_metrics(app: Flask, metrics: Metrics) -> None:
+    """Instrument every request of 'app' and serve the values at GET /metrics."""
+
+    @app.before_request
+    def _start_metrics():
+        g.metrics_start = time.perf_counter()
+        metrics.inc("sorter_requests_in_flight")
+
+    def _record_steps(fields: Dict[str, Any]) -> None:
+        if fields.get("algorithm") and fields.get("steps") is not None:
+            metrics.observe(
+                "sorter_trace_steps", fields["steps"], algorithm=fields["algorithm"]
+            )
+
+    def _record_stream(response: Response, start: float, route: str) -> None:
+        # a streamed body notes its steps as it ends (see routes.sorting_routes)
+        fields = noted()
+        sent = 0
+        body = response.response
+
+        def counted():
+            nonlocal sent
+            for chunk in body:
+                sent += len(chunk if isinstance(chunk, bytes) else chunk.encode())
+                yield chunk
+
+        def finish():
+            metrics.observe(
+                "sorter_request_duration_seconds",
+                time.perf_counter() - start,
+                route=route,
+            )
+            metrics.observe("sorter_response_size_bytes", sent, route=route)
+            _record_steps(fields)
+            metrics.inc("sorter_requests_in_flight", -1)
+
+        response.response = counted()
+        response.call_on_close(finish)
+
+    @app.after_request
+    def _record_metrics(response):
+        start = g.get("metrics_start")
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        metrics.inc(
+            "sorter_requests_total",
+            method=request.method,
+            route=route,
+            status=str(response.status_code),
+        )
+        if response.is_streamed:
+            # the body is produced after this hook and the teardown have run;
+            # the request ends when the server closes the response
+            g.metrics_start = None
+            _record_stream(response, start, route)
+            return response
+        metrics.observe(
+            "sorter_request_duration_seconds", time.perf_counter() - start, route=route
+        )
+        _record_steps(noted())
+        if response.content_length is not None:
+            metrics.observe(
+                "sorter_response_size_bytes", response.content_length, route=route
+            )
+        return response
+
+    @app.teardown_request
+    def _end_metrics(exc):
+        if g.pop("metrics_start", None) is not None:
+            metrics.inc("sorter_requests_in_flight", -1)
+
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype=PROMETHEUS_MIMETYPE)
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint, methods=["GET"])
+    app.extensions["metrics"] = metrics
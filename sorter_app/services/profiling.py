@@ -0,0 +1,183 @@
+import cProfile
+import hmac
+import io
+import itertools
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from flask import Flask, g, request  # type: ignore
+
+PROFILE_HEADER = "X-Profile"
+
+# profiles kept in the directory; older ones are deleted as new ones come
+DEFAULT_MAX_PROFILES = 100
+
+# cProfile (from Python 3.12) and tracemalloc are process-wide, so only one
+# request is profiled at a time; others that ask meanwhile are not
+_profile_lock = threading.Lock()
+
+
+class RequestProfile:
+    """cProfile and tracemalloc running around one request."""
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+        self.baseline = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self.profiler.enable()
+
+    def stop(self, directory: str, name: str, top: int = 30) -> str:
+        """
+        Stop profiling and write two files to 'directory':
+          <name>.prof - raw pstats, for snakeviz / pstats.Stats
+          <name>.txt  - functions by cumulative time and the top allocations
+        Returns the path of the .prof file.
+        """
+        self.profiler.disable()
+        elapsed = time.perf_counter() - self.started
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_tracing:
+            tracemalloc.stop()
+
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, name)
+        self.profiler.dump_stats(base + ".prof")
+
+        report = io.StringIO()
+        report.write(f"{name}: {elapsed * 1000:.1f} ms\n\n")
+        stats = pstats.Stats(self.profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(top)
+        report.write(f"Top {top} allocations (by size, since request start)\n")
+        for stat in snapshot.compare_to(self.baseline, "lineno")[:top]:
+            report.write(f"{stat}\n")
+        with open(base + ".txt", "w") as file:
+            file.write(report.getvalue())
+        return base + ".prof"
+
+
+def prune_profiles(directory: str, keep: int) -> None:
+    """Delete all but the 'keep' newest profiles (.prof and .txt) in 'directory'."""
+    profiles: List[os.DirEntry] = [
+        entry for entry in os.scandir(directory) if entry.name.endswith(".prof")
+    ]
+    profiles.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+    for entry in profiles[keep:]:
+        base = entry.path[: -len(".prof")]
+        for path in (entry.path, base + ".txt"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # pruned by another worker meanwhile
+                pass
+
+
+def install_profiling(
+    app: Flask,
+    directory: str,
+    sample_rate: float = 0.0,
+    header_secret: Optional[str] = None,
+    max_profiles: int = DEFAULT_MAX_PROFILES,
+    rng: Callable[[], float] = random.random,
+) -> None:
+    """
+    Profile some requests of 'app': a random 'sample_rate' fraction of them
+    and, when a 'header_secret' is set, those sent with 'X-Profile: <secret>'
+    (profiling costs the server time and disk, so clients may not ask for it
+    without the secret). Each profile is written to 'directory' (see
+    RequestProfile.stop) and its name returned in the X-Profile response
+    header; only the 'max_profiles' newest are kept.
+
+    Nothing is installed unless this is called, so an app without profiling
+    pays nothing for it.
+    """
+    secret = None if not header_secret else header_secret.encode("utf-8")
+
+    def wanted() -> bool:
+        asked = request.headers.get(PROFILE_HEADER)
+        if secret is not None and asked is not None:
+            if hmac.compare_digest(asked.encode("utf-8"), secret):
+                return True
+        return sample_rate > 0 and rng() < sample_rate
+
+    @app.before_request
+    def _start_profile():
+        if wanted() and _profile_lock.acquire(blocking=False):
+            try:
+                g.request_profile = RequestProfile()
+            except BaseException:
+                _profile_lock.release()
+                raise
+
+    def finish(profile: Optional[RequestProfile], name: str) -> None:
+        if profile is None:
+            return
+        try:
+            profile.stop(directory, name)
+            prune_profiles(directory, max_profiles)
+        finally:
+            _profile_lock.release()
+
+    @app.after_request
+    def _stop_profile(response):
+        profile = g.pop("request_profile", None)
+        if profile is None:
+            return response
+        name = _profile_name(request.path)
+        response.headers[PROFILE_HEADER] = name
+        # streamed bodies are produced after this hook, so stop once sent
+        response.call_on_close(lambda: finish(profile, name))
+        return response
+
+    @app.teardown_request
+    def _abort_profile(exc):
+        # only left over when the request failed before after_request ran
+        profile = g.pop("request_profile", None)
+        if profile is not None:
+            finish(profile, _profile_name(request.path))
+
+    app.extensions["profiling"] = {
+        "directory": directory,
+        "sample_rate": sample_rate,
+        "max_profiles": max_profiles,
+    }
+
+
+_NOT_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+
+def _profile_name(path: str) -> str:
+    slug = _NOT_SLUG.sub("-", path).strip("-") or "root"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return f"{stamp}-{slug}-{os.getpid()}-{next(_sequence)}"
+
+
+# tells apart profiles of the same route taken within the same second
+_sequence = itertools.count(1)
+
+
+def profiling_settings(environ: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Read the profiling switches from the environment:
+      SORTER_PROFILE_DIR    where to write profiles; profiling is off without it
+      SORTER_PROFILE_RATE   fraction of requests sampled (default 0)
+      SORTER_PROFILE_SECRET value of the X-Profile request header that asks
+                            for a profile; the header is ignored without it
+      SORTER_PROFILE_KEEP   profiles kept in the directory (default 100)
+    """
+    directory = environ.get("SORTER_PROFILE_DIR")
+    if not directory:
+        return None
+    return {
+        "directory": directory,
+        "sample_rate": float(environ.get("SORTER_PROFILE_RATE", "0")),
+        "header_secret": environ.get("SORTER_PROFILE_SECRET") or None,
+        "max_profiles": int(environ.get("SORTER_PROFILE_KEEP", DEFAULT_MAX_PROFILES)),
+    }
@@ -0,0 +1,226 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, request  # type: ignore
+
+# only these routes are logged
+LOGGED_PREFIXES = ("/sort/", "/ds/", "/array/upload")
+
+_STOP = object()
+
+
+class RequestLogWriter:
+    """
+    Appends JSON lines to 'path' from a background thread, so a request only
+    pays for putting a dict on a queue.
+
+    The queue holds at most 'max_queue' records; when the disk can't keep up
+    new records are dropped (and counted) instead of blocking requests.
+    Records are written in batches of up to 'batch_size' lines. Once the file
+    would grow past 'max_bytes' it is rotated: path -> path.1 -> path.2 ...,
+    keeping 'backups' old files.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        backups: int = 3,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    thread = threading.Thread(
+                        target=self._run, name="request-log-writer", daemon=True
+                    )
+                    thread.start()
+                    self._thread = thread
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue one record; returns False when it had to be dropped."""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write out what is queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "rotations": self.rotations,
+            "errors": self.errors,
+        }
+
+    # ---------------------------
+    # Writer thread
+    # ---------------------------
+
+    def _run(self) -> None:
+        file = None
+        try:
+            while True:
+                batch: List[Any] = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = _STOP in batch
+                records = [record for record in batch if record is not _STOP]
+                if records:
+                    file = self._write(file, records)
+                if stop:
+                    return
+        finally:
+            if file is not None:
+                file.close()
+
+    def _write(self, file, records: List[Dict[str, Any]]):
+        data = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        ).encode()
+        try:
+            if file is None:
+                file = open(self.path, "ab")
+            if file.tell() and file.tell() + len(data) > self.max_bytes:
+                file.close()
+                file = None
+                self._rotate()
+                file = open(self.path, "ab")
+            file.write(data)
+            file.flush()
+            self.written += len(records)
+            self.batches += 1
+        except OSError:
+            self.errors += len(records)
+        return file
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+
+def note(**fields: Any) -> None:
+    """
+    Attach fields (input_len, steps, compute_ms, serialize_ms...) to the log
+    record of the current request. Does nothing visible when logging is off.
+    """
+    g.setdefault("request_log", {}).update(fields)
+
+
+def noted() -> Dict[str, Any]:
+    """The fields note()d so far for the current request."""
+    return g.get("request_log", {})
+
+
+def elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 3)
+
+
+def install_request_log(app: Flask, writer: RequestLogWriter) -> None:
+    """
+    Log every request to LOGGED_PREFIXES through 'writer':
+      {"ts", "method", "path", "route", "status", "duration_ms", "bytes_out",
+       "input_len", "steps", "compute_ms", "serialize_ms"}
+    Fields a route did not note() are null. For streamed responses the record
+    is written once the body has been sent, with the bytes actually sent and
+    whatever the body noted while it ran.
+    """
+
+    @app.before_request
+    def _start_request_log():
+        if request.path.startswith(LOGGED_PREFIXES):
+            g.request_log_start = time.perf_counter()
+
+    @app.after_request
+    def _log_request(response):
+        start = g.pop("request_log_start", None)
+        if start is None:
+            return response
+        record: Dict[str, Any] = {
+            "ts": time.time(),
+            "method": request.method,
+            "path": request.path,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "status": response.status_code,
+            "duration_ms": None,
+            "bytes_out": None,
+            "input_len": None,
+            "steps": None,
+            "compute_ms": None,
+            "serialize_ms": None,
+        }
+        fields = noted()
+        record.update(fields)
+
+        if not response.is_streamed:
+            record["duration_ms"] = elapsed_ms(start)
+            record["bytes_out"] = response.content_length
+            writer.submit(record)
+            return response
+
+        body = response.response
+        record["bytes_out"] = 0
+
+        def counted():
+            for chunk in body:
+                record["bytes_out"] += len(
+                    chunk if isinstance(chunk, bytes) else chunk.encode()
+                )
+                yield chunk
+
+        def finish():
+            # a streamed body notes its steps and timings as it ends
+            record.update(fields)
+            record["duration_ms"] = elapsed_ms(start)
+            writer.submit(record)
+
+        response.response = counted()
+        response.call_on_close(finish)
+        return response
+
+    app.extensions["request_log"] = writer
+    atexit.register(writer.close)
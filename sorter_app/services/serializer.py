@@ -0,0 +1,137 @@
+import json
+import math
+import re
+import uuid
+from array import array
+from typing import Any, Callable, List, Sequence, Tuple
+
+from flask import Response  # type: ignore
+
+from algorithms.trace import StepKind, Trace, value_typecode
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional: pip install orjson for faster encoding
+    orjson = None
+
+JSON_MIMETYPE = "application/json"
+
+# traces are encoded on their own and spliced into the document in place of
+# a string holding this token; the random part keeps user data from matching
+_FRAGMENT = f"__fragment_{uuid.uuid4().hex}_"
+_FRAGMENT_RE = re.compile(rb'"' + _FRAGMENT.encode("ascii") + rb'(\d+)"')
+
+
+def _stdlib_dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), default=default).encode("utf-8")
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Encode 'obj' as compact JSON, with orjson when it is installed and the
+    standard library otherwise (or when orjson refuses a value, e.g. an
+    integer beyond 64 bits). A Trace anywhere in 'obj' becomes the list of
+    its steps, written by encode_steps().
+    """
+    fragments: List[bytes] = []
+
+    def default(value: Any) -> Any:
+        if isinstance(value, Trace):
+            fragments.append(encode_steps(value))
+            return f"{_FRAGMENT}{len(fragments) - 1}"
+        if isinstance(value, array):  # ingested input, keyframes
+            return value.tolist()
+        name = type(value).__name__
+        raise TypeError(f"Object of type {name} is not JSON serializable")
+
+    data = None
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, default=default)
+        except TypeError:
+            fragments.clear()
+    if data is None:
+        data = _stdlib_dumps(obj, default)
+    if not fragments:
+        return data
+    parts = _FRAGMENT_RE.split(data)
+    # split() alternates text and fragment numbers
+    for index in range(1, len(parts), 2):
+        parts[index] = fragments[int(parts[index])]
+    return b"".join(parts)
+
+
+def jsonify(obj: Any) -> Response:
+    """Drop-in for flask.jsonify(obj), encoding with dumps()."""
+    return Response(dumps(obj), mimetype=JSON_MIMETYPE)
+
+
+# ---------------------------
+# Steps without step dicts
+# ---------------------------
+
+
+def _plain_numbers(values: Sequence[Any]) -> bool:
+    """True when repr() of every value is also its JSON (no bools, NaN...)."""
+    typecode = values.typecode if isinstance(values, array) else value_typecode(values)
+    if typecode == "q":
+        return True
+    return typecode == "d" and all(map(math.isfinite, values))
+
+
+def _template(kind: StepKind, slots: int, value_slot: bool) -> str:
+    """
+    %-format string turning a row (op, *args[, value]) into the step's JSON,
+    with as_dict()'s key order. The row holds 'slots' integer arguments, of
+    which the kind uses the first len(kind.fields), and a value when
+    'value_slot'; what the kind does not use, like the opcode, is consumed
+    by "%.0s" (which prints nothing).
+    """
+    marker = "\x00"
+    record = (0, *[marker] * len(kind.fields), marker)
+    text = json.dumps(kind.as_dict(record), separators=(",", ":"))
+    text = text.replace("%", "%%")
+
+    quoted = json.dumps(marker)
+    unused = "%.0s" * (slots - len(kind.fields))
+    if kind.fields:
+        pieces = text.split(quoted, len(kind.fields))
+        text = "%d".join(pieces[:-1]) + "%d" + unused + pieces[-1]
+    else:
+        text = unused + text
+    if kind.value is not None:
+        text = text.replace(quoted, "%r")
+    elif value_slot:
+        text += "%.0s"
+    return "%.0s" + text
+
+
+def encode_steps(trace: Trace) -> bytes:
+    """
+    The JSON list of a trace's steps, written straight from its columns with
+    one template per step kind, so no step dict is ever built.
+    """
+    values = trace.values
+    if values is not None and not _plain_numbers(values):
+        return dumps(trace.to_list())
+    arity = trace.arity
+    columns: List[Sequence[Any]] = [trace.args[k::arity] for k in range(arity)]
+    if values is not None:
+        columns.append(values)
+    templates = [_template(kind, arity, values is not None) for kind in trace.kinds]
+    body = ",".join([templates[row[0]] % row for row in zip(trace.ops, *columns)])
+    return ("[" + body + "]").encode("utf-8")
+
+
+def record_encoder(
+    kinds: Sequence[StepKind], array_values: Sequence[Any]
+) -> Callable[[Tuple[Any, ...]], str]:
+    """
+    Return a function writing one raw record of a tracer over 'array_values'
+    as its step's JSON, through the same templates as encode_steps() when
+    every value is a plain number.
+    """
+    if _plain_numbers(array_values):
+        templates = [_template(kind, len(kind.fields), False) for kind in kinds]
+        return lambda record: templates[record[0]] % record
+    return lambda record: dumps(kinds[record[0]].as_dict(record)).decode("utf-8")
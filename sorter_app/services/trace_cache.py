@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from algorithms.trace import Trace, value_typecode
+
+CacheKey = Tuple[str, str, Optional[int], Tuple[Tuple[str, Any], ...]]
+
+
+def array_digest(arr: List[Any]) -> str:
+    """
+    Stable content hash of an input array. Ints and floats are hashed through
+    their packed representation, so [1, 2] and [1.0, 2.0] (whose traces carry
+    different values) never share a digest.
+    """
+    typecode = value_typecode(arr)
+    digest = hashlib.sha256()
+    if typecode is None:
+        digest.update(b"j")
+        digest.update(json.dumps(arr).encode("utf-8"))
+    else:
+        digest.update(typecode.encode("ascii"))
+        if not isinstance(arr, array):  # ingested input is hashed in place
+            arr = array(typecode, arr)
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(
+    algorithm: str,
+    arr: List[Any],
+    seed: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+    digest: Optional[str] = None,
+) -> CacheKey:
+    """
+    Key of a trace; any other option changing the trace goes in 'options'.
+    'digest' is array_digest(arr) when the caller already has it.
+    """
+    extra = tuple(sorted((options or {}).items()))
+    return (algorithm, digest or array_digest(arr), seed, extra)
+
+
+class TraceCache:
+    """
+    Content-addressed cache of finished traces, keyed by
+    (algorithm, hash of the input array, seed, other tracer options).
+
+    The cache is bounded by the total bytes of the traces it holds and drops
+    the least recently used ones first. Hits, misses and evictions are counted.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Trace]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Trace]:
+        with self._lock:
+            trace = self._entries.get(key)
+            if trace is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return trace
+
+    def put(self, key: Hashable, trace: Trace) -> None:
+        if trace.nbytes > self.max_bytes:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = trace
+            self._bytes += trace.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Trace]) -> Trace:
+        """
+        Return the cached trace for 'key', or build it with 'create()' and
+        cache it. Tracing runs outside the lock, so two concurrent misses on
+        the same key may both compute it; the results are identical.
+        """
+        trace = self.get(key)
+        if trace is None:
+            trace = create()
+            self.put(key, trace)
+        return trace
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,82 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from algorithms.trace import Trace
+
+
+class StoredTrace(NamedTuple):
+    algorithm: str
+    trace: Trace
+    expires_at: float
+
+
+class TraceStore:
+    """
+    Keeps generated traces in memory under random ids, so clients can page
+    through them (or replay them) without the trace being regenerated.
+
+    Entries expire 'ttl' seconds after their last access. When the traces
+    held exceed 'max_bytes' in total, the least recently used are dropped.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[str, StoredTrace]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, algorithm: str, trace: Trace) -> str:
+        trace_id = uuid.uuid4().hex
+        with self._lock:
+            now = self._clock()
+            self._entries[trace_id] = StoredTrace(algorithm, trace, now + self.ttl)
+            self._bytes += trace.nbytes
+            self._evict(now)
+        return trace_id
+
+    def get(self, trace_id: str) -> Optional[StoredTrace]:
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            entry = self._entries.get(trace_id)
+            if entry is None:
+                return None
+            # sliding expiry: a trace being scrubbed stays alive
+            entry = entry._replace(expires_at=now + self.ttl)
+            self._entries[trace_id] = entry
+            self._entries.move_to_end(trace_id)
+            return entry
+
+    def delete(self, trace_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(trace_id, None)
+            if entry is None:
+                return False
+            self._bytes -= entry.trace.nbytes
+            return True
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float) -> None:
+        # entries are kept in access order, so expired ones come first
+        while self._entries:
+            trace_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now and self._bytes <= self.max_bytes:
+                break
+            del self._entries[trace_id]
+            self._bytes -= entry.trace.nbytes
@@ -14,23 +14,16 @@ async function startVisualization() {
   setStatus("Fetching steps from backend...");
 
   try {
-    const res = await fetch(`/sort/${selectedAlgorithm}`, {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ array: arr }),
-    });
-    if (!res.ok) throw new Error("Request failed");
-
-    const data = await res.json();
+    const steps = await fetchSteps(selectedAlgorithm, arr);
 
     if (selectedAlgorithm === "bubble") {
-      await visualizeBubble(data.steps);
+      await visualizeBubble(steps);
     } else if (selectedAlgorithm === "insertion") {
-      await visualizeInsertion(data.steps);
+      await visualizeInsertion(steps);
     } else if (selectedAlgorithm === "merge") {
-      await visualizeMerge(data.steps);
+      await visualizeMerge(steps);
     } else if (selectedAlgorithm === "quick") {
-      await visualizeQuick(data.steps);
+      await visualizeQuick(steps);
     }
     setStatus("Sorting complete!");
   } catch (err) {
@@ -43,16 +36,138 @@ async function startVisualization() {
   }
 }
 
+// Parse an NDJSON response body line by line as chunks arrive. A stream cut
+// short by the server ends with an { error, ... } line instead of a step;
+// it is thrown rather than yielded, so it is shown instead of drawn.
+async function* readStepStream(res) {
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+
+  const parse = (line) => {
+    const item = JSON.parse(line);
+    if (item.error) {
+      reader.cancel();
+      throw new Error(item.error);
+    }
+    return item;
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    for (const line of lines) {
+      if (line) yield parse(line);
+    }
+  }
+  if (buffered) yield parse(buffered);
+}
+
+// ---------- Binary traces ----------
+// Layout written by services/binary_trace.py: "SRTB", values typecode,
+// args typecode, uint32 step count, uint32 metadata length, metadata JSON,
+// then the ops / args / values columns, each starting on an 8-byte boundary.
+
+const TYPED_ARRAYS = { h: Int16Array, i: Int32Array, q: BigInt64Array, d: Float64Array };
+
+function align8(offset) {
+  return offset + ((8 - (offset % 8)) % 8);
+}
+
+// Decode an ArrayBuffer into the same { algorithm, steps, ... } as the JSON
+// body. Columns are viewed in place (typed arrays use the platform byte
+// order, little-endian on every browser we target).
+function decodeBinaryTrace(buffer) {
+  const view = new DataView(buffer);
+  const text = new TextDecoder();
+  if (text.decode(new Uint8Array(buffer, 0, 4)) !== "SRTB") {
+    throw new Error("Not a binary trace");
+  }
+  const valueType = String.fromCharCode(view.getUint8(4));
+  const argType = String.fromCharCode(view.getUint8(5));
+  const count = view.getUint32(6, true);
+  const metaLength = view.getUint32(10, true);
+  const { kinds, arity, ...meta } = JSON.parse(
+    text.decode(new Uint8Array(buffer, 14, metaLength))
+  );
+
+  let offset = align8(14 + metaLength);
+  const ops = new Uint8Array(buffer, offset, count);
+  offset = align8(offset + count);
+  const args = new TYPED_ARRAYS[argType](buffer, offset, count * arity);
+  offset = align8(offset + args.byteLength);
+  const values =
+    valueType === "-" ? null : new TYPED_ARRAYS[valueType](buffer, offset, count);
+
+  const steps = new Array(count);
+  for (let k = 0; k < count; k++) {
+    const kind = kinds[ops[k]];
+    const step = {};
+    if (kind.type !== null) step.type = kind.type;
+    kind.fields.forEach((name, position) => {
+      step[name] = args[k * arity + position];
+    });
+    if (kind.value !== null) step[kind.value] = Number(values[k]);
+    steps[k] = Object.assign(step, kind.extra);
+  }
+  return { ...meta, steps };
+}
+
+// POST a sort request, throwing the server's { error } message on failure.
+async function postSort(algorithm, body, accept) {
+  const res = await fetch(`/sort/${algorithm}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: accept },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok) {
+    const error = await res.json().catch(() => ({}));
+    throw new Error(error.error || "Request failed");
+  }
+  return res;
+}
+
+// Fetch a whole trace in the packed format, falling back to JSON when the
+// server answers with it (e.g. for values with no binary form).
+async function fetchBinaryTrace(algorithm, array, options = {}) {
+  const res = await postSort(
+    algorithm,
+    { array, ...options },
+    "application/octet-stream"
+  );
+  if (res.headers.get("Content-Type") === "application/octet-stream") {
+    return decodeBinaryTrace(await res.arrayBuffer());
+  }
+  return res.json();
+}
+
+// The steps to animate: the packed trace, a fraction of the JSON size, or,
+// in browsers without 64-bit typed arrays to view it, the NDJSON stream,
+// animated as it arrives.
+async function fetchSteps(algorithm, array) {
+  if (typeof BigInt64Array !== "undefined") {
+    return (await fetchBinaryTrace(algorithm, array)).steps;
+  }
+  const res = await postSort(algorithm, { array }, "application/x-ndjson");
+  const steps = readStepStream(res);
+  await steps.next(); // header line: { algorithm }
+  return steps;
+}
+
 // ---------- Sorting visualizers ----------
+// Each visualizer accepts an array of steps or an async iterable of them.
 
 async function visualizeBubble(steps) {
   const elements = getArrayElements();
   setStatus("Starting Bubble Sort...");
 
   let stepNum = 1;
-  const total = steps.length;
+  const total = steps.length ?? "?";
 
-  for (const { i, j, swap } of steps) {
+  for await (const { i, j, swap } of steps) {
     setStatus(
       `Step ${stepNum++}/${total}: Comparing index ${i} (${
         elements[i].textContent
@@ -98,9 +213,9 @@ async function visualizeInsertion(steps) {
   setStatus("Starting Insertion Sort...");
 
   let stepNum = 1;
-  const total = steps.length;
+  const total = steps.length ?? "?";
 
-  for (const step of steps) {
+  for await (const step of steps) {
     if (step.type === "key") {
       setStatus(
         `Step ${stepNum++}/${total}: Inserting value ${
@@ -168,9 +283,9 @@ async function visualizeMerge(steps) {
   setStatus("Starting Merge Sort...");
 
   let stepNum = 1;
-  const total = steps.length;
+  const total = steps.length ?? "?";
 
-  for (const step of steps) {
+  for await (const step of steps) {
     if (step.type === "split") {
       setStatus(`Step ${stepNum++}/${total}: Splitting subarray...`);
       const { start, mid, end } = step;
@@ -223,9 +338,9 @@ async function visualizeQuick(steps) {
   setStatus("Starting Quick Sort...");
 
   let stepNum = 1;
-  const total = steps.length;
+  const total = steps.length ?? "?";
 
-  for (const step of steps) {
+  for await (const step of steps) {
     if (step.type === "pivot") {
       setStatus(
         `Step ${stepNum++}/${total}: Selecting pivot at index ${step.index}`
@@ -279,6 +394,57 @@ async function visualizeQuick(steps) {
       elements[step.index].style.backgroundColor = keyColor;
       await delay(animationSpeed);
     }
+
+    // three-way partitioning: element i classified as <, == or > pivot
+    if (step.type === "lt" || step.type === "eq" || step.type === "gt") {
+      const relation = { lt: "<", eq: "=", gt: ">" }[step.type];
+      setStatus(
+        `Step ${stepNum++}/${total}: Index ${step.i} ${relation} pivot (lt=${
+          step.lt
+        }, gt=${step.gt})`
+      );
+      const el = elements[step.i];
+      el.style.backgroundColor =
+        step.type === "lt" ? mergeLeft : step.type === "gt" ? mergeRight : pivotColor;
+      await delay(animationSpeed);
+      el.style.backgroundColor = normal;
+    }
+
+    if (step.type === "done_range") {
+      setStatus(
+        `Step ${stepNum++}/${total}: Values equal to the pivot placed at ${
+          step.start
+        }–${step.end}`
+      );
+      for (let i = step.start; i <= step.end; i++)
+        elements[i].style.backgroundColor = keyColor;
+      await delay(animationSpeed);
+    }
+
+    // introsort fallback: a range that recursed too deep is heap-sorted
+    if (step.type === "heap") {
+      setStatus(
+        `Step ${stepNum++}/${total}: Heap-sorting indices ${step.start}–${step.end}`
+      );
+      for (let i = step.start; i <= step.end; i++)
+        elements[i].style.backgroundColor = mergeLeft;
+      await delay(animationSpeed * 1.3);
+      for (let i = step.start; i <= step.end; i++)
+        elements[i].style.backgroundColor = normal;
+    }
+
+    if (step.type === "heap_compare") {
+      setStatus(
+        `Step ${stepNum++}/${total}: Comparing index ${step.i} and ${step.j}`
+      );
+      const el1 = elements[step.i];
+      const el2 = elements[step.j];
+      el1.style.backgroundColor = highlight;
+      el2.style.backgroundColor = highlight;
+      await delay(animationSpeed);
+      el1.style.backgroundColor = normal;
+      el2.style.backgroundColor = normal;
+    }
   }
 
   setStatus("Quick Sort complete!");
@@ -0,0 +1,122 @@
+from http import HTTPStatus
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from algorithms.cost import CostEstimate
+from algorithms.registry import ALGORITHMS
+from routes import batch_routes
+from routes.batch_routes import batch_blueprint
+from routes.sorting_routes import sorting_blueprint
+
+# ---------------------------
+# flask test client
+# ---------------------------
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(batch_blueprint)
+    app.config.update(TESTING=True)
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+# ---------------------------
+# batches
+# ---------------------------
+
+
+def test_batch_returns_every_body_in_order(client):
+    jobs = [
+        {"algorithm": "bubble", "array": [3, 1, 2]},
+        {"algorithm": "merge", "array": [4, 2], "options": {"mode": "counts"}},
+        {"algorithm": "quick", "array": [5, 3, 8, 1], "options": {"seed": 2}},
+    ]
+    resp = client.post("/sort/batch", json={"jobs": jobs})
+    assert resp.status_code == HTTPStatus.OK
+    results = resp.get_json()["results"]
+
+    for job, result in zip(jobs, results):
+        single = client.post(
+            f"/sort/{job['algorithm']}",
+            json={"array": job["array"], **job.get("options", {})},
+        )
+        assert result == single.get_json()
+
+
+def test_batch_reports_errors_per_job(client):
+    client.application.config["SORT_MAX_STEPS"] = 50
+    jobs = [
+        {"algorithm": "bogo", "array": [1]},
+        {"algorithm": "merge", "array": "x"},
+        {"algorithm": "merge", "array": [1], "options": 3},
+        "merge",
+        {"algorithm": "insertion", "array": list(range(20, 0, -1))},
+        {"algorithm": "merge", "array": [2, 1]},
+    ]
+    results = client.post("/sort/batch", json={"jobs": jobs}).get_json()["results"]
+
+    statuses = [result.get("status") for result in results]
+    assert statuses == [400, 400, 400, 400, 413, None]
+    assert all("error" in result for result in results[:5])
+    assert results[4]["estimate"]["exact"] is True
+    assert results[5]["algorithm"] == "merge"
+
+
+def test_batch_shares_one_response_bytes_budget(client):
+    client.application.config["SORT_MAX_RESPONSE_BYTES"] = 3000
+    job = {"algorithm": "bubble", "array": list(range(12, 0, -1))}
+    results = client.post("/sort/batch", json={"jobs": [job] * 3}).get_json()[
+        "results"
+    ]
+    assert "steps" in results[0]
+    assert results[-1]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert "suggested_sample" in results[-1]
+
+
+def test_batch_shares_one_step_budget(client):
+    # 66 steps each; sampling shrinks the bytes, not the work
+    client.application.config["SORT_MAX_STEPS"] = 150
+    job = {"algorithm": "bubble", "array": list(range(12, 0, -1))}
+    jobs = [
+        {**job, "options": {"sample": 10}},
+        {**job, "options": {"mode": "counts"}},
+        job,
+    ]
+    results = client.post("/sort/batch", json={"jobs": jobs}).get_json()["results"]
+    assert results[0]["total_steps"] == 66
+    assert results[1]["counts"]["comparisons"] == 66
+    assert results[2]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert results[2]["max_steps"] == 150 - 2 * 66
+
+
+def test_batch_jobs_stop_at_the_remaining_budget(client, monkeypatch):
+    # a job whose estimate falls short fits the 13 steps left after the
+    # first job, then is stopped at them
+    quick = ALGORITHMS["quick"]
+    short = quick._replace(cost=lambda arr, **options: CostEstimate(1, exact=False))
+    monkeypatch.setitem(ALGORITHMS, "quick", short)
+    client.application.config["SORT_MAX_STEPS"] = 14
+    jobs = [
+        {"algorithm": "bubble", "array": [2, 1]},
+        {"algorithm": "quick", "array": [73, 10, 62], "options": {"seed": 1}},
+    ]
+    results = client.post("/sort/batch", json={"jobs": jobs}).get_json()["results"]
+    assert len(results[0]["steps"]) == 1
+    assert results[1]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert results[1]["max_steps"] == 13
+
+
+@pytest.mark.parametrize("body", [{}, {"jobs": {"algorithm": "merge"}}])
+def test_batch_bad_payloads(client, body):
+    resp = client.post("/sort/batch", json=body)
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(batch_routes, "MAX_BATCH_JOBS", 2)
+    jobs = [{"algorithm": "merge", "array": [1]}] * 3
+    resp = client.post("/sort/batch", json={"jobs": jobs})
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
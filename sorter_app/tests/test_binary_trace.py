@@ -0,0 +1,43 @@
+import pytest  # type: ignore
+
+from algorithms.registry import ALGORITHMS
+from services.binary_trace import can_encode, decode_trace, encode_trace
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+@pytest.mark.parametrize("arr", [[5, 3, 8, 1, 9, 2], [2.5, -1.0, 7.25, 0.5], []])
+def test_round_trip_matches_the_json_steps(name, arr):
+    options = {"seed": 3} if name == "quick" else {}
+    trace = ALGORITHMS[name].collect(arr, **options)
+    meta = {"algorithm": name, "total_steps": trace.total_steps}
+
+    body = decode_trace(encode_trace(trace, meta))
+    assert body == {**meta, "steps": trace.to_list()}
+
+
+def test_indices_are_narrowed_when_they_fit():
+    small = ALGORITHMS["bubble"].collect(list(range(20, 0, -1)))
+    data = encode_trace(small, {})
+    assert data[5:6] == b"h"
+    # one opcode byte and two int16 indices per step, plus the header
+    assert len(data) < len(small) * 5 + 200
+
+    # indices past int16 (sampled, to keep the trace small)
+    large = ALGORITHMS["insertion"].collect(
+        list(range(40000)) + [-1], sample_every=1000
+    )
+    data = encode_trace(large, {})
+    assert data[5:6] == b"i"
+    assert decode_trace(data)["steps"] == large.to_list()
+
+
+def test_values_without_a_typecode_are_refused():
+    trace = ALGORITHMS["merge"].collect([2**70, 1])
+    assert not can_encode(trace)
+    with pytest.raises(ValueError):
+        encode_trace(trace, {})
+
+
+def test_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        decode_trace(b"{}" + bytes(20))
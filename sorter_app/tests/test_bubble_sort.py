@@ -1,4 +1,4 @@
-from algorithms.bubble_sort import bubble_sort
+from algorithms.bubble_sort import bubble_sort, bubble_sort_result
 import copy
 from typing import List, Union
 import pytest  # type: ignore
@@ -54,3 +54,14 @@ def test_trace_matches_builtin_sort(arr):
 
     # And bubble_sort must not mutate the original input
     assert arr == arr_copy
+
+
+@pytest.mark.parametrize("arr", [[], [1], [5, 4, 3, 2, 1], [3, 1, 2, 3, 2, 1]])
+def test_result_counts_match_trace(arr):
+    result = bubble_sort_result(arr)
+    trace = bubble_sort(arr)
+
+    assert result.array == sorted(arr)
+    assert result.comparisons == len(trace)
+    assert result.swaps == sum(1 for step in trace if step["swap"])
+    assert result.writes == 2 * result.swaps
@@ -0,0 +1,34 @@
+import random
+
+from services.comparison import compare_algorithms, comparison_cost
+
+
+def test_compare_reports_every_algorithm_and_baseline():
+    arr = [random.randint(1, 100) for _ in range(60)]
+    results = compare_algorithms(arr, options={"quick": {"seed": 1}})
+
+    names = [entry["algorithm"] for entry in results]
+    assert names == ["bubble", "insertion", "merge", "quick", "sorted"]
+    for entry in results:
+        assert entry["comparisons"] > 0
+        assert entry["time_ms"] >= 0
+        assert entry["peak_bytes"] >= 0
+
+    baseline = results[-1]
+    assert baseline["swaps"] is None
+    assert baseline["writes"] is None
+
+
+def test_compare_subset_does_not_touch_input():
+    arr = [3, 1, 2]
+    results = compare_algorithms(arr, ["merge"])
+    assert [entry["algorithm"] for entry in results] == ["merge"]
+    assert arr == [3, 1, 2]
+
+
+def test_comparison_cost_predicts_without_running():
+    arr = list(range(100, 0, -1))
+    assert comparison_cost("bubble", arr) == (4950, True)
+    baseline = comparison_cost("sorted", arr)
+    assert not baseline.exact and 600 < baseline.steps < 700
+    assert comparison_cost("sorted", [1]).steps == 0
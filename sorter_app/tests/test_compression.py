@@ -0,0 +1,152 @@
+import gzip
+import json
+import zlib
+from http import HTTPStatus
+from io import BytesIO
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from routes.data_structures_routes import ds_blueprint
+from routes.sorting_routes import sorting_blueprint
+from routes.upload_routes import upload_blueprint
+from services.compression import compress_chunks, install_compression
+
+ARRAY = list(range(60, 0, -1))
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(ds_blueprint)
+    app.register_blueprint(upload_blueprint)
+    app.config.update(TESTING=True)
+    install_compression(app, blueprints=("sorting", "ds"))
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+# ---------------------------
+# negotiation
+# ---------------------------
+
+
+@pytest.mark.parametrize(
+    "accept, encoding, decompress",
+    [
+        ("gzip", "gzip", gzip.decompress),
+        ("deflate", "deflate", zlib.decompress),
+        ("gzip;q=0, deflate", "deflate", zlib.decompress),
+        ("br, gzip;q=0.5", "gzip", gzip.decompress),
+    ],
+)
+def test_trace_is_compressed(client, accept, encoding, decompress):
+    plain = client.post("/sort/bubble", json={"array": ARRAY})
+    resp = client.post(
+        "/sort/bubble", json={"array": ARRAY}, headers={"Accept-Encoding": accept}
+    )
+    assert resp.headers["Content-Encoding"] == encoding
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert decompress(resp.data) == plain.data
+    assert len(resp.data) * 10 < len(plain.data)
+
+
+def test_without_accept_encoding_nothing_changes(client):
+    resp = client.post("/sort/bubble", json={"array": ARRAY})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_json()["algorithm"] == "bubble"
+
+
+def test_tiny_bodies_are_sent_as_they_are(client):
+    resp = client.post(
+        "/sort/merge",
+        json={"array": [2, 1], "mode": "counts"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_json()["mode"] == "counts"
+
+
+def test_only_the_selected_blueprints(client):
+    lines = "\n".join(str(x) for x in ARRAY * 20)
+    resp = client.post(
+        "/array/upload",
+        data={"file": (BytesIO(lines.encode()), "numbers.txt")},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert "Content-Encoding" not in resp.headers
+
+
+def test_ds_routes_are_compressed(client):
+    body = {"state": list(range(2000)), "action": "pop"}
+    resp = client.post("/ds/stack", json=body, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.data))["new_state"] == list(range(1999))
+
+
+# ---------------------------
+# streamed bodies
+# ---------------------------
+
+
+def test_stream_is_compressed_chunk_by_chunk(client):
+    resp = client.post(
+        "/sort/bubble?stream=1",
+        json={"array": ARRAY},
+        headers={"Accept-Encoding": "gzip"},
+        buffered=False,
+    )
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    text = b""
+    for chunk in resp.response:
+        text += decompressor.decompress(chunk)
+        # every chunk decodes to whole lines right away
+        assert text.endswith(b"\n") or not text
+    resp.close()
+    header, *steps = text.decode().splitlines()
+    assert json.loads(header) == {"algorithm": "bubble"}
+    assert len(steps) == 60 * 59 // 2
+
+
+def test_compress_chunks_round_trip():
+    chunks = ["ab" * 100, b"cd" * 100, ""]
+    data = b"".join(compress_chunks(chunks, "deflate"))
+    assert zlib.decompress(data) == b"ab" * 100 + b"cd" * 100
+
+
+def test_compressed_responses_carry_a_weak_etag(client):
+    headers = {"Accept-Encoding": "gzip"}
+    resp = client.post("/sort/bubble", json={"array": ARRAY}, headers=headers)
+    assert resp.headers["ETag"].startswith('W/"')
+
+    headers["If-None-Match"] = resp.headers["ETag"]
+    again = client.post("/sort/bubble", json={"array": ARRAY}, headers=headers)
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+    # a 304 repeats the validator and the Vary of its 200
+    assert again.headers["ETag"] == resp.headers["ETag"]
+    assert set(again.headers["Vary"].split(", ")) == {"Accept", "Accept-Encoding"}
+
+
+@pytest.mark.parametrize("accept_encoding, weak", [("gzip", True), ("", False)])
+def test_small_and_replayed_bodies_keep_the_200_validator(
+    client, accept_encoding, weak
+):
+    # too small to compress, but it could have been: weak all the same
+    headers = {"Accept-Encoding": accept_encoding}
+    resp = client.post("/sort/merge", json={"array": [2, 1]}, headers=headers)
+    assert "Content-Encoding" not in resp.headers
+    assert resp.headers["ETag"].startswith('W/"') == weak
+
+    url = f"/sort/merge/array/{resp.headers['X-Array-Hash']}"
+    replayed = client.get(url, headers=headers)
+    headers["If-None-Match"] = replayed.headers["ETag"]
+    cached = client.get(url, headers=headers)
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers["ETag"] == replayed.headers["ETag"]
+    assert cached.headers["Cache-Control"] == replayed.headers["Cache-Control"]
@@ -0,0 +1,92 @@
+import json
+import random
+
+import pytest  # type: ignore
+
+from algorithms.cost import (
+    CostEstimate,
+    estimate_bytes,
+    left_larger_counts,
+    step_json_bytes,
+)
+from algorithms.registry import ALGORITHMS
+
+rng = random.Random(7)
+ARRAYS = [
+    [],
+    [1],
+    [2, 1],
+    [3, 3, 3],
+    list(range(60)),
+    list(range(60, 0, -1)),
+    [rng.randint(0, 5) for _ in range(80)],
+    [rng.randint(-1000, 1000) for _ in range(120)],
+    [rng.random() for _ in range(90)],
+    [1, 2.5, -3, 2.5, 0],
+]
+
+
+def test_left_larger_counts_match_brute_force():
+    for arr in ARRAYS:
+        expected = [sum(1 for x in arr[:i] if x > v) for i, v in enumerate(arr)]
+        assert left_larger_counts(arr) == expected
+
+
+@pytest.mark.parametrize("name", ["bubble", "insertion"])
+@pytest.mark.parametrize("arr", ARRAYS)
+def test_quadratic_costs_are_exact(name, arr):
+    algorithm = ALGORITHMS[name]
+    estimate = algorithm.cost(arr)
+    assert estimate.exact
+    assert estimate.steps == sum(1 for _ in algorithm.steps(arr))
+
+
+@pytest.mark.parametrize("arr", ARRAYS)
+def test_merge_cost_is_an_upper_bound(arr):
+    estimate = ALGORITHMS["merge"].cost(arr)
+    steps = sum(1 for _ in ALGORITHMS["merge"].steps(arr))
+    assert not estimate.exact
+    assert steps <= estimate.steps <= steps + len(arr) * 8
+
+
+ADVERSARIAL = {
+    "sorted": list(range(1000)),
+    "reversed": list(range(1000, 0, -1)),
+    "organ_pipe": list(range(500)) + list(range(500, 0, -1)),
+    "equal": [7] * 1000,
+}
+
+
+@pytest.mark.parametrize("pivot", ["first", "random", "median3", "ninther"])
+@pytest.mark.parametrize("partition", ["lomuto", "three_way"])
+@pytest.mark.parametrize("arr", list(ADVERSARIAL.values()), ids=list(ADVERSARIAL))
+def test_quick_cost_is_an_upper_bound(arr, pivot, partition):
+    options = {"pivot": pivot, "seed": 3, "partition": partition}
+    estimate = ALGORITHMS["quick"].cost(arr, **options)
+    steps = sum(1 for _ in ALGORITHMS["quick"].steps(arr, **options))
+    assert not estimate.exact
+    assert steps <= estimate.steps
+
+
+def test_quick_cost_is_within_a_small_factor_on_random_input():
+    arr = [rng.randint(0, 10**6) for _ in range(2000)]
+    steps = sum(1 for _ in ALGORITHMS["quick"].steps(arr, seed=3))
+    estimate = ALGORITHMS["quick"].cost(arr, seed=3)
+    assert steps <= estimate.steps <= 5 * steps
+
+
+def test_step_json_bytes_bounds_the_real_steps():
+    arr = [rng.randint(-(10**9), 10**9) for _ in range(200)]
+    for algorithm in ALGORITHMS.values():
+        widest = step_json_bytes(algorithm.kinds, arr)
+        for step in algorithm.trace(arr):
+            assert len(json.dumps(step, separators=(",", ":"))) < widest
+
+
+def test_estimate_bytes_scales_with_sampling():
+    kinds = ALGORITHMS["bubble"].kinds
+    arr = list(range(100))
+    full = estimate_bytes(kinds, arr, CostEstimate(1000))
+    sampled = estimate_bytes(kinds, arr, CostEstimate(1000), sample_every=10)
+    assert full == {"steps": 1000, "exact": True, "bytes": full["bytes"]}
+    assert sampled["bytes"] * 10 == full["bytes"]
@@ -0,0 +1,141 @@
+import time
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from algorithms.registry import ALGORITHMS
+from algorithms.trace import StepBudgetExceeded
+from routes import sorting_routes
+from routes.batch_routes import batch_blueprint
+from routes.sorting_routes import sorting_blueprint
+from services.executor import (
+    ExecutorBusy,
+    TraceCancelled,
+    TraceExecutor,
+    TraceHandle,
+    TraceTimeout,
+)
+
+BIG = list(range(3000, 0, -1))  # about 4.5M bubble sort steps
+
+
+@pytest.fixture(scope="module")
+def executor():
+    executor = TraceExecutor(processes=2)
+    yield executor
+    executor.shutdown()
+
+
+# ---------------------------
+# TraceExecutor
+# ---------------------------
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_pool_trace_matches_in_process_trace(executor, name):
+    arr = [9, 2, 7, 4, 4, 1, 8, 3]
+    options = {"seed": 1} if name == "quick" else {}
+    trace = executor.collect(name, arr, keyframe_every=5, **options)
+    local = ALGORITHMS[name].collect(arr, keyframe_every=5, **options)
+
+    assert trace == local
+    assert trace.keyframes.keys() == local.keyframes.keys()
+    assert trace.state_at(len(trace)) == sorted(arr)
+
+
+def test_budget_error_crosses_the_process_boundary(executor):
+    with pytest.raises(StepBudgetExceeded) as info:
+        executor.collect("bubble", list(range(50, 0, -1)), max_steps=10)
+    assert info.value.max_steps == 10
+
+
+def test_timeout(executor):
+    with pytest.raises(TraceTimeout) as info:
+        executor.collect("bubble", BIG, timeout=0.05)
+    assert info.value.timeout == 0.05
+
+
+def test_cancel_running_trace(executor):
+    handle = executor.submit("bubble", BIG)
+    deadline = time.monotonic() + 30
+    while handle.progress() == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    handle.cancel()
+    with pytest.raises(TraceCancelled):
+        handle.result()
+
+
+def test_busy_when_every_slot_is_taken():
+    executor = TraceExecutor(processes=1, max_tasks=1)
+    try:
+        handle = executor.submit("bubble", BIG)
+        with pytest.raises(ExecutorBusy):
+            executor.submit("merge", [2, 1])
+        handle.cancel()
+        assert handle.wait(30)
+    finally:
+        executor.shutdown()
+
+
+# ---------------------------
+# routes on the process pool
+# ---------------------------
+
+
+@pytest.fixture
+def client(executor, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_executor", executor)
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(batch_blueprint)
+    app.config.update(TESTING=True)
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+def test_sort_route_uses_the_pool(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("traced in the request thread")
+
+    # the worker processes import their own, unpatched registry
+    quick = ALGORITHMS["quick"]._replace(steps=fail)
+    monkeypatch.setitem(ALGORITHMS, "quick", quick)
+    arr = [5, 3, 8, 1]
+    resp = client.post("/sort/quick", json={"array": arr, "pivot": "random"})
+    assert resp.status_code == HTTPStatus.OK
+    assert len(resp.get_json()["steps"]) > 0
+
+
+def test_sort_route_times_out(client):
+    client.application.config["SORT_TRACE_TIMEOUT"] = 0.05
+    resp = client.post("/sort/bubble", json={"array": BIG})
+    assert resp.status_code == HTTPStatus.GATEWAY_TIMEOUT
+    assert resp.get_json()["timeout"] == 0.05
+
+
+def test_batch_traces_run_on_the_pool(client, monkeypatch):
+    events = []
+    submit, result = sorting_routes.trace_executor.submit, TraceHandle.result
+
+    def spy_submit(*args, **kwargs):
+        events.append("submit")
+        return submit(*args, **kwargs)
+
+    def spy_result(handle):
+        events.append("result")
+        return result(handle)
+
+    monkeypatch.setattr(sorting_routes.trace_executor, "submit", spy_submit)
+    monkeypatch.setattr(TraceHandle, "result", spy_result)
+    # unseeded random pivots are never cached, so every job is traced
+    job = {"algorithm": "quick", "array": [4, 1, 3, 2], "options": {"pivot": "random"}}
+    resp = client.post("/sort/batch", json={"jobs": [job] * 3})
+
+    assert resp.status_code == HTTPStatus.OK
+    # every job is queued before the first one is waited for
+    assert events == ["submit"] * 3 + ["result"] * 3
+    for body in resp.get_json()["results"]:
+        assert body["algorithm"] == "quick"
+        assert len(body["steps"]) > 0
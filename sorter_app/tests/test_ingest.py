@@ -0,0 +1,55 @@
+from array import array
+
+import pytest  # type: ignore
+
+from services.ingest import ingest_array
+from services.trace_cache import array_digest
+
+
+def test_integers_become_int64_buffer():
+    buffer = ingest_array([3, -1, 2])
+    assert isinstance(buffer, array) and buffer.typecode == "q"
+    assert list(buffer) == [3, -1, 2]
+
+
+def test_floats_become_a_double_buffer():
+    buffer = ingest_array([3.0, 1.5, 2.25])
+    assert isinstance(buffer, array) and buffer.typecode == "d"
+    assert list(buffer) == [3.0, 1.5, 2.25]
+
+
+def test_values_without_a_typecode_stay_a_list():
+    # beyond 64 bits, and integers mixed with floats, which would come
+    # back as floats from a double buffer
+    assert ingest_array([2**70, 1]) == [2**70, 1]
+    mixed = ingest_array([3, 1.5, 2])
+    assert mixed == [3, 1.5, 2]
+    assert [type(x) for x in mixed] == [int, float, int]
+
+
+@pytest.mark.parametrize(
+    "values, message",
+    [
+        ("1, 2", "JSON list"),
+        ({"a": 1}, "JSON list"),
+        ([1, "2"], "must be numbers"),
+        ([1, None], "must be numbers"),
+        ([True, 1], "must be numbers"),
+        ([1.0, float("nan")], "finite"),
+        ([float("-inf"), 2], "finite"),
+    ],
+)
+def test_invalid_input_raises_value_error(values, message):
+    with pytest.raises(ValueError, match=message):
+        ingest_array(values)
+
+
+def test_bools_and_nan_allowed_on_request():
+    assert ingest_array([True, 2], allow_bools=True) == [True, 2]
+    buffer = ingest_array([float("inf"), 1.0], allow_nan=True)
+    assert list(buffer) == [float("inf"), 1.0]
+
+
+def test_buffer_digest_matches_the_list():
+    for values in ([5, 1, 4], [2.5, 1, -3], []):
+        assert array_digest(ingest_array(values)) == array_digest(values)
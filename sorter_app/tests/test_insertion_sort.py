@@ -1,4 +1,4 @@
-from algorithms.insertion_sort import insertion_sort
+from algorithms.insertion_sort import insertion_sort, insertion_sort_result
 import copy
 from typing import List, Union
 import pytest  # type: ignore
@@ -59,3 +59,17 @@ def test_trace_matches_builtin_sort(arr):
 
     # And bubble_sort must not mutate the original input
     assert arr == arr_copy
+
+
+@pytest.mark.parametrize("arr", [[], [1], [5, 4, 3, 2, 1], [3, 1, 2, 3, 2, 1]])
+def test_result_counts_match_trace(arr):
+    result = insertion_sort_result(arr)
+    trace = insertion_sort(arr)
+    types = [step["type"] for step in trace]
+
+    assert result.array == sorted(arr)
+    assert result.swaps == 0
+    assert result.writes == types.count("shift") + types.count("insert")
+    # every successful comparison is traced; the one ending each scan is not
+    assert types.count("compare") <= result.comparisons
+    assert result.comparisons <= types.count("compare") + types.count("key")
@@ -0,0 +1,247 @@
+import threading
+import time
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from routes import jobs_routes, sorting_routes
+from routes.jobs_routes import jobs_blueprint
+from routes.sorting_routes import sorting_blueprint
+from services.datasets import make_dataset
+from services.jobs import CANCELLED, DONE, FAILED, JobQueue, JobQueueFull
+from services.trace_store import TraceStore
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.status not in (DONE, FAILED, CANCELLED):
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.005)
+    return job
+
+
+# ---------------------------
+# JobQueue
+# ---------------------------
+
+
+def test_jobs_run_cheapest_first():
+    gate = threading.Event()
+    order = []
+    jobs = JobQueue(workers=1)
+    blocker = jobs.submit(lambda job: gate.wait())
+    big = jobs.submit(lambda job: order.append("big"), cost=10_000)
+    urgent = jobs.submit(lambda job: order.append("urgent"), priority=-1, cost=10**9)
+    small = jobs.submit(lambda job: order.append("small"), cost=10)
+    gate.set()
+    for job in (blocker, big, urgent, small):
+        _wait(job)
+    assert order == ["urgent", "small", "big"]
+
+
+def test_failed_job_keeps_the_error():
+    jobs = JobQueue(workers=1)
+
+    def boom(job):
+        raise ValueError("bad input")
+
+    job = _wait(jobs.submit(boom))
+    assert job.status == FAILED
+    assert job.error == "bad input"
+
+
+def test_cancel_queued_and_running_jobs():
+    gate = threading.Event()
+    started = threading.Event()
+    jobs = JobQueue(workers=1)
+
+    def spin(job):
+        started.set()
+        gate.wait()
+        for step in range(10**6):
+            job.report(step)
+
+    running = jobs.submit(spin)
+    waiting = jobs.submit(lambda job: "never")
+    started.wait(5)
+    assert jobs.cancel(waiting.id).status == CANCELLED
+    jobs.cancel(running.id)
+    gate.set()
+    assert _wait(running).status == CANCELLED
+    assert waiting.result is None
+
+
+def test_queue_is_bounded_and_forgets_finished_jobs():
+    now = [0.0]
+    gate = threading.Event()
+    jobs = JobQueue(workers=1, max_pending=1, keep_finished=10, clock=lambda: now[0])
+    first = jobs.submit(lambda job: gate.wait())
+    while first.status != "running":
+        time.sleep(0.001)
+    jobs.submit(lambda job: None)
+    with pytest.raises(JobQueueFull):
+        jobs.submit(lambda job: None)
+
+    gate.set()
+    _wait(first)
+    now[0] = 11
+    assert jobs.get(first.id) is None
+
+
+def test_queue_keeps_at_most_max_finished_jobs():
+    jobs = JobQueue(workers=1, max_finished=2)
+    done = [_wait(jobs.submit(lambda job: None)) for _ in range(3)]
+
+    assert jobs.get(done[0].id) is None
+    assert [jobs.get(job.id) for job in done[1:]] == done[1:]
+    # a finished job no longer holds its work function (and what it closes over)
+    assert done[-1].run is None
+
+
+def test_make_dataset():
+    assert make_dataset({"kind": "sorted", "size": 50}) == sorted(
+        make_dataset({"kind": "sorted", "size": 50})
+    )
+    assert len(make_dataset({"kind": "few_unique", "size": 30, "seed": 2})) == 30
+    for spec in ([], {"kind": "nope", "size": 1}, {"kind": "random", "size": -1}):
+        with pytest.raises(ValueError):
+            make_dataset(spec)
+
+
+def test_small_nearly_sorted_dataset_is_not_sorted():
+    arr = make_dataset({"kind": "nearly_sorted", "size": 10, "seed": 1})
+    assert arr != sorted(arr)
+    assert len(make_dataset({"kind": "nearly_sorted", "size": 1})) == 1
+
+
+# ---------------------------
+# /jobs routes
+# ---------------------------
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(jobs_routes, "job_queue", JobQueue(workers=2))
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(jobs_blueprint)
+    app.config.update(TESTING=True)
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+def _poll(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        data = client.get(f"/jobs/{job_id}").get_json()
+        if data["status"] in (DONE, FAILED, CANCELLED):
+            return data
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.005)
+
+
+def test_submit_poll_and_fetch_result(client):
+    arr = [5, 1, 4, 2, 3]
+    resp = client.post("/jobs", json={"algorithm": "insertion", "array": arr})
+    assert resp.status_code == HTTPStatus.ACCEPTED
+    job = resp.get_json()
+    assert resp.headers["Location"] == f"/jobs/{job['id']}"
+    assert job["estimated_steps"] == 2 * 4 + 2 * 6
+
+    status = _poll(client, job["id"])
+    assert status["status"] == DONE
+    assert status["progress"] == job["estimated_steps"]
+
+    result = client.get(f"/jobs/{job['id']}/result").get_json()
+    direct = client.post("/sort/insertion", json={"array": arr}).get_json()
+    assert result == direct
+
+    page = client.get(f"/sort/insertion/trace/{status['trace_id']}?limit=3")
+    assert page.get_json()["steps"] == direct["steps"][:3]
+
+
+def test_finished_jobs_keep_only_the_trace_id(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_store", TraceStore())
+    job = client.post("/jobs", json={"algorithm": "merge", "array": [3, 1, 2]})
+    job_id = job.get_json()["id"]
+    assert _poll(client, job_id)["status"] == DONE
+    finished = jobs_routes.job_queue.get(job_id)
+    assert finished.result is None
+    assert finished.run is None
+    assert set(finished.info) == {
+        "algorithm",
+        "options",
+        "input_len",
+        "estimated_steps",
+        "trace_id",
+    }
+
+    sorting_routes.trace_store.delete(finished.info["trace_id"])
+    assert client.get(f"/jobs/{job_id}/result").status_code == HTTPStatus.GONE
+
+
+def test_oversized_trace_fails_the_job(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_store", TraceStore(max_bytes=64))
+    body = {"algorithm": "bubble", "array": list(range(30, 0, -1))}
+    job = client.post("/jobs", json=body).get_json()
+    status = _poll(client, job["id"])
+    assert status["status"] == FAILED
+    assert "sample" in status["error"]
+
+
+def test_large_result_points_to_the_cursor_api(client):
+    client.application.config["SORT_MAX_RESPONSE_BYTES"] = 100
+    body = {"algorithm": "bubble", "array": list(range(20, 0, -1))}
+    job = client.post("/jobs", json=body).get_json()
+    trace_id = _poll(client, job["id"])["trace_id"]
+
+    resp = client.get(f"/jobs/{job['id']}/result")
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    data = resp.get_json()
+    assert data["trace_url"] == f"/sort/bubble/trace/{trace_id}"
+    assert client.get(data["trace_url"]).status_code == HTTPStatus.OK
+
+
+def test_submit_with_dataset(client):
+    body = {"algorithm": "merge", "dataset": {"kind": "reversed", "size": 40}}
+    job = client.post("/jobs", json=body).get_json()
+    assert _poll(client, job["id"])["status"] == DONE
+    result = client.get(f"/jobs/{job['id']}/result").get_json()
+    assert result["algorithm"] == "merge"
+
+
+def test_result_before_done_is_a_conflict(client, monkeypatch):
+    gate = threading.Event()
+    original = jobs_routes._run_job
+    monkeypatch.setattr(
+        jobs_routes,
+        "_run_job",
+        lambda *args: gate.wait() and original(*args),
+    )
+    job = client.post("/jobs", json={"algorithm": "bubble", "array": [2, 1]}).get_json()
+    resp = client.get(f"/jobs/{job['id']}/result")
+    assert resp.status_code == HTTPStatus.CONFLICT
+
+    cancelled = client.delete(f"/jobs/{job['id']}").get_json()
+    gate.set()
+    assert _poll(client, cancelled["id"])["status"] == CANCELLED
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"algorithm": "nope", "array": [1]},
+        {"algorithm": "bubble"},
+        {"algorithm": "bubble", "array": [1], "priority": "high"},
+        {"algorithm": "bubble", "dataset": {"kind": "random"}},
+    ],
+)
+def test_bad_job_requests(client, body):
+    assert client.post("/jobs", json=body).status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_unknown_job(client):
+    assert client.get("/jobs/missing").status_code == HTTPStatus.NOT_FOUND
+    assert client.get("/jobs/missing/result").status_code == HTTPStatus.NOT_FOUND
+    assert client.delete("/jobs/missing").status_code == HTTPStatus.NOT_FOUND
@@ -1,5 +1,5 @@
 from typing import List, Union
-from algorithms.merge_sort import merge_sort
+from algorithms.merge_sort import merge_sort, merge_sort_result
 import pytest  # type:ignore
 import copy
 
@@ -54,3 +54,13 @@ def test_trace_matches_builtin_sort(arr):
 
     # And bubble_sort must not mutate the original input
     assert arr == arr_copy
+
+
+@pytest.mark.parametrize("arr", [[], [1], [5, 4, 3, 2, 1], [3, 1, 2, 3, 2, 1]])
+def test_result_counts_match_trace(arr):
+    result = merge_sort_result(arr)
+    types = [step["type"] for step in merge_sort(arr)]
+
+    assert result.array == sorted(arr)
+    assert result.comparisons == types.count("compare")
+    assert result.writes == types.count("overwrite")
@@ -0,0 +1,131 @@
+import threading
+import time
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from routes import sorting_routes
+from routes.sorting_routes import sorting_blueprint
+from services.metrics import Metrics, MetricSpec, install_metrics
+
+
+def _sample(text, line_start):
+    """Value of the first exposition line starting with 'line_start'."""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    raise AssertionError(f"no sample {line_start!r} in:\n{text}")
+
+
+# ---------------------------
+# Metrics registry
+# ---------------------------
+
+
+def test_counters_are_summed_across_threads():
+    metrics = Metrics({"hits_total": MetricSpec("counter", "Hits.")})
+
+    def work():
+        for _ in range(1000):
+            metrics.inc("hits_total", route="/x")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics.inc("hits_total", route="/x")
+
+    assert _sample(metrics.render(), 'hits_total{route="/x"}') == 4001
+    # the finished threads were folded away, their counts kept
+    assert _sample(metrics.render(), 'hits_total{route="/x"}') == 4001
+
+
+def test_histogram_exposition():
+    metrics = Metrics({"size": MetricSpec("histogram", "Sizes.", (10.0, 100.0))})
+    for value in (5, 10, 50, 500):
+        metrics.observe("size", value)
+    text = metrics.render()
+
+    assert "# TYPE size histogram" in text
+    assert _sample(text, 'size_bucket{le="10"}') == 2
+    assert _sample(text, 'size_bucket{le="100"}') == 3
+    assert _sample(text, 'size_bucket{le="+Inf"}') == 4
+    assert _sample(text, "size_sum") == 565
+    assert _sample(text, "size_count") == 4
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics({"c": MetricSpec("counter", "C.")})
+    metrics.inc("c", path='a"b')
+    assert 'c{path="a\\"b"} 1' in metrics.render()
+
+
+# ---------------------------
+# /metrics endpoint
+# ---------------------------
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.config.update(TESTING=True)
+    install_metrics(app, Metrics())
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+def test_metrics_endpoint_reports_requests(client):
+    client.post("/sort/bubble", json={"array": [3, 1, 2]})
+    client.post("/sort/bubble", json={"array": "nope"})
+    resp = client.get("/metrics")
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.mimetype == "text/plain"
+    text = resp.get_data(as_text=True)
+
+    ok = 'sorter_requests_total{method="POST",route="/sort/bubble",status="200"}'
+    bad = 'sorter_requests_total{method="POST",route="/sort/bubble",status="400"}'
+    assert _sample(text, ok) == 1
+    assert _sample(text, bad) == 1
+    duration = 'sorter_request_duration_seconds_count{route="/sort/bubble"}'
+    assert _sample(text, duration) == 2
+    assert _sample(text, 'sorter_trace_steps_count{algorithm="bubble"}') == 1
+    assert _sample(text, 'sorter_response_size_bytes_count{route="/sort/bubble"}') == 2
+    # only the scrape itself is in flight
+    assert _sample(text, "sorter_requests_in_flight") == 1
+
+
+def test_in_flight_returns_to_zero(client):
+    client.post("/sort/quick", json={"array": [2, 1]})
+    metrics = client.application.extensions["metrics"]
+    assert _sample(metrics.render(), "sorter_requests_in_flight") == 0
+
+
+def test_streamed_responses_are_recorded_when_closed(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "STREAM_CHUNK_STEPS", 1)
+    metrics = client.application.extensions["metrics"]
+    delays = iter([0.0, 0.3])
+
+    def slow_steps(records):
+        # the tracer runs while the body is sent, after every request hook
+        for record in records:
+            time.sleep(next(delays, 0.0))
+            yield record
+
+    monkeypatch.setattr(sorting_routes, "limit_steps", lambda r, _: slow_steps(r))
+    resp = client.post("/sort/merge?stream=1", json={"array": [2, 1]})
+    assert _sample(metrics.render(), "sorter_requests_in_flight") == 1
+
+    body = resp.get_data()
+    resp.close()
+    text = metrics.render()
+    assert _sample(text, "sorter_requests_in_flight") == 0
+    duration = 'sorter_request_duration_seconds_sum{route="/sort/merge"}'
+    assert _sample(text, duration) >= 0.3
+    size = 'sorter_response_size_bytes_sum{route="/sort/merge"}'
+    assert _sample(text, size) == len(body)
+    # one header line, then one line per step
+    steps = 'sorter_trace_steps_sum{algorithm="merge"}'
+    assert _sample(text, steps) == len(body.splitlines()) - 1
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from routes.sorting_routes import sorting_blueprint
+from services.profiling import (
+    PROFILE_HEADER,
+    install_profiling,
+    profiling_settings,
+)
+
+SECRET = "s3cret"
+
+
+def _client(directory, **options):
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.config.update(TESTING=True)
+    install_profiling(app, str(directory), **options)
+    return app.test_client()
+
+
+# ---------------------------
+# Opt-in profiling
+# ---------------------------
+
+
+def test_header_profiles_the_request(tmp_path):
+    client = _client(tmp_path, header_secret=SECRET)
+    resp = client.post(
+        "/sort/merge", json={"array": [4, 2, 3, 1]}, headers={PROFILE_HEADER: SECRET}
+    )
+    assert resp.status_code == HTTPStatus.OK
+    resp.close()
+
+    name = resp.headers[PROFILE_HEADER]
+    assert "sort-merge" in name
+    assert (tmp_path / f"{name}.prof").exists()
+    report = (tmp_path / f"{name}.txt").read_text()
+    assert "_run_sort" in report
+    assert "allocations" in report
+
+
+@pytest.mark.parametrize(
+    "options, header",
+    [({}, "1"), ({}, SECRET), ({"header_secret": SECRET}, "1")],
+)
+def test_header_needs_the_secret(tmp_path, options, header):
+    client = _client(tmp_path, **options)
+    resp = client.post(
+        "/sort/merge", json={"array": [2, 1]}, headers={PROFILE_HEADER: header}
+    )
+    assert PROFILE_HEADER not in resp.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_only_the_newest_profiles_are_kept(tmp_path):
+    client = _client(tmp_path, header_secret=SECRET, max_profiles=2)
+    names = []
+    for _ in range(3):
+        resp = client.post(
+            "/sort/bubble", json={"array": [2, 1]}, headers={PROFILE_HEADER: SECRET}
+        )
+        resp.close()
+        names.append(resp.headers[PROFILE_HEADER])
+
+    kept = sorted(path.name for path in tmp_path.iterdir())
+    expected = [f"{name}.{ext}" for name in names[1:] for ext in ("prof", "txt")]
+    assert kept == sorted(expected)
+
+
+def test_sampling(tmp_path):
+    draws = iter([0.05, 0.5])
+    client = _client(tmp_path, sample_rate=0.1, rng=lambda: next(draws))
+    first = client.post("/sort/bubble", json={"array": [2, 1]})
+    second = client.post("/sort/bubble", json={"array": [2, 1]})
+    first.close()
+    assert PROFILE_HEADER in first.headers
+    assert PROFILE_HEADER not in second.headers
+
+
+def test_streamed_request_is_profiled_until_sent(tmp_path):
+    client = _client(tmp_path, header_secret=SECRET)
+    resp = client.post(
+        "/sort/quick?stream=1",
+        json={"array": [3, 1, 2]},
+        headers={PROFILE_HEADER: SECRET},
+    )
+    resp.get_data()
+    resp.close()
+    name = resp.headers[PROFILE_HEADER]
+    assert "_stream_steps" in (tmp_path / f"{name}.txt").read_text()
+
+
+@pytest.mark.parametrize(
+    "environ, expected",
+    [
+        ({}, None),
+        (
+            {"SORTER_PROFILE_DIR": "/tmp/p", "SORTER_PROFILE_RATE": "0.01"},
+            {
+                "directory": "/tmp/p",
+                "sample_rate": 0.01,
+                "header_secret": None,
+                "max_profiles": 100,
+            },
+        ),
+        (
+            {
+                "SORTER_PROFILE_DIR": "/tmp/p",
+                "SORTER_PROFILE_SECRET": "abc",
+                "SORTER_PROFILE_KEEP": "5",
+            },
+            {
+                "directory": "/tmp/p",
+                "sample_rate": 0.0,
+                "header_secret": "abc",
+                "max_profiles": 5,
+            },
+        ),
+    ],
+)
+def test_profiling_settings(environ, expected):
+    assert profiling_settings(environ) == expected
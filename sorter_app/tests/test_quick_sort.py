@@ -1,7 +1,8 @@
 from typing import List, Union
 import pytest  # type: ignore
 import copy
-from algorithms.quick_sort import quick_sort
+import random
+from algorithms.quick_sort import quick_sort, quick_sort_result
 
 
 def apply_quick_trace(
@@ -54,3 +55,88 @@ def test_trace_matches_builtin_sort(arr):
 
     # And bubble_sort must not mutate the original input
     assert arr == arr_copy
+
+
+@pytest.mark.parametrize("pivot", ["first", "random", "median3", "ninther"])
+@pytest.mark.parametrize(
+    "arr",
+    [
+        list(range(100)),  # sorted
+        list(range(100, 0, -1)),  # reversed
+        [5, 1, 5, 1, 5, 1, 3, 3] * 10,  # duplicates
+    ],
+)
+def test_pivot_strategies_sort_correctly(pivot, arr):
+    trace = quick_sort(arr, pivot=pivot, seed=7)
+    assert apply_quick_trace(arr, trace) == sorted(arr)
+
+
+def test_seeded_traces_are_reproducible():
+    arr = [9, 4, 7, 1, 8, 2, 6, 3, 5]
+    assert quick_sort(arr, seed=42) == quick_sort(arr, seed=42)
+    assert quick_sort(arr, pivot="median3") == quick_sort(arr, pivot="median3")
+
+
+def test_adversarial_input_falls_back_to_heapsort():
+    # the first-element pivot degrades to quadratic depth on sorted input;
+    # the introsort limit must switch to heapsort instead
+    arr = list(range(3000))
+    trace = quick_sort(arr, pivot="first")
+    assert any(step["type"] == "heap" for step in trace)
+    assert apply_quick_trace(arr, trace) == arr
+    assert len(trace) < 3000 * 200
+
+
+def test_unknown_pivot_strategy():
+    with pytest.raises(ValueError):
+        quick_sort([2, 1], pivot="middle")
+
+
+@pytest.mark.parametrize("pivot", ["first", "random", "median3", "ninther"])
+@pytest.mark.parametrize(
+    "arr",
+    [
+        [],
+        [1],
+        [3, 1, 2],
+        [7, 7, 7, 7],
+        [3, 1, 2, 3, 2, 1],
+        [random.randint(1, 5) for _ in range(200)],
+    ],
+)
+def test_three_way_partition_sorts_correctly(pivot, arr):
+    trace = quick_sort(arr, pivot=pivot, seed=1, partition="three_way")
+    assert apply_quick_trace(arr, trace) == sorted(arr)
+
+
+def test_three_way_partition_is_near_linear_on_duplicates():
+    arr = [random.randint(1, 3) for _ in range(2000)]
+    lomuto = quick_sort(arr, pivot="median3")
+    three_way = quick_sort(arr, pivot="median3", partition="three_way")
+    # only 3 distinct values: three partitioning passes over the data at most
+    assert len(three_way) < 3 * 3 * len(arr)
+    assert len(three_way) * 5 < len(lomuto)
+
+
+def test_three_way_step_types():
+    trace = quick_sort([2, 1, 2, 3], pivot="first", partition="three_way")
+    types = {step["type"] for step in trace}
+    assert {"lt", "eq", "gt", "done_range"} <= types
+    assert trace[1] == {"type": "eq", "i": 0, "lt": 0, "gt": 3}
+
+
+@pytest.mark.parametrize("partition", ["lomuto", "three_way"])
+@pytest.mark.parametrize("pivot", ["first", "random", "median3", "ninther"])
+def test_result_counts_match_seeded_trace(pivot, partition):
+    arr = [random.randint(1, 20) for _ in range(150)]
+    result = quick_sort_result(arr, pivot=pivot, seed=5, partition=partition)
+    types = [step["type"] for step in quick_sort(arr, pivot, 5, partition)]
+
+    assert result.array == sorted(arr)
+    assert result.swaps == types.count("swap")
+    assert result.comparisons == (
+        types.count("compare")
+        + types.count("heap_compare")
+        + types.count("lt")
+        + 2 * (types.count("eq") + types.count("gt"))
+    )
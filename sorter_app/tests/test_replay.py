@@ -0,0 +1,127 @@
+import json
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+
+from routes.data_structures_routes import ds_blueprint
+from routes.sorting_routes import sorting_blueprint
+from routes.upload_routes import upload_blueprint
+from tools.replay import (
+    Outcome,
+    ReplayRequest,
+    _multipart,
+    in_process_sender,
+    load_requests,
+    replay,
+    route_of,
+    summarize,
+)
+
+
+def _app():
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(ds_blueprint)
+    app.register_blueprint(upload_blueprint)
+    app.config.update(TESTING=True)
+    return app
+
+
+# ---------------------------
+# Log parsing
+# ---------------------------
+
+
+def test_load_requests_parses_and_synthesizes():
+    lines = [
+        json.dumps({"method": "post", "path": "/sort/bubble", "json": {"array": [2]}}),
+        json.dumps({"path": "/sort/quick", "input_len": 5}),
+        json.dumps({"path": "/ds/stack", "input_len": 3, "json": {"action": "pop"}}),
+        json.dumps({"request_id": "no-path"}),
+        "",
+    ]
+    requests = load_requests(lines)
+
+    assert requests[0] == ReplayRequest("POST", "/sort/bubble", {"array": [2]})
+    assert len(requests[1].body["array"]) == 5
+    assert len(requests[2].body["state"]) == 3
+    assert requests[2].body["action"] == "pop"
+    assert len(requests) == 3
+
+
+def test_load_requests_reads_the_request_log():
+    # what RequestLogWriter writes: input_len is null without an input
+    lines = [
+        json.dumps({"method": "GET", "path": "/sort/cache/stats", "input_len": None}),
+        json.dumps({"method": "POST", "path": "/sort/merge", "input_len": None}),
+        json.dumps({"method": "POST", "path": "/array/upload", "input_len": 4}),
+        json.dumps({"method": "POST", "path": "/array/upload", "input_len": None}),
+    ]
+    stats, merge, upload, failed_upload = load_requests(lines)
+
+    assert stats == ReplayRequest("GET", "/sort/cache/stats")
+    assert merge.body is None
+    assert upload.body is None and len(upload.upload.split(",")) == 4
+    assert failed_upload == ReplayRequest("POST", "/array/upload")
+
+
+def test_uploads_replay_as_multipart_files():
+    app = _app()
+    requests = load_requests([json.dumps({"path": "/array/upload", "input_len": 3})])
+    outcomes = replay(requests, in_process_sender(app))
+    assert outcomes[0].status == HTTPStatus.OK
+
+    # the HTTP sender's hand-built form parses the same way
+    data, content_type = _multipart("3, 1, 2")
+    resp = app.test_client().post("/array/upload", data=data, content_type=content_type)
+    assert resp.get_json()["array"] == [3, 1, 2]
+
+
+def test_route_of_collapses_ids():
+    request = ReplayRequest("GET", "/sort/bubble/trace/" + "ab" * 16 + "/state")
+    assert route_of(request) == "GET /sort/bubble/trace/<id>/state"
+
+
+# ---------------------------
+# Replay and report
+# ---------------------------
+
+
+def test_replay_in_process_reports_per_route():
+    requests = [
+        ReplayRequest("POST", "/sort/merge", {"array": [3, 1, 2]}),
+        ReplayRequest("POST", "/sort/merge", {"array": [5, 4]}),
+        ReplayRequest("POST", "/sort/merge", {"array": "nope"}),
+        ReplayRequest("POST", "/ds/stack", {"state": [1], "action": "pop"}),
+    ]
+    outcomes = replay(requests, in_process_sender(_app()), concurrency=2, rate=1000)
+
+    assert [o.status for o in outcomes] == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.OK,
+    ]
+    report = summarize(outcomes, elapsed=2.0)
+    merge = report["POST /sort/merge"]
+    assert merge["requests"] == 3
+    assert merge["errors"] == 1
+    assert merge["throughput"] == 1.5
+    assert report["POST /ds/stack"]["error_rate"] == 0
+
+
+def test_failed_sends_count_as_errors():
+    def send(request):
+        raise ConnectionError
+
+    outcomes = replay([ReplayRequest("GET", "/x")], send)
+    assert outcomes[0].status == 0
+    assert summarize(outcomes, 1.0)["GET /x"]["errors"] == 1
+
+
+def test_percentiles():
+    outcomes = [Outcome("GET /x", 200, ms / 1000) for ms in range(1, 101)]
+    stats = summarize(outcomes, 1.0)["GET /x"]
+    assert stats["p95_ms"] == 95
+    assert stats["p99_ms"] == 99
+    assert stats["max_ms"] == 100
@@ -0,0 +1,131 @@
+import json
+from http import HTTPStatus
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from routes.data_structures_routes import ds_blueprint
+from routes.sorting_routes import sorting_blueprint
+from services.request_log import RequestLogWriter, install_request_log
+
+
+def _read_lines(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+# ---------------------------
+# Writer
+# ---------------------------
+
+
+def test_writer_writes_batches_and_flushes_on_close(tmp_path):
+    path = tmp_path / "log.jsonl"
+    writer = RequestLogWriter(str(path), batch_size=4)
+    for i in range(10):
+        assert writer.submit({"i": i})
+    writer.close()
+
+    assert [record["i"] for record in _read_lines(path)] == list(range(10))
+    stats = writer.stats()
+    assert stats["written"] == 10
+    assert stats["dropped"] == 0
+    assert stats["batches"] >= 3
+
+
+def test_writer_drops_when_queue_is_full(tmp_path, monkeypatch):
+    writer = RequestLogWriter(str(tmp_path / "log.jsonl"), max_queue=2)
+    # no writer thread, so nothing drains the queue
+    monkeypatch.setattr(writer, "_ensure_started", lambda: None)
+    results = [writer.submit({"i": i}) for i in range(5)]
+
+    assert results == [True, True, False, False, False]
+    assert writer.stats()["dropped"] == 3
+    assert writer.stats()["queued"] == 2
+
+
+def test_writer_rotates_by_size(tmp_path):
+    path = tmp_path / "log.jsonl"
+    writer = RequestLogWriter(str(path), batch_size=1, max_bytes=40, backups=2)
+    for i in range(6):
+        writer.submit({"value": "x" * 20, "i": i})
+    writer.close()
+
+    assert writer.stats()["rotations"] >= 2
+    assert (tmp_path / "log.jsonl.1").exists()
+    assert (tmp_path / "log.jsonl.2").exists()
+    assert not (tmp_path / "log.jsonl.3").exists()
+    assert _read_lines(path)[-1]["i"] == 5
+
+
+# ---------------------------
+# Flask hooks
+# ---------------------------
+
+
+@pytest.fixture
+def logged(tmp_path):
+    path = tmp_path / "requests.jsonl"
+    writer = RequestLogWriter(str(path))
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(ds_blueprint)
+    app.config.update(TESTING=True)
+    install_request_log(app, writer)
+    with app.test_client() as client:
+        yield client, writer, path
+
+
+def test_sort_request_is_logged(logged):
+    client, writer, path = logged
+    resp = client.post("/sort/bubble", json={"array": [3, 1, 2]})
+    assert resp.status_code == HTTPStatus.OK
+    writer.close()
+
+    (record,) = _read_lines(path)
+    assert record["method"] == "POST"
+    assert record["route"] == "/sort/bubble"
+    assert record["status"] == HTTPStatus.OK
+    assert record["input_len"] == 3
+    assert record["steps"] == len(resp.get_json()["steps"])
+    assert record["bytes_out"] == len(resp.data)
+    assert record["compute_ms"] >= 0
+    assert record["serialize_ms"] >= 0
+
+
+def test_streamed_request_is_logged_after_the_body(logged):
+    client, writer, path = logged
+    resp = client.post("/sort/merge?stream=1", json={"array": [2, 1]})
+    body = resp.get_data()
+    resp.close()
+    writer.close()
+
+    (record,) = _read_lines(path)
+    assert record["bytes_out"] == len(body)
+    assert record["input_len"] == 2
+
+
+def test_streamed_request_logs_its_steps_and_timings(logged):
+    client, writer, path = logged
+    resp = client.post("/sort/bubble?stream=1", json={"array": [3, 1, 2]})
+    lines = resp.get_data(as_text=True).splitlines()
+    resp.close()
+    writer.close()
+
+    (record,) = _read_lines(path)
+    # one header line, then one line per step
+    assert record["steps"] == len(lines) - 1
+    assert record["compute_ms"] >= 0
+    assert record["serialize_ms"] >= 0
+
+
+def test_ds_request_is_logged(logged):
+    client, writer, path = logged
+    client.post("/ds/stack", json={"state": [1, 2], "action": "push", "value": 3})
+    writer.close()
+
+    (record,) = _read_lines(path)
+    assert record["route"] == "/ds/stack"
+    assert record["input_len"] == 2
+    assert record["steps"] >= 1
+    assert record["serialize_ms"] is None
@@ -0,0 +1,216 @@
+"""
+Latency benchmarks for the Flask routes.
+
+Skipped by the default test run; select them with:
+
+    pytest -m benchmark
+
+Every case is measured across input sizes and reports the end-to-end latency
+percentiles of the route, the compute and serialization time of the same
+work done outside Flask, and the payload size. Tuning via environment:
+
+    BENCH_SIZES      comma-separated input sizes (default 50,200,800)
+    BENCH_REPEAT     timed requests per case (default 5)
+    BENCH_OUTPUT     write the measurements to this JSON file
+    BENCH_BASELINE   JSON file written by a previous run to compare against
+    BENCH_THRESHOLD  allowed median slowdown vs. the baseline (default 0.25)
+"""
+
+import json
+import os
+import random
+import statistics
+import time
+from http import HTTPStatus
+from io import BytesIO
+
+from flask import Flask  # type: ignore
+import pytest  # type: ignore
+
+from algorithms.registry import ALGORITHMS
+from data_structures.linked_list import insert_at
+from data_structures.queue import enqueue
+from data_structures.stack import push_value
+from routes import sorting_routes
+from routes.data_structures_routes import ds_blueprint
+from routes.sorting_routes import sorting_blueprint
+from routes.upload_routes import upload_blueprint
+from services.ingest import ingest_array
+from services.serializer import dumps
+from services.trace_cache import TraceCache
+from tools.stats import percentile
+
+pytestmark = pytest.mark.benchmark
+
+SIZES = [int(n) for n in os.environ.get("BENCH_SIZES", "50,200,800").split(",")]
+REPEAT = int(os.environ.get("BENCH_REPEAT", "5"))
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+
+
+def _load_baseline():
+    path = os.environ.get("BENCH_BASELINE")
+    if not path:
+        return {}
+    with open(path) as file:
+        return {(m["route"], m["size"]): m for m in json.load(file)["results"]}
+
+
+BASELINE = _load_baseline()
+RESULTS = []
+
+
+# ---------------------------
+# Flask test client
+# ---------------------------
+
+
+@pytest.fixture(scope="module")
+def app():
+    app = Flask(__name__)
+    app.register_blueprint(sorting_blueprint)
+    app.register_blueprint(upload_blueprint)
+    app.register_blueprint(ds_blueprint)
+    app.config.update(TESTING=True, SORT_MAX_STEPS=None)
+    return app
+
+
+@pytest.fixture
+def client(app, monkeypatch):
+    # a cache that never keeps anything, so every request is traced again
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache(max_bytes=0))
+    with app.test_client() as testing_client:
+        yield testing_client
+
+
+@pytest.fixture(scope="module", autouse=True)
+def report():
+    yield
+    output = os.environ.get("BENCH_OUTPUT")
+    if output:
+        with open(output, "w") as file:
+            json.dump({"repeat": REPEAT, "results": RESULTS}, file, indent=2)
+
+
+# ---------------------------
+# Measurement helpers
+# ---------------------------
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def _measure(route, size, send, compute):
+    """
+    Time 'send' (one request through the test client) REPEAT times after a
+    warm-up request, then time 'compute' and the JSON encoding of its result
+    once, with the serializer the routes use, so the route latency can be
+    split into compute and serialization.
+    """
+    send()
+    latencies, payload = [], 0
+    for _ in range(REPEAT):
+        resp, elapsed = _timed(send)
+        assert resp.status_code in (HTTPStatus.OK, HTTPStatus.CREATED)
+        latencies.append(elapsed)
+        payload = len(resp.get_data())
+    latencies.sort()
+
+    body, compute_s = _timed(compute)
+    _, serialize_s = _timed(lambda: dumps(body))
+
+    measurement = {
+        "route": route,
+        "size": size,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "max": latencies[-1],
+        "compute": compute_s,
+        "serialize": serialize_s,
+        "payload_bytes": payload,
+    }
+    RESULTS.append(measurement)
+    print(
+        f"{route} n={size}: p50={measurement['p50'] * 1000:.2f}ms "
+        f"p95={measurement['p95'] * 1000:.2f}ms "
+        f"compute={compute_s * 1000:.2f}ms serialize={serialize_s * 1000:.2f}ms "
+        f"bytes={payload}"
+    )
+
+    previous = BASELINE.get((route, size))
+    if previous:
+        limit = previous["p50"] * (1 + THRESHOLD)
+        assert measurement["p50"] <= limit, (
+            f"{route} n={size} regressed: p50 {measurement['p50']:.6f}s "
+            f"> {limit:.6f}s (baseline {previous['p50']:.6f}s)"
+        )
+
+
+def _random_array(size):
+    rng = random.Random(size)
+    return [rng.randint(0, 1000) for _ in range(size)]
+
+
+# ---------------------------
+# Benchmarks
+# ---------------------------
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+def test_sort_route_latency(client, name, size):
+    arr = _random_array(size)
+    algorithm = ALGORITHMS[name]
+
+    # as the route does: the steps stay a Trace, which dumps() encodes
+    # straight from its columns
+    _measure(
+        f"/sort/{name}",
+        size,
+        lambda: client.post(f"/sort/{name}", json={"array": arr}),
+        lambda: {"algorithm": name, "steps": algorithm.collect(ingest_array(arr))},
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize(
+    "route, payload, operation",
+    [
+        ("/ds/stack", {"action": "push", "value": 1}, push_value),
+        ("/ds/queue", {"action": "enqueue", "value": 1}, enqueue),
+        (
+            "/ds/linked-list",
+            {"action": "insert_at", "index": 0, "value": 1},
+            lambda state, value: insert_at(state, 0, value),
+        ),
+    ],
+)
+def test_data_structure_route_latency(client, route, payload, operation, size):
+    state = _random_array(size)
+
+    def compute():
+        steps, new_state = operation(state, 1)
+        return {"steps": steps, "new_state": new_state}
+
+    _measure(
+        route,
+        size,
+        lambda: client.post(route, json={"state": state, **payload}),
+        compute,
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_upload_route_latency(client, size):
+    arr = _random_array(size)
+    content = ",".join(map(str, arr)).encode()
+
+    def send():
+        data = {"file": (BytesIO(content), "numbers.csv")}
+        return client.post(
+            "/array/upload", data=data, content_type="multipart/form-data"
+        )
+
+    _measure("/array/upload", size, send, lambda: {"array": arr})
@@ -0,0 +1,78 @@
+import json
+
+import pytest  # type: ignore
+
+from algorithms.registry import ALGORITHMS
+from services import serializer
+from services.serializer import dumps, encode_steps, record_encoder
+
+ARRAYS = [[5, 3, 8, 1, 9, 2, 5], [2.5, -1.0, 7.25, 1e16, -0.0], [True, 3, 1], []]
+
+
+def _options(name):
+    return {"seed": 1} if name == "quick" else {}
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(serializer, "orjson", None)
+    elif serializer.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+# ---------------------------
+# steps written from the trace columns
+# ---------------------------
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+@pytest.mark.parametrize("arr", ARRAYS)
+def test_encoded_steps_match_the_step_dicts(name, arr):
+    trace = ALGORITHMS[name].collect(arr, **_options(name))
+    steps = trace.to_list()
+    assert json.loads(encode_steps(trace)) == steps
+    # byte for byte what the standard library writes for the dicts
+    assert encode_steps(trace) == json.dumps(steps, separators=(",", ":")).encode()
+
+
+@pytest.mark.parametrize("name", sorted(ALGORITHMS))
+@pytest.mark.parametrize("arr", ARRAYS)
+def test_record_encoder_matches_as_dict(name, arr):
+    algorithm = ALGORITHMS[name]
+    encode = record_encoder(algorithm.kinds, arr)
+    for record in algorithm.steps(arr, **_options(name)):
+        assert json.loads(encode(record)) == algorithm.kinds[record[0]].as_dict(record)
+
+
+def test_sampled_trace_with_wide_indices():
+    trace = ALGORITHMS["insertion"].collect(list(range(40000)) + [-1], sample_every=999)
+    assert json.loads(encode_steps(trace)) == trace.to_list()
+
+
+# ---------------------------
+# dumps
+# ---------------------------
+
+
+def test_traces_are_spliced_into_the_document(encoder):
+    trace = ALGORITHMS["merge"].collect([3, 1, 2])
+    body = {"algorithm": "merge", "steps": trace, "results": [{"steps": trace}]}
+    assert json.loads(dumps(body)) == {
+        "algorithm": "merge",
+        "steps": trace.to_list(),
+        "results": [{"steps": trace.to_list()}],
+    }
+
+
+def test_integers_beyond_64_bits(encoder):
+    trace = ALGORITHMS["merge"].collect([2**70, 1])
+    assert json.loads(dumps({"steps": trace, "n": 2**70})) == {
+        "steps": trace.to_list(),
+        "n": 2**70,
+    }
+
+
+def test_unknown_types_are_refused(encoder):
+    with pytest.raises(TypeError):
+        dumps({"x": object()})
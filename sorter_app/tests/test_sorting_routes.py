@@ -1,8 +1,12 @@
+import json
 from http import HTTPStatus
 from flask import Flask  # type: ignore
 import pytest  # type: ignore
 
+from routes import sorting_routes
 from routes.sorting_routes import sorting_blueprint
+from services.binary_trace import decode_trace
+from services.trace_cache import TraceCache
 
 from test_bubble_sort import apply_bubble_trace
 from test_insertion_sort import apply_insertion_trace
@@ -86,6 +90,8 @@ def test_sort_endpoint_empty_list(client, endpoint, algo_name):
         {},
         {"array": "not-a-list"},
         {"array": [1, "x", 3]},
+        {"array": [True, 2]},
+        {"array": [1, float("nan")]},
     ],
 )
 def test_sort_endpoint_bad_payloads(client, endpoint, payload):
@@ -93,3 +99,565 @@ def test_sort_endpoint_bad_payloads(client, endpoint, payload):
     assert resp.status_code == HTTPStatus.BAD_REQUEST
     data = resp.get_json()
     assert "error" in data
+
+
+def test_bools_and_nan_accepted_when_configured(client):
+    client.application.config.update(SORT_ALLOW_BOOLS=True, SORT_ALLOW_NAN=True)
+    resp = client.post("/sort/bubble?mode=result", json={"array": [True, 0, 2]})
+    assert resp.get_json()["array"] == [0, True, 2]
+
+    resp = client.post("/sort/merge?mode=result", json={"array": [float("inf"), 1]})
+    assert resp.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize("algo_name", ["bubble", "insertion", "merge", "quick"])
+def test_mixed_ints_and_floats_sort_as_floats(client, algo_name):
+    arr = [3.5, 1, -2, 2.25]
+    resp = client.post(f"/sort/{algo_name}?mode=result", json={"array": arr})
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.get_json()["array"] == [-2.0, 1.0, 2.25, 3.5]
+
+
+# ---------------------------
+# streamed (NDJSON) traces
+# ---------------------------
+
+
+def _read_ndjson(resp):
+    lines = resp.get_data(as_text=True).splitlines()
+    return [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize(
+    "endpoint, algo_name, apply_fn",
+    [
+        ("/sort/bubble", "bubble", apply_bubble_trace),
+        ("/sort/insertion", "insertion", apply_insertion_trace),
+        ("/sort/merge", "merge", apply_merge_trace),
+        ("/sort/quick", "quick", apply_quick_trace),
+    ],
+)
+def test_sort_endpoint_streams_ndjson(client, endpoint, algo_name, apply_fn):
+    arr = [9, 3, 7, 1, 8, 2]
+    resp = client.post(f"{endpoint}?stream=1", json={"array": arr})
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.mimetype == "application/x-ndjson"
+    assert resp.is_streamed
+
+    header, *steps = _read_ndjson(resp)
+    assert header == {"algorithm": algo_name}
+    assert apply_fn(arr, steps) == sorted(arr)
+
+
+def test_stream_negotiated_by_accept_header(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "STREAM_CHUNK_STEPS", 2)
+    arr = [4, 3, 2, 1]
+    resp = client.post(
+        "/sort/bubble", json={"array": arr}, headers={"Accept": "application/x-ndjson"}
+    )
+    header, *steps = _read_ndjson(resp)
+    assert header == {"algorithm": "bubble"}
+    assert steps == client.post("/sort/bubble", json={"array": arr}).get_json()["steps"]
+
+
+def test_stream_validation_errors_are_plain_json(client):
+    resp = client.post("/sort/merge?stream=1", json={"array": "nope"})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    assert "error" in resp.get_json()
+
+
+# ---------------------------
+# paginated trace cursor
+# ---------------------------
+
+
+def test_trace_cursor_pages_through_stored_trace(client):
+    arr = [6, 5, 4, 3, 2, 1]
+    created = client.post("/sort/insertion/trace", json={"array": arr})
+    assert created.status_code == HTTPStatus.CREATED
+    body = created.get_json()
+    assert body["algorithm"] == "insertion"
+
+    steps, offset = [], 0
+    while offset is not None:
+        page = client.get(f"/sort/insertion/trace/{body['id']}?offset={offset}&limit=4")
+        assert page.status_code == HTTPStatus.OK
+        data = page.get_json()
+        assert len(data["steps"]) <= 4
+        steps.extend(data["steps"])
+        offset = data["next_offset"]
+
+    assert len(steps) == body["total"]
+    assert apply_insertion_trace(arr, steps) == sorted(arr)
+
+
+def test_trace_cursor_errors(client):
+    resp = client.post("/sort/bogo/trace", json={"array": [1]})
+    assert resp.status_code == HTTPStatus.NOT_FOUND
+    resp = client.post("/sort/merge/trace", json={})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    resp = client.get("/sort/merge/trace/unknown")
+    assert resp.status_code == HTTPStatus.NOT_FOUND
+
+    trace_id = client.post("/sort/merge/trace", json={"array": [2, 1]}).get_json()["id"]
+    url = f"/sort/merge/trace/{trace_id}"
+    resp = client.get(f"/sort/quick/trace/{trace_id}")
+    assert resp.status_code == HTTPStatus.NOT_FOUND
+    assert client.get(f"{url}?limit=0").status_code == HTTPStatus.BAD_REQUEST
+    assert client.get(f"{url}?offset=-1").status_code == HTTPStatus.BAD_REQUEST
+
+    assert client.delete(url).status_code == HTTPStatus.NO_CONTENT
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+# ---------------------------
+# trace cache
+# ---------------------------
+
+
+def test_repeated_requests_hit_the_cache(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache())
+    arr = [5, 3, 8, 1]
+
+    first = client.post("/sort/merge", json={"array": arr}).get_json()
+    second = client.post("/sort/merge", json={"array": arr}).get_json()
+    streamed = client.post("/sort/merge?stream=1", json={"array": arr})
+    assert first == second
+    assert _read_ndjson(streamed)[1:] == first["steps"]
+
+    stats = client.get("/sort/cache/stats").get_json()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["entries"] == 1
+
+
+def test_streamed_traces_fill_the_cache(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache())
+    arr = [5, 3, 8, 1, 9, 2]
+
+    bodies = [
+        _read_ndjson(client.post("/sort/bubble?stream=1", json={"array": arr}))
+        for _ in range(3)
+    ]
+    assert bodies[0] == bodies[1] == bodies[2]
+    stats = client.get("/sort/cache/stats").get_json()
+    assert (stats["entries"], stats["misses"], stats["hits"]) == (1, 1, 2)
+
+    traced = client.post("/sort/bubble", json={"array": arr}).get_json()
+    assert traced["steps"] == bodies[0][1:]
+
+
+def test_stream_over_budget_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache())
+    # merge sort's cost is an estimate, so the budget ends the stream itself
+    body = {"array": [4, 3, 2, 1, 7, 5, 6, 0], "max_steps": 3}
+    resp = client.post("/sort/merge?stream=1", json=body)
+    assert resp.status_code == HTTPStatus.OK
+    assert _read_ndjson(resp)[-1]["max_steps"] == 3
+    assert client.get("/sort/cache/stats").get_json()["entries"] == 0
+
+
+def test_unseeded_quick_sort_is_not_cached(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache())
+    client.post("/sort/quick", json={"array": [3, 2, 1]})
+    assert client.get("/sort/cache/stats").get_json()["entries"] == 0
+
+
+def test_seeded_quick_sort_is_cached(client, monkeypatch):
+    monkeypatch.setattr(sorting_routes, "trace_cache", TraceCache())
+    body = {"array": [3, 1, 2, 5, 4], "pivot": "random", "seed": 3}
+    first = client.post("/sort/quick", json=body).get_json()
+    second = client.post("/sort/quick", json=body).get_json()
+    assert first == second
+
+    other = client.post("/sort/quick", json={**body, "pivot": "median3"})
+    assert other.status_code == HTTPStatus.OK
+    stats = client.get("/sort/cache/stats").get_json()
+    assert stats["hits"] == 1
+    assert stats["entries"] == 2
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"pivot": "middle"}, {"seed": "x"}, {"seed": True}, {"partition": "hoare"}],
+)
+def test_quick_sort_bad_options(client, options):
+    resp = client.post("/sort/quick", json={"array": [2, 1], **options})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+    assert "error" in resp.get_json()
+
+
+def test_quick_sort_three_way_partition(client):
+    arr = [2, 2, 1, 3, 1, 2]
+    resp = client.post(
+        "/sort/quick", json={"array": arr, "partition": "three_way", "seed": 0}
+    )
+    assert resp.status_code == HTTPStatus.OK
+    steps = resp.get_json()["steps"]
+    assert any(step["type"] == "done_range" for step in steps)
+    assert apply_quick_trace(arr, steps) == sorted(arr)
+
+
+# ---------------------------
+# keyframes and seeking
+# ---------------------------
+
+
+def test_sort_response_includes_keyframes(client):
+    arr = [4, 3, 2, 1]
+    data = client.post("/sort/bubble", json={"array": arr, "keyframe_every": 2})
+    data = data.get_json()
+    keyframes = data["keyframes"]
+    assert [k["step"] for k in keyframes] == list(range(0, len(data["steps"]), 2))
+    for keyframe in keyframes:
+        prefix = data["steps"][: keyframe["step"]]
+        assert keyframe["array"] == apply_bubble_trace(arr, prefix)
+
+
+def test_streamed_keyframes(client):
+    arr = [3, 1, 2]
+    body = {"array": arr, "keyframe_every": 1}
+    resp = client.post("/sort/insertion?stream=1", json=body)
+    _, *lines = _read_ndjson(resp)
+    keyframes = [line for line in lines if line.get("type") == "keyframe"]
+    steps = [line for line in lines if line.get("type") != "keyframe"]
+    assert len(keyframes) == len(steps)
+    assert keyframes[0] == {"type": "keyframe", "step": 0, "array": arr}
+
+
+def test_trace_state_seeks_any_step(client):
+    arr = [8, 6, 7, 5, 3, 0, 9]
+    body = client.post("/sort/merge/trace", json={"array": arr, "keyframe_every": 5})
+    body = body.get_json()
+    page = client.get(f"/sort/merge/trace/{body['id']}?limit=10000")
+    steps = page.get_json()["steps"]
+
+    for step in (0, 1, 5, 13, body["total"]):
+        resp = client.get(f"/sort/merge/trace/{body['id']}/state?step={step}")
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.get_json()["array"] == apply_merge_trace(arr, steps[:step])
+
+    resp = client.get(f"/sort/merge/trace/{body['id']}/state?step=-1")
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_bad_keyframe_interval(client):
+    resp = client.post("/sort/merge", json={"array": [1], "keyframe_every": -1})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+# ---------------------------
+# step budget and sampling
+# ---------------------------
+
+
+def test_max_steps_aborts_with_413(client):
+    arr = list(range(50, 0, -1))
+    resp = client.post("/sort/bubble", json={"array": arr, "max_steps": 100})
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert resp.get_json()["max_steps"] == 100
+
+    # the same array within budget still works, and a cached trace made under
+    # a larger budget is not handed out past a smaller one
+    assert client.post("/sort/bubble", json={"array": arr}).status_code == HTTPStatus.OK
+    resp = client.post("/sort/bubble", json={"array": arr, "max_steps": 100})
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_server_step_cap_applies_to_every_request(client):
+    client.application.config["SORT_MAX_STEPS"] = 10
+    resp = client.post("/sort/insertion", json={"array": [5, 4, 3, 2, 1]})
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    resp = client.post("/sort/insertion", json={"array": [1, 2], "max_steps": 99})
+    assert resp.status_code == HTTPStatus.OK
+
+
+def test_stream_ends_with_error_line_when_budget_runs_out(client):
+    # quick sort's cost is only estimated, so the budget is enforced mid-stream
+    body = {"array": list(range(30, 0, -1)), "max_steps": 20, "seed": 1}
+    resp = client.post("/sort/quick?stream=1", json=body)
+    header, *lines = _read_ndjson(resp)
+    assert len(lines) == 21
+    assert lines[-1]["max_steps"] == 20
+    assert "error" in lines[-1]
+
+
+def test_exact_cost_is_refused_before_tracing(client, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the tracer must not run")
+
+    monkeypatch.setattr(sorting_routes, "_trace", fail)
+    body = {"array": list(range(30, 0, -1)), "max_steps": 20}
+    for url in ("/sort/insertion", "/sort/insertion?stream=1"):
+        resp = client.post(url, json=body)
+        assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        data = resp.get_json()
+        assert data["max_steps"] == 20
+        assert data["estimate"]["steps"] == 2 * 29 + 2 * (30 * 29 // 2)
+        assert data["estimate"]["exact"] is True
+
+
+def test_response_bytes_budget_suggests_a_sample(client):
+    client.application.config["SORT_MAX_RESPONSE_BYTES"] = 2000
+    arr = list(range(40, 0, -1))
+    resp = client.post("/sort/bubble", json={"array": arr})
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    data = resp.get_json()
+    assert data["max_bytes"] == 2000
+    assert data["estimate"]["bytes"] > 2000
+
+    body = {"array": arr, "sample": data["suggested_sample"]}
+    resp = client.post("/sort/bubble", json=body)
+    assert resp.status_code == HTTPStatus.OK
+    assert len(resp.get_json()["steps"]) * 30 <= 2000
+
+
+def test_sampled_response(client):
+    arr = list(range(20, 0, -1))
+    full = client.post("/sort/bubble", json={"array": arr}).get_json()["steps"]
+    data = client.post("/sort/bubble", json={"array": arr, "sample": 10}).get_json()
+
+    assert data["sample"] == 10
+    assert data["total_steps"] == len(full)
+    assert data["steps"] == full[::10]
+    assert [k["step"] for k in data["keyframes"]] == list(range(0, len(full), 160))
+
+
+@pytest.mark.parametrize(
+    "options", [{"max_steps": 0}, {"sample": 0}, {"sample": "2"}, {"max_steps": 1.5}]
+)
+def test_bad_budget_options(client, options):
+    resp = client.post("/sort/merge", json={"array": [2, 1], **options})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+# ---------------------------
+# untraced result / counts modes
+# ---------------------------
+
+
+@pytest.mark.parametrize(
+    "endpoint", ["/sort/bubble", "/sort/insertion", "/sort/merge", "/sort/quick"]
+)
+def test_result_mode_returns_sorted_array_and_counts(client, endpoint):
+    arr = [5, 2.5, 9, 1, 5]
+    resp = client.post(f"{endpoint}?mode=result", json={"array": arr})
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert data["mode"] == "result"
+    assert data["array"] == sorted(arr)
+    # integers mixed with floats come back as integers
+    assert [type(x) for x in data["array"]] == [int, float, int, int, int]
+    assert set(data["counts"]) == {"comparisons", "swaps", "writes"}
+    assert "steps" not in data
+
+
+def test_counts_mode(client):
+    body = {"array": [3, 2, 1], "mode": "counts"}
+    data = client.post("/sort/bubble", json=body).get_json()
+    assert data == {
+        "algorithm": "bubble",
+        "mode": "counts",
+        "counts": {"comparisons": 3, "swaps": 3, "writes": 6},
+    }
+
+
+@pytest.mark.parametrize("mode", ["result", "counts"])
+def test_untraced_modes_refuse_predicted_overruns(client, mode):
+    # 4 + 3 + 2 + 1 comparisons, predicted without sorting
+    body = {"array": [5, 4, 3, 2, 1], "mode": mode, "max_steps": 9}
+    resp = client.post("/sort/bubble", json=body)
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    data = resp.get_json()
+    assert data["estimate"] == {"steps": 10, "exact": True}
+    assert data["max_steps"] == 9
+
+    # estimates count too: no budget stops an untraced run midway
+    body = {"array": list(range(64)), "mode": mode, "max_steps": 10}
+    resp = client.post("/sort/quick", json=body)
+    assert resp.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+    body["max_steps"] = 10_000
+    assert client.post("/sort/quick", json=body).status_code == HTTPStatus.OK
+
+
+def test_unknown_mode(client):
+    resp = client.post("/sort/merge", json={"array": [1], "mode": "fast"})
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+# ---------------------------
+# cross-algorithm comparison
+# ---------------------------
+
+
+def test_compare_endpoint(client):
+    arr = [9, 1, 8, 2, 7, 3]
+    resp = client.post("/sort/compare", json={"array": arr, "seed": 4})
+    assert resp.status_code == HTTPStatus.OK
+    data = resp.get_json()
+    assert data["n"] == len(arr)
+    by_name = {entry["algorithm"]: entry for entry in data["results"]}
+    assert set(by_name) == {"bubble", "insertion", "merge", "quick", "sorted"}
+    assert by_name["bubble"]["swaps"] == 9  # one per inversion
+    assert "steps" not in by_name["bubble"]
+    assert data["skipped"] == []
+
+
+def test_compare_skips_algorithms_over_the_budget(client):
+    # bubble and insertion are quadratic on a reversed array
+    arr = list(range(200, 0, -1))
+    body = {"array": arr, "seed": 1, "max_steps": 15000}
+    data = client.post("/sort/compare", json=body).get_json()
+
+    ran = [entry["algorithm"] for entry in data["results"]]
+    assert ran == ["merge", "quick", "sorted"]
+    skipped = {entry["algorithm"]: entry["estimate"] for entry in data["skipped"]}
+    assert set(skipped) == {"bubble", "insertion"}
+    assert skipped["bubble"] == {"steps": 19900, "exact": True}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"array": "x"},
+        {"array": [1], "max_steps": 0},
+        {"array": [1], "algorithms": ["bogo"]},
+        {"array": [1], "algorithms": "merge"},
+        {"array": [1], "pivot": "middle"},
+    ],
+)
+def test_compare_endpoint_bad_payloads(client, body):
+    resp = client.post("/sort/compare", json=body)
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+# ---------------------------
+# binary traces
+# ---------------------------
+
+
+@pytest.mark.parametrize("algo_name", ["bubble", "insertion", "merge", "quick"])
+def test_binary_trace_decodes_to_the_json_body(client, algo_name):
+    body = {"array": [9, 4, 7, 1, 8, 2], "seed": 5, "keyframe_every": 4}
+    if algo_name != "quick":
+        del body["seed"]
+    expected = client.post(f"/sort/{algo_name}", json=body).get_json()
+
+    resp = client.post(
+        f"/sort/{algo_name}",
+        json=body,
+        headers={"Accept": "application/octet-stream"},
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.mimetype == "application/octet-stream"
+    assert decode_trace(resp.data) == expected
+
+
+def test_binary_trace_is_smaller_than_json(client):
+    body = {"array": list(range(200, 0, -1))}
+    text = client.post("/sort/bubble", json=body)
+    packed = client.post(
+        "/sort/bubble", json=body, headers={"Accept": "application/octet-stream"}
+    )
+    assert len(packed.data) * 5 < len(text.data)
+
+
+def test_binary_falls_back_to_json_for_huge_ints(client):
+    resp = client.post(
+        "/sort/merge",
+        json={"array": [2**70, 1]},
+        headers={"Accept": "application/octet-stream"},
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.get_json()["steps"]
+
+
+# ---------------------------
+# ETags and replay by array hash
+# ---------------------------
+
+
+def test_matching_etag_is_answered_304_without_tracing(client, monkeypatch):
+    body = {"array": [4, 2, 3, 1]}
+    resp = client.post("/sort/insertion", json=body)
+    etag = resp.headers["ETag"]
+    assert resp.headers["X-Array-Hash"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the tracer must not run")
+
+    monkeypatch.setattr(sorting_routes, "_trace", fail)
+    monkeypatch.setattr(sorting_routes, "jsonify", fail)
+    again = client.post("/sort/insertion", json=body, headers={"If-None-Match": etag})
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+    assert again.headers["ETag"] == etag
+    assert again.data == b""
+
+
+def test_etag_depends_on_the_whole_request(client):
+    def etag(url, body, **headers):
+        return client.post(url, json=body, headers=headers).headers.get("ETag")
+
+    base = etag("/sort/merge", {"array": [3, 1, 2]})
+    assert base == etag("/sort/merge", {"array": [3, 1, 2]})
+    assert base != etag("/sort/merge", {"array": [3, 2, 1]})
+    assert base != etag("/sort/merge", {"array": [3.0, 1, 2]})
+    assert base != etag("/sort/bubble", {"array": [3, 1, 2]})
+    assert base != etag("/sort/merge", {"array": [3, 1, 2], "sample": 2})
+    assert base != etag("/sort/merge?mode=counts", {"array": [3, 1, 2]})
+    assert base != etag("/sort/merge?stream=1", {"array": [3, 1, 2]})
+    assert base != etag(
+        "/sort/merge", {"array": [3, 1, 2]}, Accept="application/octet-stream"
+    )
+    # unseeded random pivots give a different trace every time
+    assert etag("/sort/quick", {"array": [3, 1, 2], "pivot": "random"}) is None
+    assert etag("/sort/quick", {"array": [3, 1, 2], "seed": 1}) is not None
+
+
+def test_stale_etag_gets_a_full_response(client):
+    resp = client.post(
+        "/sort/bubble", json={"array": [2, 1]}, headers={"If-None-Match": '"stale"'}
+    )
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.get_json()["steps"] == [{"i": 0, "j": 1, "swap": True}]
+
+
+def test_replay_by_array_hash(client):
+    body = {"array": [7, 3, 5, 1], "sample": 2}
+    posted = client.post("/sort/merge", json=body)
+    digest = posted.headers["X-Array-Hash"]
+
+    resp = client.get(f"/sort/merge/array/{digest}?sample=2")
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.get_json() == posted.get_json()
+    assert resp.headers["ETag"] == posted.headers["ETag"]
+    assert "public" in resp.headers["Cache-Control"]
+    assert "max-age" in resp.headers["Cache-Control"]
+
+    cached = client.get(
+        f"/sort/merge/array/{digest}?sample=2",
+        headers={"If-None-Match": resp.headers["ETag"]},
+    )
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+
+    packed = client.get(
+        f"/sort/merge/array/{digest}?sample=2",
+        headers={"Accept": "application/octet-stream"},
+    )
+    assert decode_trace(packed.data) == posted.get_json()
+
+
+def test_replay_by_array_hash_errors(client):
+    digest = client.post("/sort/quick", json={"array": [2, 1], "seed": 3}).headers[
+        "X-Array-Hash"
+    ]
+    # other options than the cached trace's, unknown hashes and algorithms
+    assert client.get(f"/sort/quick/array/{digest}?seed=4").status_code == 404
+    assert client.get("/sort/quick/array/abc?seed=3").status_code == 404
+    assert client.get(f"/sort/bogo/array/{digest}").status_code == 404
+    # nothing to replay without a seed or with an untraced mode
+    assert client.get(f"/sort/quick/array/{digest}").status_code == 400
+    resp = client.get(f"/sort/quick/array/{digest}?seed=3&mode=counts")
+    assert resp.status_code == 400
+    assert client.get(f"/sort/quick/array/{digest}?seed=3").status_code == 200
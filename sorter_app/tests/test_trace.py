@@ -0,0 +1,151 @@
+import pytest  # type: ignore
+
+from algorithms.bubble_sort import bubble_sort
+from algorithms.insertion_sort import insertion_sort
+from algorithms.merge_sort import merge_sort
+from algorithms.quick_sort import quick_sort
+from algorithms.trace import (
+    StepKind,
+    StepBudgetExceeded,
+    Trace,
+    limit_steps,
+    report_progress,
+    value_typecode,
+)
+
+from test_bubble_sort import apply_bubble_trace
+from test_insertion_sort import apply_insertion_trace
+from test_merge_sort import apply_merge_trace
+from test_quick_sort import apply_quick_trace
+
+KINDS = (
+    StepKind("pair", ("i", "j")),
+    StepKind("write", ("index",), value="value"),
+    StepKind(None, ("i",), extra=(("flag", True),)),
+)
+
+
+def test_record_and_lazy_dict_view():
+    trace = Trace(KINDS)
+    trace.extend([(0, 1, 2), (1, 3, 7), (2, 4)])
+
+    assert len(trace) == 3
+    assert trace[0] == {"type": "pair", "i": 1, "j": 2}
+    assert trace[1] == {"type": "write", "index": 3, "value": 7}
+    assert trace[-1] == {"i": 4, "flag": True}
+    assert trace[1:] == [trace[1], trace[2]]
+    assert trace == trace.to_list()
+    assert trace.record_at(1) == (1, 3, 7)
+
+
+def test_index_out_of_range():
+    trace = Trace(KINDS)
+    with pytest.raises(IndexError):
+        trace[0]
+
+
+@pytest.mark.parametrize(
+    "values, typecode",
+    [
+        ([1, 2, 3], "q"),
+        ([1, 2.5], "d"),
+        ([], "q"),
+        ([True, 1], None),
+        ([2**70], None),
+        ([2**60, 0.5], None),
+    ],
+)
+def test_value_typecode(values, typecode):
+    assert value_typecode(values) == typecode
+
+
+def test_values_kept_exactly():
+    arr = [3, 2**70, 1]
+    trace = insertion_sort(arr)
+    assert [s["value"] for s in trace if s["type"] == "key"] == [2**70, 1]
+
+
+def test_float_values_round_trip():
+    trace = insertion_sort([2.5, 1.5])
+    assert trace[0] == {"type": "key", "i": 1, "value": 1.5}
+
+
+def test_trace_is_compact():
+    trace = bubble_sort(list(range(300, 0, -1)))
+    # opcode byte + two int32 index slots per step
+    assert trace.nbytes == len(trace) * 9 + 300 * 8  # + the initial array
+
+
+@pytest.mark.parametrize(
+    "tracer, apply_fn",
+    [
+        (bubble_sort, apply_bubble_trace),
+        (insertion_sort, apply_insertion_trace),
+        (merge_sort, apply_merge_trace),
+        (quick_sort, apply_quick_trace),
+    ],
+)
+@pytest.mark.parametrize("keyframe_every", [0, 1, 7])
+def test_state_at_matches_replayed_prefix(tracer, apply_fn, keyframe_every):
+    arr = [9, 2, 7, 4, 4, 1, 8, 3]
+    trace = tracer(arr, keyframe_every=keyframe_every)
+    steps = trace.to_list()
+    for step in range(len(trace) + 1):
+        assert trace.state_at(step) == apply_fn(arr, steps[:step])
+
+
+def test_keyframes_are_taken_every_k_steps():
+    arr = [5, 4, 3, 2, 1]
+    trace = bubble_sort(arr, keyframe_every=3)
+    assert sorted(trace.keyframes) == list(range(0, len(trace), 3))
+    assert list(trace.keyframes[0]) == arr
+    assert list(trace.keyframes[3]) == trace.state_at(3)
+
+
+def test_state_at_bounds():
+    trace = bubble_sort([2, 1])
+    with pytest.raises(IndexError):
+        trace.state_at(len(trace) + 1)
+    with pytest.raises(ValueError):
+        Trace(KINDS).state_at(0)
+
+
+def test_limit_steps_aborts_the_tracer():
+    produced = []
+
+    def records():
+        for i in range(100):
+            produced.append(i)
+            yield (0, i, i)
+
+    with pytest.raises(StepBudgetExceeded) as info:
+        list(limit_steps(records(), 10))
+    assert info.value.max_steps == 10
+    assert len(produced) == 11
+
+
+def test_sampled_trace_keeps_every_nth_step_and_keyframes():
+    arr = [6, 5, 4, 3, 2, 1]
+    full = bubble_sort(arr)
+    trace = Trace(full.kinds, initial=arr, keyframe_every=4, sample_every=3)
+    trace.extend(full.records())
+
+    assert trace.total_steps == len(full)
+    assert trace.to_list() == full[::3]
+    assert sorted(trace.keyframes) == list(range(0, len(full), 4))
+    assert trace.state_at(4) == full.state_at(4)
+    with pytest.raises(ValueError):
+        trace.state_at(5)
+
+
+def test_report_progress_calls_back_and_can_abort():
+    seen = []
+    records = [(0, i, i) for i in range(10)]
+    assert list(report_progress(records, seen.append, 4)) == records
+    assert seen == [4, 8, 10]
+
+    def stop(count):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        list(report_progress(records, stop, 4))
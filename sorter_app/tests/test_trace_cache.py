@@ -0,0 +1,54 @@
+from algorithms.bubble_sort import bubble_sort
+from algorithms.merge_sort import merge_sort
+from services.trace_cache import TraceCache, array_digest, cache_key
+
+
+def test_digest_depends_on_content_and_number_type():
+    assert array_digest([3, 1, 2]) == array_digest([3, 1, 2])
+    assert array_digest([3, 1, 2]) != array_digest([1, 2, 3])
+    assert array_digest([1, 2]) != array_digest([1.0, 2.0])
+    assert array_digest([True]) != array_digest([1])
+
+
+def test_cache_key_includes_algorithm_and_seed():
+    assert cache_key("bubble", [1]) != cache_key("merge", [1])
+    assert cache_key("quick", [1], seed=1) != cache_key("quick", [1], seed=2)
+
+
+def test_get_or_create_counts_hits_and_misses():
+    cache = TraceCache()
+    calls = []
+
+    def create():
+        calls.append(1)
+        return merge_sort([3, 1, 2])
+
+    key = cache_key("merge", [3, 1, 2])
+    first = cache.get_or_create(key, create)
+    second = cache.get_or_create(key, create)
+
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    trace = bubble_sort([4, 3, 2, 1])
+    cache = TraceCache(max_bytes=2 * trace.nbytes)
+    cache.put("a", trace)
+    cache.put("b", bubble_sort([4, 3, 2, 1]))
+    cache.get("a")
+    cache.put("c", bubble_sort([4, 3, 2, 1]))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_oversized_trace_is_not_cached():
+    cache = TraceCache(max_bytes=1)
+    cache.put("a", bubble_sort([2, 1]))
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
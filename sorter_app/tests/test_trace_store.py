@@ -0,0 +1,57 @@
+from algorithms.bubble_sort import bubble_sort
+from services.trace_store import TraceStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_put_and_get():
+    store = TraceStore()
+    trace = bubble_sort([3, 2, 1])
+    trace_id = store.put("bubble", trace)
+
+    stored = store.get(trace_id)
+    assert stored.algorithm == "bubble"
+    assert stored.trace is trace
+    assert store.get("missing") is None
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    store = TraceStore(ttl=10, clock=clock)
+    trace_id = store.put("bubble", bubble_sort([2, 1]))
+
+    clock.now = 9
+    assert store.get(trace_id) is not None  # access extends the lifetime
+    clock.now = 18
+    assert store.get(trace_id) is not None
+    clock.now = 30
+    assert store.get(trace_id) is None
+    assert len(store) == 0
+    assert store.nbytes == 0
+
+
+def test_least_recently_used_evicted_over_byte_budget():
+    trace = bubble_sort([4, 3, 2, 1])
+    store = TraceStore(max_bytes=2 * trace.nbytes)
+    first = store.put("bubble", trace)
+    second = store.put("bubble", bubble_sort([4, 3, 2, 1]))
+    store.get(first)  # first is now the most recently used
+    store.put("bubble", bubble_sort([4, 3, 2, 1]))
+
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.nbytes <= store.max_bytes
+
+
+def test_delete():
+    store = TraceStore()
+    trace_id = store.put("bubble", bubble_sort([2, 1]))
+    assert store.delete(trace_id)
+    assert not store.delete(trace_id)
+    assert store.nbytes == 0
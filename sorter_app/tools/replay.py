@@ -0,0 +1,261 @@
+"""
+Replay a JSONL request log against the app and report per-route throughput,
+latency percentiles and error rates.
+
+Each line of the log describes one request:
+
+    {"method": "POST", "path": "/sort/bubble", "json": {"array": [3, 1, 2]}}
+    {"path": "/sort/quick", "input_len": 5000}
+    {"path": "/ds/stack", "input_len": 100, "json": {"action": "push", "value": 1}}
+
+"method" defaults to POST. With "input_len" a random array of that length is
+generated (as "array", or as "state" for the /ds routes) and merged into
+"json"; a null "input_len", as the request log writes for requests without
+an input, generates nothing. /array/upload lines are sent as a multipart
+file upload of that many comma-separated numbers. Lines without a "path"
+are skipped, so the request log of services/request_log.py replays as is.
+
+Usage (from sorter_app/):
+
+    python -m tools.replay traffic.jsonl --concurrency 8 --rate 200
+    python -m tools.replay traffic.jsonl --url http://localhost:5000
+
+Without --url the requests go through Flask's test client in this process,
+which measures the application alone; with --url they go over HTTP to a
+running server, workers and all.
+"""
+
+import argparse
+import io
+import json
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from tools.stats import percentile
+
+# trace ids (uuid4 hex) and array hashes would make every path its own route
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{32,64}(?=/|$)")
+
+# takes a multipart file upload rather than a JSON body
+UPLOAD_PATH = "/array/upload"
+
+
+class ReplayRequest(NamedTuple):
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+    upload: Optional[str] = None  # content of the uploaded 'file', if any
+
+
+class Outcome(NamedTuple):
+    route: str
+    status: int  # 0 when the request failed without a response
+    latency: float
+
+
+def route_of(request: ReplayRequest) -> str:
+    return f"{request.method} {_ID_SEGMENT.sub('/<id>', request.path)}"
+
+
+def load_requests(lines: Iterable[str], seed: int = 0) -> List[ReplayRequest]:
+    """Parse log lines into requests, generating the arrays of 'input_len'."""
+    rng = random.Random(seed)
+    requests = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        path = record.get("path")
+        if not isinstance(path, str):
+            continue
+        method = record.get("method", "POST").upper()
+        body = record.get("json")
+        values = None
+        if record.get("input_len") is not None:
+            values = [rng.randint(0, 1000) for _ in range(int(record["input_len"]))]
+        if path == UPLOAD_PATH:
+            upload = None if values is None else ",".join(map(str, values))
+            requests.append(ReplayRequest(method, path, upload=upload))
+            continue
+        if values is not None:
+            field = "state" if path.startswith("/ds/") else "array"
+            body = {field: values, **(body or {})}
+        requests.append(ReplayRequest(method, path, body))
+    return requests
+
+
+def _multipart(text: str) -> Tuple[bytes, str]:
+    """Body and Content-Type of a form uploading 'text' as its 'file' field."""
+    boundary = uuid.uuid4().hex
+    data = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="replay.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+        f"{text}\r\n--{boundary}--\r\n"
+    )
+    return data.encode("utf-8"), f"multipart/form-data; boundary={boundary}"
+
+
+# ---------------------------
+# Senders
+# ---------------------------
+
+
+def in_process_sender(app) -> Callable[[ReplayRequest], int]:
+    """Send through the Flask test client; one client per worker thread."""
+    local = threading.local()
+
+    def send(request: ReplayRequest) -> int:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        if request.upload is not None:
+            upload = (io.BytesIO(request.upload.encode("utf-8")), "replay.csv")
+            resp = client.open(
+                request.path, method=request.method, data={"file": upload}
+            )
+        else:
+            resp = client.open(request.path, method=request.method, json=request.body)
+        resp.close()
+        return resp.status_code
+
+    return send
+
+
+def http_sender(base_url: str, timeout: float = 30.0) -> Callable[[ReplayRequest], int]:
+    """Send over HTTP to a running server at 'base_url'."""
+    base_url = base_url.rstrip("/")
+
+    def send(request: ReplayRequest) -> int:
+        data, headers = None, {}
+        if request.upload is not None:
+            data, headers["Content-Type"] = _multipart(request.upload)
+        elif request.body is not None:
+            data = json.dumps(request.body).encode()
+            headers["Content-Type"] = "application/json"
+        req = urllib.request.Request(
+            base_url + request.path, data=data, headers=headers, method=request.method
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    return send
+
+
+# ---------------------------
+# Driver
+# ---------------------------
+
+
+def replay(
+    requests: List[ReplayRequest],
+    send: Callable[[ReplayRequest], int],
+    concurrency: int = 4,
+    rate: Optional[float] = None,
+) -> List[Outcome]:
+    """
+    Send every request with up to 'concurrency' in flight. With 'rate' the
+    requests are started on an open-loop schedule of 'rate' per second, so a
+    slow server builds up a backlog instead of slowing the load down.
+    """
+    start = time.perf_counter()
+
+    def run(index: int) -> Outcome:
+        request = requests[index]
+        if rate:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        began = time.perf_counter()
+        try:
+            status = send(request)
+        except Exception:
+            status = 0
+        return Outcome(route_of(request), status, time.perf_counter() - began)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(run, range(len(requests))))
+
+
+def summarize(outcomes: List[Outcome], elapsed: float) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-route report:
+      {"POST /sort/bubble": {"requests": 10, "errors": 1, "error_rate": 0.1,
+                             "throughput": 52.3, "p50_ms": ..., "p95_ms": ...,
+                             "p99_ms": ..., "max_ms": ...}}
+    Responses with status >= 400 and failed requests count as errors.
+    """
+    by_route: Dict[str, List[Outcome]] = {}
+    for outcome in outcomes:
+        by_route.setdefault(outcome.route, []).append(outcome)
+
+    report = {}
+    for route, items in sorted(by_route.items()):
+        latencies = sorted(item.latency * 1000 for item in items)
+        errors = sum(1 for item in items if not 0 < item.status < 400)
+        report[route] = {
+            "requests": len(items),
+            "errors": errors,
+            "error_rate": errors / len(items),
+            "throughput": len(items) / elapsed if elapsed > 0 else 0.0,
+            "p50_ms": statistics.median(latencies),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": latencies[-1],
+        }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a JSONL request log.")
+    parser.add_argument("log", help="JSONL file, one request per line")
+    parser.add_argument("--url", help="server to target (default: in-process)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rate", type=float, help="requests started per second")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the log N times")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.log) as file:
+        requests = load_requests(file, seed=args.seed) * args.repeat
+    if args.url:
+        send = http_sender(args.url)
+    else:
+        from app import app
+
+        send = in_process_sender(app)
+
+    start = time.perf_counter()
+    outcomes = replay(requests, send, concurrency=args.concurrency, rate=args.rate)
+    elapsed = time.perf_counter() - start
+    report = summarize(outcomes, elapsed)
+
+    if args.json:
+        print(json.dumps({"elapsed_s": elapsed, "routes": report}, indent=2))
+        return
+    throughput = len(outcomes) / elapsed if elapsed else 0.0
+    print(f"{len(outcomes)} requests in {elapsed:.2f}s ({throughput:.1f} req/s)")
+    for route, stats in report.items():
+        print(
+            f"{route}: {stats['requests']} req, {stats['throughput']:.1f} req/s, "
+            f"errors {stats['error_rate']:.1%}, p50 {stats['p50_ms']:.1f}ms, "
+            f"p95 {stats['p95_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
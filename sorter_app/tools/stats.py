@@ -0,0 +1,10 @@
+from typing import Sequence
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted, non-empty sequence:
+    percentile(times, 0.95) is the value 95% of the samples do not exceed.
+    """
+    index = round(fraction * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, index))]
@@ -1,26 +1,18 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
 from random import randint
-from timeit import repeat
 
-def run_sorting_algorithm(algorithm, array):
-    """
-    Measures how long a sorting algorithm takes to run on a given list of numbers.
-    Uses timeit.repeat to run the sorting code several times and record how long it takes.
-    The timeit module runs code as a string in temporary environment
-    -> if you want to use a function defined in the main program, you have to import it into the environment
-    """
-    setup_code = f"from __main__ import {algorithm}" \
-        if algorithm != "sorted" else ""
-
-    stmt = f"{algorithm}({array})" # execution statement
-
-    # Execute the code ten different times and return the time in seconds that each execution took
-    # repeat - run 3 separate timing batches
-    # number - in each batch, run the statement 10 times
-    times = repeat(setup=setup_code, stmt=stmt, repeat=3, number=10)
-
-    # Finally, display the name of the algorithm and the
-    # minimum time it took to run
-    print(f"Algorithm: {algorithm}. Minimum execution time: {min(times)}")
+# the benchmark harness shares its helpers with the sorter app
+_APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sorter_app")
+sys.path.insert(0, _APP_DIR)
+from services.datasets import DATASETS as DISTRIBUTIONS  # noqa: E402
+from tools.stats import percentile  # noqa: E402
 
 def bubble_sort(array):
     n = len(array)
@@ -117,29 +109,153 @@ def quicksort(array):
     right = quicksort(higher)
     return left + same + right
 
-################### Try the sorting algorithms ###################
+################### Benchmark harness ###################
+
+ALGORITHMS = {
+    "bubble_sort": bubble_sort,
+    "insertion_sort": insertion_sort,
+    "merge_sort": merge_sort,
+    "quicksort": quicksort,
+    "sorted": sorted,
+}
+
+
+def measure(algorithm, array, repeat):
+    """
+    Time one algorithm on 'array'.
+    bubble_sort and insertion_sort sort in place, so every run gets its own
+    fresh copy - made outside the timed region - instead of re-sorting the
+    output of the previous run. The peak memory comes from one extra run
+    under tracemalloc, which would otherwise slow down the timed runs.
+    """
+    times = []
+    for _ in range(repeat):
+        data = list(array)
+        start = time.perf_counter()
+        algorithm(data)
+        times.append(time.perf_counter() - start)
+
+    data = list(array)
+    tracemalloc.start()
+    algorithm(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "min": times[0],
+        "median": statistics.median(times),
+        "p95": percentile(times, 0.95),
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes, distributions, algorithms, repeat, seed=0):
+    """
+    Sweep every algorithm over every (distribution, size) pair.
+    Returns a list of result dicts, one per measurement.
+    Inputs are generated from 'seed' so runs are comparable with each other.
+    """
+    results = []
+    for distribution in distributions:
+        for size in sizes:
+            array = DISTRIBUTIONS[distribution](size, random.Random(seed))
+            for name in algorithms:
+                stats = measure(ALGORITHMS[name], array, repeat)
+                results.append(
+                    {
+                        "algorithm": name,
+                        "distribution": distribution,
+                        "size": size,
+                        **stats,
+                    }
+                )
+                print(
+                    f"{name:>15} {distribution:>14} n={size:<6} "
+                    f"min={stats['min']:.6f}s median={stats['median']:.6f}s "
+                    f"p95={stats['p95']:.6f}s peak={stats['peak_bytes']}B"
+                )
+    return results
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Compare medians with a baseline written by a previous run.
+    A measurement regresses when it is more than 'threshold' (0.2 = 20%)
+    slower than the baseline entry for the same algorithm/distribution/size.
+    """
+    def key(entry):
+        return entry["algorithm"], entry["distribution"], entry["size"]
+
+    previous = {key(entry): entry for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        old = previous.get(key(entry))
+        if old and entry["median"] > old["median"] * (1 + threshold):
+            regressions.append(
+                {
+                    "algorithm": entry["algorithm"],
+                    "distribution": entry["distribution"],
+                    "size": entry["size"],
+                    "baseline_median": old["median"],
+                    "median": entry["median"],
+                }
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2500])
+    parser.add_argument(
+        "--distributions", nargs="+", choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS)
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", choices=ALGORITHMS, default=list(ALGORITHMS)
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per input")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="JSON baseline to check for regressions")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed slowdown (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    ################### Try the sorting algorithms ###################
+
+    arr = [1, 6, 8, 9, 10, 3, 3, 5]
+    print(quicksort(arr))
+
+    ################### Measure execution time ###################
+
+    print()
+    print("------- Execution time of each sorting algorithm -------")
+    print()
 
-arr = [1, 6, 8, 9, 10, 3, 3, 5]
-print(quicksort(arr))
+    results = run_benchmarks(
+        args.sizes, args.distributions, args.algorithms, args.repeat, args.seed
+    )
 
-################### Measure execution time ###################
+    if args.output:
+        with open(args.output, "w") as file:
+            baseline = {"repeat": args.repeat, "seed": args.seed, "results": results}
+            json.dump(baseline, file, indent=2)
+        print(f"Baseline written to {args.output}")
 
-print()
-print("------- Execution time of each sorting algorithm -------")
-print()
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for entry in regressions:
+            print(
+                f"REGRESSION {entry['algorithm']} {entry['distribution']} "
+                f"n={entry['size']}: {entry['baseline_median']:.6f}s -> "
+                f"{entry['median']:.6f}s"
+            )
+        if regressions:
+            raise SystemExit(1)
 
-# Generate an array of random integer values between 0 and 999
-ARRAY_LENGTH = 2500
-arr = [randint(0, 1000) for i in range(ARRAY_LENGTH)]
 
-# Call the function using the name of the sorting algorithm and the array
-arr_copy = list(arr)
-run_sorting_algorithm(algorithm="bubble_sort", array=arr_copy)
-arr_copy = list(arr)
-run_sorting_algorithm(algorithm="insertion_sort", array=arr_copy)
-arr_copy = list(arr)
-run_sorting_algorithm(algorithm="merge_sort", array=arr_copy)
-arr_copy = list(arr)
-run_sorting_algorithm(algorithm="quicksort", array=arr_copy)
-arr_copy = list(arr)
-run_sorting_algorithm(algorithm="sorted", array=arr_copy)
\ No newline at end of file
+if __name__ == "__main__":
+    main()